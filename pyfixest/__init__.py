@@ -1 +1,2 @@
-from .fixest import Fixest
\ No newline at end of file
+from .fixest import Fixest
+from .threads import set_num_threads, get_num_threads, num_threads
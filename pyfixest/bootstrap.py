@@ -0,0 +1,663 @@
+import numpy as np
+import pandas as pd
+
+from typing import Union, Optional
+from numba import njit, prange
+from pyfixest.ssc_utils import get_ssc
+from pyfixest.demean import demean_weighted
+from pyfixest.feols import _segment_sum, _cluster_crossproducts
+
+
+def wildboottest(X: np.ndarray, Y: np.ndarray, cluster: Optional[np.ndarray], R: np.ndarray, r: float = 0, B: int = 999, weights_type: str = "rademacher", impose_null: bool = True, seed: Union[int, None] = None, adj: bool = True, cluster_adj: bool = True, conf_int: bool = False, alpha: float = 0.05, max_elements: int = 10_000_000, bootstrap_type: str = "11") -> dict:
+
+    '''
+    Run a wild (cluster) bootstrap test of the hypothesis H0: R'beta = r for a
+    regression of Y on X. For models with fixed effects, X and Y are the demeaned data.
+
+    The bootstrap is computed from per-cluster score blocks: for bootstrap weights v_b,
+    the numerator of the bootstrap t-statistic is c'v_b and the cluster scores of the bootstrap
+    residuals are c * v_b - Q A S'v_b, with S the G x k matrix of cluster scores, A = (X'X)^{-1},
+    c = S A R and Q the G x k matrix with rows X_g'X_g A R. In consequence, no bootstrap sample
+    of size N needs to be created. Bootstrap weights are processed in chunks of at most
+    `max_elements` / G draws, so that memory use is bounded for any number of draws B.
+
+    Optionally, a confidence interval is computed by test inversion, i.e. as the set of all
+    values r for which H0: R'beta = r is not rejected at level alpha. As all bootstrap components
+    are linear in r, each bootstrap t-statistic is a ratio of a linear function and the square root
+    of a quadratic function in r. The coefficients of these functions are computed once, for
+    the same bootstrap weights, so that the p-value for any r can be computed without re-running
+    the bootstrap (see `_invert_test()`).
+
+    The bootstrap types of MacKinnon, Nielsen and Webb (2023) are supported. The first digit
+    selects the residuals of the bootstrap dgp: '1' for the ordinary (restricted) residuals, '3'
+    for the leave-one-cluster-out (jackknife) residuals. The second digit selects the variance
+    estimator of the t-statistics: '1' for CRV1, '3' for CRV3. The CRV3 variants reuse the score
+    representation: with W_g = (X'X - X_g'X_g)^{-1}, the leave-one-cluster-out coefficients of a
+    bootstrap sample are beta_(g) = beta + W_g (S'v - S_g v_g), so that their cluster scores are again
+    linear in the bootstrap weights and in r. For the heteroskedastic bootstrap, every observation is
+    its own cluster.
+
+    Args:
+        X (np.ndarray): An N x k matrix of covariates.
+        Y (np.ndarray): The dependent variable.
+        cluster (np.ndarray, None): An array of length N with the cluster variable. If None, a
+            heteroskedastic wild bootstrap is run.
+        R (np.ndarray): A restriction vector of length k.
+        r (float): The value of R'beta under the null hypothesis. 0 by default.
+        B (int): The number of bootstrap iterations. 999 by default.
+        weights_type (str): The type of bootstrap weights. Either 'rademacher', 'mammen', 'webb' or 'normal'.
+        impose_null (bool): If True (default), the null hypothesis is imposed on the bootstrap dgp (WCR).
+            Otherwise, an unrestricted bootstrap is run (WCU).
+        seed (int, None): A random seed. None by default.
+        adj (bool): Whether to apply a small sample adjustment of (N-1) / (N-k).
+        cluster_adj (bool): Whether to apply a small sample adjustment of G / (G-1).
+        conf_int (bool): Whether to compute a bootstrap confidence interval via test inversion. False by default.
+        alpha (float): The significance level of the confidence interval. 0.05 by default.
+        max_elements (int): The maximum number of elements of a G x B_chunk matrix of bootstrap weights. For
+            the heteroskedastic bootstrap of the types '13', '31' and '33', it also bounds the number of elements
+            of the leave-one-out cross-products of a chunk of observations.
+        bootstrap_type (str): Either '11' (default), '13', '31' or '33'.
+
+    Returns:
+        A dictionary with the t-statistic ("t_stat"), the bootstrap p-value ("pvalue"),
+        the bootstrapped t-statistics ("t_boot"), a flag if the bootstrap weights
+        were fully enumerated ("full_enumeration") and, if conf_int is True, the confidence
+        interval ("conf_int").
+    '''
+
+    if weights_type not in ["rademacher", "mammen", "webb", "normal"]:
+        raise ValueError("weights_type must be one of 'rademacher', 'mammen', 'webb' or 'normal'.")
+
+    Y = Y.flatten()
+    R = np.asarray(R, dtype = np.float64)
+
+    components = _wildboot_components(X, Y, cluster, R, impose_null, adj, cluster_adj, bootstrap_type, max_elements)
+    G = components["G"]
+    draws_list, full_enumeration = _wildboot_draws([components], [np.arange(G)], G, B, weights_type, seed, max_elements)
+    draws = draws_list[0]
+
+    t_stat = (components["Rbeta"] - r) / components["se"]
+    t_boot = _get_tboot(draws, r, components["ssc"])
+    pvalue = np.mean(np.abs(t_stat) < np.abs(t_boot))
+
+    res = {
+        "t_stat": t_stat,
+        "pvalue": pvalue,
+        "t_boot": t_boot,
+        "full_enumeration": full_enumeration
+    }
+
+    if conf_int:
+        res["conf_int"] = _invert_test(draws, components, alpha, max_elements)
+
+    return res
+
+
+def wildboottest_multi(components_list: list, index_list: list, G: int, B: int = 999, weights_type: str = "rademacher", seed: Union[int, None] = None, max_elements: int = 10_000_000) -> dict:
+
+    '''
+    Run a wild (cluster) bootstrap test of H0: R'beta = 0 jointly for several models, using the
+    same bootstrap weights for all models. Weights are drawn once for the G bootstrap units
+    (clusters or observations) of the full data set and mapped to the units of each model
+    via `index_list`, so that the bootstrap t-statistics are draws from the joint distribution
+    across models, as required for multiple testing corrections.
+
+    Args:
+        components_list (list): A list of outputs of `_wildboot_components()`, one per model.
+        index_list (list): A list of integer arrays. The g-th bootstrap unit of model m is the
+            index_list[m][g]-th unit of the full data set.
+        G (int): The number of bootstrap units in the full data set.
+        B (int): The number of bootstrap iterations. 999 by default.
+        weights_type (str): The type of bootstrap weights. Either 'rademacher', 'mammen', 'webb' or 'normal'.
+        seed (int, None): A random seed. None by default.
+        max_elements (int): The maximum number of elements of a G x B_chunk matrix of bootstrap weights.
+
+    Returns:
+        A dictionary with the t-statistics ("t_stat", of length M), the bootstrapped t-statistics
+        ("t_boot", an M x B matrix) and a flag if the bootstrap weights were fully enumerated ("full_enumeration").
+    '''
+
+    if weights_type not in ["rademacher", "mammen", "webb", "normal"]:
+        raise ValueError("weights_type must be one of 'rademacher', 'mammen', 'webb' or 'normal'.")
+
+    draws_list, full_enumeration = _wildboot_draws(components_list, index_list, G, B, weights_type, seed, max_elements)
+
+    return {
+        "t_stat": np.array([components["Rbeta"] / components["se"] for components in components_list]),
+        "t_boot": np.array([_get_tboot(draws, 0, components["ssc"]) for draws, components in zip(draws_list, components_list)]),
+        "full_enumeration": full_enumeration
+    }
+
+
+def _get_rwolf_pvalues(t_stat, t_boot):
+
+    '''
+    Compute Romano-Wolf step-down adjusted p-values. Hypotheses are ordered by the absolute value
+    of their t-statistics. For the j-th hypothesis, the p-value is computed from the bootstrap
+    distribution of the maximum absolute t-statistic over all hypotheses that are not more significant.
+    Args:
+        t_stat (np.ndarray): An array of M t-statistics.
+        t_boot (np.ndarray): An M x B matrix of bootstrapped t-statistics, drawn with the same weights.
+    Returns:
+        An array of M adjusted p-values.
+    '''
+
+    abs_t = np.abs(t_stat)
+    abs_t_boot = np.abs(t_boot)
+    order = np.argsort(-abs_t, kind = "stable")
+
+    pvalues = np.zeros(len(t_stat))
+    max_t_boot = np.full(t_boot.shape[1], -np.inf)
+    for j in order[::-1]:
+        max_t_boot = np.maximum(max_t_boot, abs_t_boot[j])
+        pvalues[j] = np.mean(abs_t[j] < max_t_boot)
+
+    # enforce monotonicity in the order of significance
+    pvalues[order] = np.maximum.accumulate(pvalues[order])
+
+    return pvalues
+
+
+def _get_wyoung_pvalues(t_stat, t_boot):
+
+    '''
+    Compute Westfall-Young step-down (minP) adjusted p-values. Hypotheses are ordered by their
+    unadjusted bootstrap p-values. For the j-th hypothesis, the p-value is computed from the bootstrap
+    distribution of the minimum bootstrap p-value over all hypotheses that are not more significant.
+    Args:
+        t_stat (np.ndarray): An array of M t-statistics.
+        t_boot (np.ndarray): An M x B matrix of bootstrapped t-statistics, drawn with the same weights.
+    Returns:
+        An array of M adjusted p-values.
+    '''
+
+    M, B = t_boot.shape
+    abs_t_boot = np.abs(t_boot)
+    pvalues_raw = np.mean(np.abs(t_stat)[:, np.newaxis] < abs_t_boot, axis = 1)
+
+    # the bootstrap p-value of each draw, computed from the bootstrap distribution of the same model
+    sorted_t_boot = np.sort(abs_t_boot, axis = 1)
+    pvalues_boot = np.array([
+        (B - np.searchsorted(sorted_t_boot[m], abs_t_boot[m], side = "right")) / B
+        for m in range(M)
+    ])
+
+    order = np.argsort(pvalues_raw, kind = "stable")
+    pvalues = np.zeros(M)
+    min_p_boot = np.full(B, np.inf)
+    for j in order[::-1]:
+        min_p_boot = np.minimum(min_p_boot, pvalues_boot[j])
+        pvalues[j] = np.mean(min_p_boot <= pvalues_raw[j])
+
+    # enforce monotonicity in the order of significance
+    pvalues[order] = np.maximum.accumulate(pvalues[order])
+
+    return pvalues
+
+
+def _wildboot_draws(components_list, index_list, G, B, weights_type, seed, max_elements):
+
+    '''
+    Draw bootstrap weights in chunks and compute, for each model and each draw b, the coefficients
+    of the bootstrap t-statistic as a function of r:
+    t_b(r) = (n0_b + r * n1_b) / sqrt(ssc * (a_b + 2 * r * b_b + r^2 * c_b)).
+    Weights are drawn for the G units of the full data set and shared across models.
+    Args:
+        components_list (list): A list of outputs of `_wildboot_components()`.
+        index_list (list): A list of integer arrays, mapping the bootstrap units of each model to the full data set.
+        G (int): The number of bootstrap units in the full data set.
+        B (int): The number of bootstrap iterations.
+        weights_type (str): The type of bootstrap weights.
+        seed (int, None): A random seed.
+        max_elements (int): The maximum number of elements of a G x B_chunk matrix of bootstrap weights.
+    Returns:
+        draws_list (list): A list of 5 x B arrays with rows n0, n1, a, b, c, one per model.
+        full_enumeration (bool): True if the weights are fully enumerated.
+    '''
+
+    rng = np.random.default_rng(seed)
+    V_full, B, full_enumeration = _get_full_enumeration(weights_type, G, B)
+
+    chunk_size = int(max(1, min(B, max_elements // G)))
+    draws_list = [np.zeros((5, B)) for _ in components_list]
+
+    for start in range(0, B, chunk_size):
+        B_chunk = min(chunk_size, B - start)
+        if full_enumeration:
+            V = V_full[:, start:start + B_chunk]
+        else:
+            V = _get_bootstrap_weights(weights_type, G, B_chunk, rng)
+        for components, index, draws in zip(components_list, index_list, draws_list):
+            c0, c1, e0, e1, QA, S0, S1 = [components[x] for x in ["c0", "c1", "e0", "e1", "QA", "S0", "S1"]]
+            V_model = V[index]
+            MV0 = QA @ (np.transpose(S0) @ V_model)
+            MV1 = QA @ (np.transpose(S1) @ V_model)
+            draws[:, start:start + B_chunk] = _wildboot_tstat(c0, c1, e0, e1, V_model, MV0, MV1)
+
+    return draws_list, full_enumeration
+
+
+def _get_tboot(draws, r, ssc):
+
+    '''
+    Compute bootstrap t-statistics for the null hypothesis R'beta = r.
+    Args:
+        draws (np.ndarray): The output of `_wildboot_draws()`.
+        r (float, np.ndarray): A scalar, or an array of n_r values.
+        ssc (float): The small sample correction.
+    Returns:
+        An array of length B, or an n_r x B array if r is an array.
+    '''
+
+    n0, n1, a, b, c = draws
+    r = np.asarray(r, dtype = np.float64)[..., np.newaxis]
+
+    return np.squeeze((n0 + r * n1) / np.sqrt(ssc * (a + 2 * r * b + r ** 2 * c)))
+
+
+def _get_pvalues(draws, components, r, max_elements):
+
+    '''
+    Compute bootstrap p-values for many null hypotheses R'beta = r at once, reusing the same
+    bootstrap draws. The values of r are processed in chunks to bound memory.
+    Args:
+        draws (np.ndarray): The output of `_wildboot_draws()`.
+        components (dict): The output of `_wildboot_components()`.
+        r (np.ndarray): An array of values of r.
+        max_elements (int): The maximum number of elements of a n_r_chunk x B matrix.
+    Returns:
+        An array of p-values, of the same length as r.
+    '''
+
+    r = np.atleast_1d(np.asarray(r, dtype = np.float64))
+    B = draws.shape[1]
+    chunk_size = int(max(1, max_elements // B))
+    pvalues = np.zeros(len(r))
+
+    for start in range(0, len(r), chunk_size):
+        r_chunk = r[start:start + chunk_size]
+        t_stat = (components["Rbeta"] - r_chunk) / components["se"]
+        t_boot = np.atleast_2d(_get_tboot(draws, r_chunk, components["ssc"]))
+        pvalues[start:start + chunk_size] = np.mean(np.abs(t_stat)[:, np.newaxis] < np.abs(t_boot), axis = 1)
+
+    return pvalues
+
+
+def _invert_test(draws, components, alpha, max_elements, n_grid = 100, tol = 1e-06, maxiter = 100):
+
+    '''
+    Compute a bootstrap confidence interval by test inversion. The p-value curve is first evaluated
+    on a grid of null hypotheses around the point estimate in one vectorised pass. The grid is widened
+    until it brackets both bounds. The bounds are then located via bisection within the bracketing grid cells.
+    Args:
+        draws (np.ndarray): The output of `_wildboot_draws()`.
+        components (dict): The output of `_wildboot_components()`.
+        alpha (float): The significance level.
+        max_elements (int): The maximum number of elements of a n_r_chunk x B matrix.
+        n_grid (int): The number of grid points on each side of the point estimate.
+        tol (float): The tolerance for the bounds, relative to the standard error.
+        maxiter (int): The maximum number of bisection steps.
+    Returns:
+        An array with the lower and upper bound of the confidence interval.
+    '''
+
+    Rbeta = components["Rbeta"]
+    se = components["se"]
+
+    width = 5
+    for _ in range(10):
+        grid = Rbeta + se * np.linspace(0, width, n_grid + 1)[1:]
+        p_upper = _get_pvalues(draws, components, grid, max_elements)
+        p_lower = _get_pvalues(draws, components, 2 * Rbeta - grid, max_elements)
+        if np.any(p_upper < alpha) and np.any(p_lower < alpha):
+            break
+        width *= 2
+    else:
+        raise ValueError("The confidence interval could not be bracketed.")
+
+    bounds = []
+    for direction, pvalues in [(-1, p_lower), (1, p_upper)]:
+
+        i = np.argmax(pvalues < alpha)
+        inner = Rbeta + direction * se * (np.linspace(0, width, n_grid + 1)[i])
+        outer = Rbeta + direction * se * (np.linspace(0, width, n_grid + 1)[i + 1])
+
+        for _ in range(maxiter):
+            if np.abs(outer - inner) < tol * se:
+                break
+            mid = (inner + outer) / 2
+            if _get_pvalues(draws, components, mid, max_elements)[0] < alpha:
+                outer = mid
+            else:
+                inner = mid
+
+        bounds.append((inner + outer) / 2)
+
+    return np.array(bounds)
+
+
+def bayesian_bootstrap(X: np.ndarray, Y: np.ndarray, fe: Optional[np.ndarray] = None, cluster: Optional[np.ndarray] = None, B: int = 999, seed: Union[int, None] = None, max_elements: int = 10_000_000) -> np.ndarray:
+
+    '''
+    Run a weighted (Bayesian) bootstrap for a regression of Y on X with fixed effects in fe.
+    For each bootstrap draw, observation (or cluster) weights are drawn from a standard exponential
+    distribution, i.e. Dirichlet weights up to scale, and the model is re-estimated via weighted least squares.
+    With fixed effects, Y and X are demeaned under all weight vectors of a chunk in one parallel call of
+    `demean_weighted()`. Draws are processed in chunks of at most `max_elements` / (N * (k + 1)) weight vectors.
+
+    Args:
+        X (np.ndarray): An N x k matrix of covariates, not demeaned.
+        Y (np.ndarray): The dependent variable, not demeaned.
+        fe (np.ndarray, None): An N x n_fixef array of integer codes of the fixed effects. None if the
+            model has no fixed effects.
+        cluster (np.ndarray, None): An array of length N. If provided, weights are drawn at the cluster level.
+        B (int): The number of bootstrap iterations. 999 by default.
+        seed (int, None): A random seed. None by default.
+        max_elements (int): The maximum number of elements of the demeaned data of a chunk of weight vectors.
+
+    Returns:
+        A B x k matrix of bootstrapped coefficients.
+    '''
+
+    N, k = X.shape
+    Y = Y.flatten()
+
+    if cluster is None:
+        codes = np.arange(N)
+        G = N
+    else:
+        codes, uniques = pd.factorize(cluster)
+        if np.any(codes == -1):
+            raise ValueError("The bootstrap is not supported with missing values in the cluster variable.")
+        G = len(uniques)
+
+    rng = np.random.default_rng(seed)
+    chunk_size = int(max(1, min(B, max_elements // (N * (k + 1)))))
+    beta_boot = np.zeros((B, k))
+
+    if fe is not None:
+        fe = np.ascontiguousarray(fe, dtype = np.int64)
+        YX = np.ascontiguousarray(np.column_stack([Y, X]), dtype = np.float64)
+
+    for start in range(0, B, chunk_size):
+
+        B_chunk = min(chunk_size, B - start)
+        W = rng.exponential(size = (B_chunk, G))[:, codes]
+
+        if fe is None:
+            tXWX = np.einsum("nk,bn,nj->bkj", X, W, X)
+            tXWy = np.einsum("nk,bn,n->bk", X, W, Y)
+        else:
+            YX_demeaned = demean_weighted(YX, fe, W)
+            Y_demeaned = YX_demeaned[:, 0, :]
+            X_demeaned = YX_demeaned[:, 1:, :]
+            tXWX = np.einsum("nkb,bn,njb->bkj", X_demeaned, W, X_demeaned)
+            tXWy = np.einsum("nkb,bn,nb->bk", X_demeaned, W, Y_demeaned)
+
+        beta_boot[start:start + B_chunk] = np.linalg.solve(tXWX, tXWy[:, :, np.newaxis])[:, :, 0]
+
+    return beta_boot
+
+
+def _wildboot_components(X, Y, cluster, R, impose_null, adj, cluster_adj, bootstrap_type = "11", max_elements = 10_000_000):
+
+    '''
+    Precompute all per-cluster components of the wild (cluster) bootstrap.
+    The (restricted) residuals are linear in r, and so are the cluster scores S = S0 + r * S1,
+    the coefficients c = c0 + r * c1 of the numerator and e = e0 + r * e1 of the cluster scores
+    of the bootstrap t-statistics.
+    Args:
+        See `wildboottest()`. For the heteroskedastic bootstrap of the types '13', '31' and '33',
+        max_elements bounds the number of elements of the leave-one-out cross-products of a chunk of
+        observations.
+    Returns:
+        A dictionary with the bootstrap components.
+    '''
+
+    if bootstrap_type not in ["11", "13", "31", "33"]:
+        raise ValueError("bootstrap_type must be one of '11', '13', '31' or '33'.")
+
+    N, k = X.shape
+
+    tXX = np.transpose(X) @ X
+    A = np.linalg.inv(tXX)
+    beta_hat = A @ (np.transpose(X) @ Y)
+    AR = A @ R
+    RAR = R @ AR
+    u_hat = Y - X @ beta_hat
+
+    if cluster is None:
+        codes = np.arange(N)
+        G = N
+        uniques = None
+        vcov_type = "hetero"
+        # for the heteroskedastic bootstrap, x_i x_i'AR
+        Q = X * (X @ AR).reshape((N, 1))
+    else:
+        codes, uniques = pd.factorize(cluster)
+        if np.any(codes == -1):
+            raise ValueError("The wild cluster bootstrap is not supported with missing values in the cluster variable.")
+        G = len(uniques)
+        order = np.argsort(codes, kind = "stable")
+        counts = np.bincount(codes, minlength = G)
+        starts = np.concatenate([np.zeros(1, dtype = np.int64), np.cumsum(counts)[:-1]])
+        tXgXg, tXgyg = _cluster_crossproducts(np.ascontiguousarray(X[order], dtype = np.float64), np.ascontiguousarray(Y[order], dtype = np.float64), starts, counts)
+        Q = tXgXg @ AR
+        vcov_type = "CRV"
+
+    if "3" in bootstrap_type:
+        # W_g R, with W_g = (X'X - X_g'X_g)^{-1} the inverse of the leave-one-cluster-out cross-product,
+        # and the leave-one-cluster-out estimates beta_(g) = W_g (X'y - X_g'y_g)
+        if cluster is None:
+            WR, beta_jack = _hetero_jackknife(X, Y, tXX, R, max_elements)
+        else:
+            W = _jackknife_inverse(tXX[np.newaxis, :, :] - tXgXg)
+            WR = W @ R
+            beta_jack = (W @ (np.sum(tXgyg, axis = 0)[np.newaxis, :] - tXgyg)[:, :, np.newaxis])[:, :, 0]
+
+    ssc = get_ssc(
+        ssc_dict = {'adj': adj, 'fixef_k': "none", 'cluster_adj': cluster_adj, 'cluster_df': "conventional"},
+        N = N,
+        k = k,
+        G = G,
+        vcov_sign = 1,
+        vcov_type = vcov_type
+    )
+
+    # t-statistic denominator of the unrestricted model
+    S_hat = _segment_sum(X * u_hat.reshape((N, 1)), codes, G)
+    if bootstrap_type[1] == "1":
+        se = np.sqrt(ssc * np.sum((S_hat @ AR) ** 2))
+    else:
+        # CRV3: R'(beta_(g) - beta_hat) = -R'W_g S_g, as X'u_hat = 0
+        se = np.sqrt(ssc * np.sum(np.sum(WR * S_hat, axis = 1) ** 2))
+
+    # the coefficients of the bootstrap dgp, per observation: the full sample estimates, or the
+    # leave-one-cluster-out estimates of the observation's cluster
+    if bootstrap_type[0] == "1":
+        beta_dgp = beta_hat
+        AR_dgp = AR
+        RAR_dgp = RAR
+    else:
+        beta_dgp = beta_jack[codes]
+        AR_dgp = WR[codes]
+        RAR_dgp = AR_dgp @ R
+
+    u = Y - np.sum(X * beta_dgp, axis = 1)
+    if impose_null:
+        # restricted estimate beta_r = beta - AR (R'beta - r) / R'AR
+        # and residuals u_r = u + X AR (R'beta - r) / R'AR, linear in r
+        XAR = np.sum(X * AR_dgp, axis = 1) / RAR_dgp
+        u0 = u + XAR * (beta_dgp @ R)
+        u1 = -XAR
+    else:
+        u0 = u
+        u1 = np.zeros(N)
+
+    S0 = _segment_sum(X * u0.reshape((N, 1)), codes, G)
+    S1 = _segment_sum(X * u1.reshape((N, 1)), codes, G)
+
+    c0 = S0 @ AR
+    c1 = S1 @ AR
+
+    if bootstrap_type[1] == "1":
+        # CRV1: the cluster scores of the bootstrap t-statistics are c * v - Q A S'v
+        e0, e1 = c0, c1
+        QA = Q @ A
+    else:
+        # CRV3: R'(beta_(g) - beta) = (W_g R - AR)'S'v - R'W_g S_g v_g
+        e0 = -np.sum(WR * S0, axis = 1)
+        e1 = -np.sum(WR * S1, axis = 1)
+        QA = AR[np.newaxis, :] - WR
+
+    return {
+        "c0": c0,
+        "c1": c1,
+        "e0": e0,
+        "e1": e1,
+        "QA": QA,
+        "S0": S0,
+        "S1": S1,
+        "ssc": ssc,
+        "G": G,
+        "se": se,
+        "Rbeta": R @ beta_hat,
+        "beta_hat": beta_hat,
+        "uniques": uniques
+    }
+
+
+def _hetero_jackknife(X, Y, tXX, R, max_elements):
+
+    '''
+    Compute W_i R and the leave-one-out estimates beta_(i) = W_i (X'y - x_i y_i) of all observations,
+    with W_i = (X'X - x_i x_i')^{-1}. The N x k x k leave-one-out cross-products are never formed at once:
+    observations are processed in chunks of at most `max_elements` / k^2 observations.
+    Args:
+        X (np.ndarray): A N x k matrix of covariates.
+        Y (np.ndarray): An array of the dependent variable.
+        tXX (np.ndarray): The k x k matrix X'X.
+        R (np.ndarray): An array of length k.
+        max_elements (int): The maximum number of elements of the cross-products of a chunk.
+    Returns:
+        A tuple of two N x k matrices: W_i R and beta_(i).
+    '''
+
+    N, k = X.shape
+    tXY = np.transpose(X) @ Y
+
+    WR = np.zeros((N, k))
+    beta_jack = np.zeros((N, k))
+
+    chunk_size = int(max(1, max_elements // (k * k)))
+    for start in range(0, N, chunk_size):
+        X_chunk = X[start:start + chunk_size]
+        W = _jackknife_inverse(tXX[np.newaxis, :, :] - X_chunk[:, :, np.newaxis] * X_chunk[:, np.newaxis, :])
+        WR[start:start + chunk_size] = W @ R
+        tXY_jack = tXY[np.newaxis, :] - X_chunk * Y[start:start + chunk_size].reshape((-1, 1))
+        beta_jack[start:start + chunk_size] = (W @ tXY_jack[:, :, np.newaxis])[:, :, 0]
+
+    return WR, beta_jack
+
+
+def _jackknife_inverse(tXX_jack):
+
+    '''
+    Invert the leave-one-cluster-out cross-products X'X - X_g'X_g of all clusters.
+    Args:
+        tXX_jack (np.ndarray): A G x k x k array.
+    Returns:
+        A G x k x k array of (pseudo-)inverses.
+    '''
+
+    try:
+        return np.linalg.inv(tXX_jack)
+    except np.linalg.LinAlgError:
+        # singular leave-one-out systems, e.g. if a dummy variable is only
+        # observed in a single cluster
+        return np.linalg.pinv(tXX_jack)
+
+
+def _get_bootstrap_weights(weights_type, G, B, rng):
+
+    '''
+    Draw a G x B matrix of bootstrap weights.
+    Args:
+        weights_type (str): Either 'rademacher', 'mammen', 'webb' or 'normal'.
+        G (int): The number of clusters.
+        B (int): The number of bootstrap draws.
+        rng (np.random.Generator): A random number generator.
+    Returns:
+        A G x B matrix of bootstrap weights.
+    '''
+
+    if weights_type == "rademacher":
+        return rng.integers(0, 2, size = (G, B)) * 2.0 - 1.0
+    elif weights_type == "mammen":
+        sqrt5 = np.sqrt(5)
+        return np.where(
+            rng.random(size = (G, B)) < (sqrt5 + 1) / (2 * sqrt5),
+            -(sqrt5 - 1) / 2,
+            (sqrt5 + 1) / 2
+        )
+    elif weights_type == "webb":
+        values = np.array([-np.sqrt(3 / 2), -1, -np.sqrt(1 / 2), np.sqrt(1 / 2), 1, np.sqrt(3 / 2)])
+        return values[rng.integers(0, 6, size = (G, B))]
+    elif weights_type == "normal":
+        return rng.normal(size = (G, B))
+    else:
+        raise ValueError("weights_type must be one of 'rademacher', 'mammen', 'webb' or 'normal'.")
+
+
+def _get_full_enumeration(weights_type, G, B):
+
+    '''
+    Check if all 2^G Rademacher weight vectors can be enumerated, which is the case if 2^G <= B.
+    Args:
+        weights_type (str): The type of bootstrap weights.
+        G (int): The number of clusters.
+        B (int): The number of bootstrap draws.
+    Returns:
+        V (np.ndarray, None): A G x 2^G matrix with all Rademacher weight vectors, or None.
+        B (int): The (possibly updated) number of bootstrap draws.
+        full_enumeration (bool): True if the weights are fully enumerated.
+    '''
+
+    if weights_type == "rademacher" and G < 63 and 2 ** G <= B:
+        B = 2 ** G
+        V = ((np.arange(B).reshape((1, B)) >> np.arange(G).reshape((G, 1))) & 1) * 2.0 - 1.0
+        return V, B, True
+
+    return None, B, False
+
+
+@njit(parallel = True)
+def _wildboot_tstat(c0, c1, e0, e1, V, MV0, MV1):
+
+    '''
+    Compute the coefficients of the bootstrap t-statistics as a function of r, in parallel over
+    bootstrap draws. The cluster scores of the bootstrap t-statistics are d0 + r * d1, with
+    d0 = e0 * v - MV0 and d1 = e1 * v - MV1.
+    Args:
+        c0, c1 (np.ndarray): Vectors of length G, the coefficients of the numerator.
+        e0, e1 (np.ndarray): Vectors of length G, the coefficients of the cluster scores.
+        V (np.ndarray): A G x B matrix of bootstrap weights.
+        MV0, MV1 (np.ndarray): G x B matrices, QA S0'V and QA S1'V.
+    Returns:
+        A 5 x B array with rows n0 = c0'v, n1 = c1'v, a = sum(d0^2), b = sum(d0 * d1), c = sum(d1^2).
+    '''
+
+    G, B = V.shape
+    res = np.zeros((5, B))
+
+    for b in prange(B):
+        for g in range(G):
+            d0 = e0[g] * V[g, b] - MV0[g, b]
+            d1 = e1[g] * V[g, b] - MV1[g, b]
+            res[0, b] += c0[g] * V[g, b]
+            res[1, b] += c1[g] * V[g, b]
+            res[2, b] += d0 * d0
+            res[3, b] += d0 * d1
+            res[4, b] += d1 * d1
+
+    return res
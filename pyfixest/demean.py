@@ -21,7 +21,6 @@ def demean(cx, flist, weights, tol = 1e-08, maxiter = 2000):
         res: Demeaned matrix of dimension cx.shape
     '''
     N = cx.shape[0]
-    fixef_vars = flist.shape[1]
     K = cx.shape[1]
 
     res = np.zeros((N,K))
@@ -29,24 +28,140 @@ def demean(cx, flist, weights, tol = 1e-08, maxiter = 2000):
 
     for k in prange(K):
 
-        cxk = cx[:,k].copy()
-        oldxk = cxk - 1
+        res[:,k] = _demean_column(cx[:,k], flist, weights, tol, maxiter)
+
+    return res
+
+
+@njit
+def _demean_column(x, flist, weights, tol, maxiter):
+
+    '''
+    Demean a single column x by fixed effects in flist via alternating projections.
+    Args:
+        x: Vector to be demeaned
+        flist: Matrix of fixed effects
+        weights: Weights for fixed effects
+        tol: Convergence tolerance.
+        maxiter: Maximum number of iterations.
+    Returns
+        The demeaned vector.
+    '''
+
+    fixef_vars = flist.shape[1]
+
+    cxk = x.copy()
+
+    for _ in range(maxiter):
+
+        oldxk = cxk.copy()
+
+        for i in range(fixef_vars):
+            fmat = flist[:,i]
+            weighted_ave = _ave3(cxk, fmat, weights)
+            cxk = cxk - weighted_ave
+
+        if np.sum(np.abs(cxk - oldxk)) < tol:
+            break
+
+    return cxk
+
+
+def demean_jackknife(Y, X, flist, cluster, G, tol = 1e-08, maxiter = 2000):
+
+    '''
+    Compute leave-one-cluster-out regression coefficients for a regression of
+    Y on X with fixed effects in flist. For each cluster, the remaining observations
+    are demeaned from scratch, so that the coefficients are exact even if the fixed
+    effects are not nested within the clusters. Loops over clusters in parallel.
+    Note that the cost is that of G demeaning passes over the full data, i.e. O(G * N * iterations).
+    Singular leave-one-cluster-out systems, e.g. if a covariate is only observed in a single
+    cluster, are solved via a pseudo-inverse.
+    Args:
+        Y: Vector with the (not demeaned) dependent variable
+        X: Matrix with the (not demeaned) covariates
+        flist: Matrix of fixed effects
+        cluster: Vector of integer cluster codes in 0, ..., G-1
+        G: The number of clusters
+        tol: Convergence tolerance. 1e-08 by default.
+        maxiter: Maximum number of iterations. 2000 by default.
+    Returns
+        beta_jack: A G x X.shape[1] matrix of leave-one-cluster-out coefficients
+    '''
+
+    tXX, tXy = _demean_jackknife_crossproducts(Y, X, flist, cluster, G, tol, maxiter)
+
+    try:
+        beta_jack = np.linalg.solve(tXX, tXy[:, :, np.newaxis])
+    except np.linalg.LinAlgError:
+        beta_jack = np.linalg.pinv(tXX) @ tXy[:, :, np.newaxis]
+
+    return beta_jack[:, :, 0]
+
+
+@njit(parallel = True, cache = False, fastmath = False)
+def _demean_jackknife_crossproducts(Y, X, flist, cluster, G, tol, maxiter):
+
+    '''
+    Demean the data without each cluster and compute the cross-products of the demeaned data.
+    Loops over clusters in parallel. See `demean_jackknife()`.
+    Returns
+        tXX: A G x K x K array of the cross-products X_(g)'X_(g) of the demeaned covariates.
+        tXy: A G x K array of the cross-products X_(g)'Y_(g).
+    '''
+
+    K = X.shape[1]
+    tXX = np.zeros((G, K, K))
+    tXy = np.zeros((G, K))
+
+    for g in prange(G):
+
+        keep = np.where(cluster != g)[0]
+        N_g = len(keep)
+
+        flist_g = flist[keep, :]
+        weights_g = np.ones(N_g)
+
+        Y_g = _demean_column(Y[keep], flist_g, weights_g, tol, maxiter)
+        X_g = np.zeros((N_g, K))
+        for k in range(K):
+            X_g[:, k] = _demean_column(X[keep, k], flist_g, weights_g, tol, maxiter)
 
-        converged = False
-        for _ in range(maxiter):
+        tXX[g] = X_g.T @ X_g
+        tXy[g] = X_g.T @ Y_g
 
-            oldxk = cxk.copy()
+    return tXX, tXy
+
+
+
+@njit(parallel = True, cache = False, fastmath = False)
+def demean_weighted(cx, flist, weights, tol = 1e-08, maxiter = 2000):
+
+    '''
+    Demean a Matrix cx by fixed effects in flist, separately for each of B weight vectors.
+    Loops over all (column, weight vector) pairs in parallel, so that the data does not need
+    to be duplicated for each weight vector.
+    Args:
+        cx: Matrix to be demeaned
+        flist: Matrix of fixed effects
+        weights: A B x N matrix of weights. Each row is one weight vector.
+        tol: Convergence tolerance. 1e-08 by default.
+        maxiter: Maximum number of iterations. 2000 by default.
+    Returns
+        res: An array of dimension N x cx.shape[1] x B with the demeaned matrices
+    '''
+
+    N = cx.shape[0]
+    K = cx.shape[1]
+    B = weights.shape[0]
 
-            for i in range(fixef_vars):
-                fmat = flist[:,i]
-                weighted_ave = _ave3(cxk, fmat, weights)
-                cxk = cxk - weighted_ave
+    res = np.zeros((N, K, B))
 
-            if np.sum(np.abs(cxk - oldxk)) < tol:
-                converged = True
-                break
+    for kb in prange(K * B):
 
-        res[:,k] = cxk
+        k = kb // B
+        b = kb % B
+        res[:, k, b] = _demean_column(cx[:, k], flist, weights[b], tol, maxiter)
 
     return res
 
@@ -1,12 +1,18 @@
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
+import threading
 import warnings
 
-from importlib import import_module
+from itertools import combinations
 from typing import Union, List, Dict
-from scipy.stats import norm, t
+from scipy.stats import norm, t, f
+from scipy.spatial import cKDTree
+from scipy import sparse
+from numba import njit, prange
+from formulaic import model_matrix
 from pyfixest.ssc_utils import get_ssc
+from pyfixest.demean import demean, demean_jackknife
 
 
 class Feols:
@@ -43,6 +49,8 @@ class Feols:
         Regression estimation for a single model, via ordinary least squares (OLS).
     get_vcov(vcov)
         Compute covariance matrices for an estimated model.
+    set_vcov(vcov)
+        Set the covariance matrix type for an estimated model, which is computed lazily on first access.
 
     Raises
     ------
@@ -62,6 +70,16 @@ class Feols:
 
         self.N, self.k = X.shape
 
+        # cache of computed inference results, keyed by vcov type
+        self._vcov_cache = dict()
+        # vcov type set via set_vcov(), but not yet computed
+        self._vcov_spec = None
+        # guards the computation of inference, which may be triggered concurrently
+        # by several threads reading the same model
+        self._inference_lock = threading.RLock()
+        # formulaic model spec of the model's variables (set by Fixest)
+        self._model_spec = None
+
     def get_fit(self, estimator = "ols") -> None:
         '''
         Regression estimation for a single model, via ordinary least squares (OLS).
@@ -92,41 +110,61 @@ class Feols:
         else:
 
             self.tXZ = np.transpose(self.X) @ self.Z
-            self.tZZinv = np.linalg.inv(np.transpose(self.Z) @ self.Z)
+            self.tZZ = np.transpose(self.Z) @ self.Z
+            self.tZZinv = np.linalg.inv(self.tZZ)
+            # cached for first stage and weak instrument diagnostics
+            self.tXX = np.transpose(self.X) @ self.X
             self.beta_hat = (np.linalg.inv(self.tXZ @ self.tZZinv @ self.tZX) @ self.tXZ @ self.tZZinv @ self.tZy).flatten()
 
         self.Y_hat = (self.X @ self.beta_hat)
         self.u_hat = (self.Y.flatten() - self.Y_hat)
 
-    def get_vcov(self, vcov: Union[str, Dict[str, str], List[str]]) -> None:
+        # scores and leverage are shared by all vcov types and only computed once
+        self._scores = None
+        self._leverage = None
+        self._vcov_cache = dict()
+
+    def get_vcov(self, vcov: Union[str, Dict[str, str], List[str]], vcov_fix: bool = True) -> None:
         '''
         Compute covariance matrices for an estimated regression model.
 
         Parameters
         ----------
-        vcov : Union[str, Dict[str, str], List[str]]
-            A string or dictionary specifying the type of variance-covariance matrix to use for inference.
+        vcov : Union[str, Dict[str, str], List[Union[str, Dict[str, str]]]]
+            A string or dictionary specifying the type of variance-covariance matrix to use for inference,
+            or a list of strings and dictionaries. If a list, all vcov types are computed from the same
+            scores and stored, and the first vcov type is used for inference.
             If a string, can be one of "iid", "hetero", "HC1", "HC2", "HC3".
             If a dictionary, it should have the format {"CRV1":"clustervar"} for CRV1 inference
             or {"CRV3":"clustervar"} for CRV3 inference.
-            Note that CRV3 inference is currently not supported with arbitrary fixed effects and IV estimation.
+            Multiway clustering is supported for CRV1 inference via {"CRV1":"clustervar1+clustervar2"}.
+            Conley spatial HAC inference is supported via {"conley": ("lat", "lon", cutoff)}, with lat and lon
+            the names of the latitude and longitude columns in degrees and cutoff the distance cutoff in km.
+            By default, a uniform kernel is used. A Bartlett kernel can be chosen via
+            {"conley": ("lat", "lon", cutoff, "bartlett")}.
+            Driscoll-Kraay inference is supported via {"DK": "time"} and panel Newey-West inference via
+            {"NW": ("unit", "time")}. The number of lags can be set via {"DK": ("time", lag)} and
+            {"NW": ("unit", "time", lag)}. By default, the lag is floor(4 * (T / 100)^(2/9)), with T the
+            number of distinct time periods. Lags count observed time periods, i.e. gaps in the time
+            variable are ignored. Lags are weighted by a Bartlett kernel.
+            Note that CRV3 inference is currently not supported with IV estimation.
+        vcov_fix : bool, optional
+            Only relevant for multiway clustering. If True (default), negative eigenvalues of the
+            multiway clustered covariance matrix are set to zero, as suggested by Cameron, Gelbach
+            and Miller (2011).
 
         Raises
         ------
         AssertionError
             If vcov is not a dict, string, or list.
         AssertionError
-            If vcov is a dict and the key is not "CRV1" or "CRV3".
+            If vcov is a dict and the key is not "CRV1", "CRV3", "conley", "DK" or "NW".
         AssertionError
-            If vcov is a dict and the value is not a string.
+            If vcov is a dict and the value is not a string, or not a tuple for Conley and Newey-West inference.
         AssertionError
             If vcov is a dict and the value is not a column in the data.
         AssertionError
-            CRV3 currently not supported with arbitrary fixed effects
-        AssertionError
-            If vcov is a list and it does not contain strings.
-        AssertionError
-            If vcov is a list and it does not contain columns in the data.
+            If vcov is a list and any of its elements is not a valid vcov type.
         AssertionError
             If vcov is a string and it is not one of "iid", "hetero", "HC1", "HC2", or "HC3".
 
@@ -137,7 +175,170 @@ class Feols:
 
         '''
 
-        _check_vcov_input(vcov, self.data)
+        vcov_list = self._check_vcov(vcov)
+
+        with self._inference_lock:
+
+            # the active inference results, restored if a computation fails
+            active = {attr: getattr(self, attr) for attr in _VCOV_ATTRIBUTES if hasattr(self, attr)}
+
+            try:
+                for v in vcov_list:
+                    key = (_get_vcov_key(v), vcov_fix)
+                    if key not in self._vcov_cache:
+                        self._get_vcov(v, vcov_fix)
+                        self.get_inference()
+                        self._vcov_cache[key] = {attr: getattr(self, attr) for attr in _VCOV_ATTRIBUTES if hasattr(self, attr)}
+            except Exception:
+                for attr, value in active.items():
+                    setattr(self, attr, value)
+                raise
+
+            # set the first vcov type as the active one
+            key = (_get_vcov_key(vcov_list[0]), vcov_fix)
+            for attr, value in self._vcov_cache[key].items():
+                setattr(self, attr, value)
+            self.vcov_log = vcov_list[0]
+
+            # an explicit call to get_vcov() overrides any pending vcov type. the pending
+            # vcov type is only cleared once all inference results have been assigned
+            self._vcov_spec = None
+
+    def set_vcov(self, vcov: Union[str, Dict[str, str], List[Union[str, Dict[str, str]]]], vcov_fix: bool = True) -> None:
+        '''
+        Set the type of covariance matrix used for inference, without computing it.
+        The covariance matrix, standard errors, t-statistics, p-values and confidence intervals
+        are computed lazily on first access, and results are memoised per vcov type. The vcov
+        input is validated immediately.
+
+        Parameters
+        ----------
+        vcov : Union[str, Dict[str, str], List[Union[str, Dict[str, str]]]]
+            The vcov type(s). See `get_vcov()` for details.
+        vcov_fix : bool, optional
+            Only relevant for multiway clustering. See `get_vcov()` for details.
+
+        Returns
+        -------
+        None
+        '''
+
+        vcov_list = self._check_vcov(vcov)
+
+        with self._inference_lock:
+            self._vcov_spec = (vcov, vcov_fix)
+            self.vcov_log = vcov_list[0]
+
+    def _update_inference(self) -> None:
+        '''
+        Compute the covariance matrix and inference for a vcov type set via `set_vcov()`,
+        if it has not been computed yet. If the computation fails, the vcov type stays pending
+        and the error is raised again on the next access.
+        '''
+
+        if self._vcov_spec is None:
+            return
+
+        with self._inference_lock:
+            # another thread may have computed the inference while we waited for the lock
+            if self._vcov_spec is not None:
+                vcov, vcov_fix = self._vcov_spec
+                self.get_vcov(vcov, vcov_fix)
+
+    def _check_vcov(self, vcov):
+        '''
+        Validate the vcov input, so that invalid vcov types raise an error even if the
+        covariance matrix is computed lazily.
+        Args:
+            vcov (Union[str, Dict[str, str], List[Union[str, Dict[str, str]]]]): The vcov type(s).
+        Returns:
+            A list of vcov types.
+        '''
+
+        if isinstance(vcov, list):
+            vcov_list = vcov
+        else:
+            vcov_list = [vcov]
+
+        if len(vcov_list) == 0:
+            raise ValueError("vcov list must not be empty.")
+
+        for v in vcov_list:
+
+            _check_vcov_input(v, self.data)
+            vcov_type, vcov_type_detail, is_clustered, clustervar = _deparse_vcov_input(v, self.has_fixef, self.is_iv)
+
+            if is_clustered:
+                clustervar_list = clustervar.split("+")
+                if vcov_type_detail == "CRV3":
+                    if self.is_iv:
+                        raise ValueError("CRV3 inference is not supported with IV estimation.")
+                    if len(clustervar_list) > 1:
+                        raise ValueError("CRV3 inference is not supported with multiway clustering.")
+                if self.data[clustervar_list].isna().any(axis = None):
+                    raise ValueError("CRV inference not supported with missing values in the cluster variable. Please drop missing values before running the regression.")
+
+            if vcov_type_detail == "conley":
+                if self.data[list(list(v.values())[0][:2])].isna().any(axis = None):
+                    raise ValueError("Conley inference not supported with missing values in the coordinates. Please drop missing values before running the regression.")
+
+            if vcov_type == "HAC":
+                unit, time, _ = _get_hac_spec(vcov_type_detail, list(v.values())[0])
+                hac_vars = [time] if unit is None else [unit, time]
+                if self.data[hac_vars].isna().any(axis = None):
+                    raise ValueError("HAC inference not supported with missing values in the unit or time variable. Please drop missing values before running the regression.")
+
+        return vcov_list
+
+    @property
+    def vcov(self):
+        self._update_inference()
+        return self._vcov
+
+    @vcov.setter
+    def vcov(self, value):
+        self._vcov = value
+
+    @property
+    def se(self):
+        self._update_inference()
+        return self._se
+
+    @se.setter
+    def se(self, value):
+        self._se = value
+
+    @property
+    def tstat(self):
+        self._update_inference()
+        return self._tstat
+
+    @tstat.setter
+    def tstat(self, value):
+        self._tstat = value
+
+    @property
+    def pvalue(self):
+        self._update_inference()
+        return self._pvalue
+
+    @pvalue.setter
+    def pvalue(self, value):
+        self._pvalue = value
+
+    @property
+    def conf_int(self):
+        self._update_inference()
+        return self._conf_int
+
+    @conf_int.setter
+    def conf_int(self, value):
+        self._conf_int = value
+
+    def _get_vcov(self, vcov: Union[str, Dict[str, str]], vcov_fix: bool = True) -> None:
+        '''
+        Compute the covariance matrix for a single vcov type. See `get_vcov()` for details.
+        '''
 
         self.vcov_type, self.vcov_type_detail, self.is_clustered, self.clustervar = _deparse_vcov_input(vcov, self.has_fixef, self.is_iv)
 
@@ -176,123 +377,164 @@ class Feols:
             )
 
             if self.vcov_type_detail in ["hetero", "HC1"]:
-                u = self.u_hat
-            elif self.vcov_type_detail in ["HC2", "HC3"]:
-                leverage = np.sum(self.X * (self.X @ self.tZXinv), axis=1)
+                scores = self._get_scores()
+            else:
+                # observations with a leverage of one (e.g. singleton fixed effects) have
+                # a residual of zero and do not contribute to the meat
+                one_minus_leverage = 1 - self._get_leverage()
+                singular = one_minus_leverage < 1e-10
+                one_minus_leverage[singular] = 1
                 if self.vcov_type_detail == "HC2":
-                    u = self.u_hat / np.sqrt(1 - leverage)
+                    adj = 1 / np.sqrt(one_minus_leverage)
                 else:
-                    u = self.u_hat / (1-leverage)
+                    adj = 1 / one_minus_leverage
+                adj[singular] = 0
+                scores = self._get_scores() * adj.reshape((self.N, 1))
 
-            if self.is_iv == False:
-                meat = np.transpose(self.Z) * (u ** 2) @ self.Z
-                self.vcov =  self.ssc * self.tZXinv @ meat @  self.tZXinv
-            else:
-                if u.ndim == 1:
-                    u = u.reshape((self.N,1))
-                Omega = np.transpose(self.Z) @ (self.Z * (u ** 2))  # k x k
-                meat = self.tXZ @ self.tZZinv  @ Omega  @ self.tZZinv @ self.tZX # k x k
-                bread = np.linalg.inv(self.tXZ @ self.tZZinv @ self.tZX)
-                self.vcov = self.ssc * bread @ meat @ bread
+            Omega = np.transpose(scores) @ scores
 
+            self.vcov = self.ssc * self._get_sandwich(Omega)
 
+        elif self.vcov_type == "conley":
 
-        elif self.vcov_type == "CRV":
+            lat, lon, cutoff, kernel = _get_conley_spec(list(vcov.values())[0])
+
+            self.ssc = get_ssc(
+                ssc_dict = self.ssc_dict,
+                N = self.N,
+                k = self.k,
+                G = 1,
+                vcov_sign = 1,
+                vcov_type = "hetero"
+            )
 
-            cluster_df = self.data[self.clustervar]
-            # if there are missings - delete them!
+            Omega = _get_conley_meat(
+                scores = self._get_scores(),
+                lat = self.data[lat].to_numpy().astype(np.float64),
+                lon = self.data[lon].to_numpy().astype(np.float64),
+                cutoff = cutoff,
+                kernel = kernel
+            )
 
-            if cluster_df.dtype != "category":
-                cluster_df = pd.Categorical(cluster_df)
+            self.vcov = self.ssc * self._get_sandwich(Omega)
 
-            if cluster_df.isna().any():
-                raise ValueError("CRV inference not supported with missing values in the cluster variable. Please drop missing values before running the regression.")
+        elif self.vcov_type == "HAC":
 
-            _, clustid = pd.factorize(cluster_df)
+            unit, time, lag = _get_hac_spec(self.vcov_type_detail, list(vcov.values())[0])
+            time_index = _get_time_index(self.data[time])
 
-            self.G = len(clustid)
+            if lag is None:
+                T = np.max(time_index) + 1
+                lag = int(np.floor(4 * (T / 100) ** (2 / 9)))
 
             self.ssc = get_ssc(
                 ssc_dict = self.ssc_dict,
                 N = self.N,
                 k = self.k,
-                G = self.G,
+                G = 1,
                 vcov_sign = 1,
-                vcov_type = "CRV"
+                vcov_type = "hetero"
             )
 
+            if self.vcov_type_detail == "DK":
+                Omega = _get_dk_meat(self._get_scores(), time_index, lag)
+            else:
+                unit_codes, _ = pd.factorize(self.data[unit])
+                Omega = _get_nw_meat(self._get_scores(), unit_codes, time_index, lag)
+
+            self.vcov = self.ssc * self._get_sandwich(Omega)
+
+        elif self.vcov_type == "CRV":
+
+            clustervar_list = self.clustervar.split("+")
+            cluster_codes, cluster_G = _get_cluster_codes(self.data, clustervar_list)
+
+            # for multiway clustering, G is the smallest number of clusters
+            # in any of the clustering dimensions (used for the t-distribution df)
+            self.G = np.min(cluster_G)
+
             if self.vcov_type_detail == "CRV1":
 
+                # scores are computed once and shared across all terms of the
+                # Cameron-Gelbach-Miller inclusion-exclusion formula
+                scores = self._get_scores()
 
                 k_instruments = self.Z.shape[1]
                 meat = np.zeros((k_instruments, k_instruments))
 
-                for _, g, in enumerate(clustid):
+                for codes, G, vcov_sign in _get_multiway_cluster_terms(cluster_codes):
+
+                    if self.ssc_dict['cluster_df'] == "min":
+                        G = cluster_G
+
+                    ssc = get_ssc(
+                        ssc_dict = self.ssc_dict,
+                        N = self.N,
+                        k = self.k,
+                        G = G,
+                        vcov_sign = vcov_sign,
+                        vcov_type = "CRV"
+                    )
 
-                    Zg = self.Z[np.where(cluster_df == g)]
-                    ug = self.u_hat[np.where(cluster_df == g)]
-                    score_g = (np.transpose(Zg) @ ug).reshape((k_instruments, 1))
-                    meat += np.dot(score_g, score_g.transpose())
+                    score_g = _segment_sum(scores, codes, np.max(codes) + 1)
+                    meat += ssc * (np.transpose(score_g) @ score_g)
+
+                # small sample corrections are already applied to each term of the meat
+                self.ssc = 1
 
                 if self.is_iv == False:
-                    self.vcov = self.ssc * self.tZXinv @ meat @ self.tZXinv
+                    self.vcov = self.tZXinv @ meat @ self.tZXinv
                 else:
                     meat = self.tXZ @ self.tZZinv @ meat @ self.tZZinv @ self.tZX
                     bread = np.linalg.inv(self.tXZ @ self.tZZinv @ self.tZX)
-                    self.vcov = self.ssc * bread @ meat @ bread
+                    self.vcov = bread @ meat @ bread
+
+                if len(clustervar_list) > 1 and vcov_fix:
+                    self.vcov = _fix_vcov_eigenvalues(self._vcov)
 
             elif self.vcov_type_detail == "CRV3":
 
-                # check: is fixed effect cluster fixed effect?
-                # if not, either error or turn fixefs into dummies
-                # for now: don't allow for use with fixed effects
+                if len(clustervar_list) > 1:
+                    raise ValueError("CRV3 inference is not supported with multiway clustering.")
 
-                #if self.has_fixef:
-                #    raise ValueError("CRV3 inference is currently not supported with fixed effects.")
+                self.ssc = get_ssc(
+                    ssc_dict = self.ssc_dict,
+                    N = self.N,
+                    k = self.k,
+                    G = self.G,
+                    vcov_sign = 1,
+                    vcov_type = "CRV"
+                )
 
                 if self.is_iv:
                     raise ValueError("CRV3 inference is not supported with IV estimation.")
 
-                k_params = self.k
-
                 beta_hat = self.beta_hat
 
-                clusters = clustid
                 n_groups = self.G
-                group = cluster_df
-
-                beta_jack = np.zeros((n_groups, k_params))
-
-
-                if self.has_fixef == False:
-                    # inverse hessian precomputed?
-                    tXX = np.transpose(self.X) @ self.X
-                    tXy = np.transpose(self.X) @ self.Y
+                group = cluster_codes[:, 0]
 
-                    # compute leave-one-out regression coefficients (aka clusterjacks')
-                    for ixg, g in enumerate(clusters):
+                if self.has_fixef == False or _is_nested(_get_fixef_codes(self.data, self.fixef), group):
 
-                        Xg = self.X[np.equal(ixg, group)]
-                        Yg = self.Y[np.equal(ixg, group)]
-                        tXgXg = np.transpose(Xg) @ Xg
-                        # jackknife regression coefficient
-                        beta_jack[ixg,:] = (
-                            np.linalg.pinv(tXX - tXgXg) @ (tXy - np.transpose(Xg) @ Yg)
-                        ).flatten()
+                    # compute leave-one-out regression coefficients (aka clusterjacks') from
+                    # per-cluster cross-products. If all fixed effects are nested within the
+                    # clusters, dropping a cluster drops all observations of the respective fixed
+                    # effect levels, and the demeaned data of all other clusters is unaffected. In
+                    # consequence, the leave-one-cluster-out estimates can be computed from the demeaned data.
+                    beta_jack = _crv3_jackknife(self.X, self.Y, group, n_groups)
 
                 else:
 
-                    # lazy loading to avoid circular import
-                    fixest_module = import_module('pyfixest.fixest')
-                    Fixest_ = getattr(fixest_module, 'Fixest')
+                    # fixed effects are not nested within clusters: the data needs to be demeaned
+                    # again for each leave-one-cluster-out sample. This is done in parallel over
+                    # all clusters, based on the model matrix of the full sample.
+                    if n_groups * self.N > _CRV3_JACKKNIFE_WARN_SIZE:
+                        warnings.warn("CRV3 inference with fixed effects that are not nested within the clusters demeans the data once per cluster. With " + str(n_groups) + " clusters and " + str(self.N) + " observations, this may be slow.")
+                    fe = _get_fixef_codes(self.data, self.fixef)
 
-                    for ixg, g in enumerate(clusters):
-                        # direct leave one cluster out implementation
-                        data = self.data[~np.equal(ixg, group)]
-                        model = Fixest_(data)
-                        model.feols(self.fml, vcov = "iid")
-                        beta_jack[ixg,:] = model.coef()["Estimate"].to_numpy()
+                    Y_raw, X_raw = self._get_model_matrix()
 
+                    beta_jack = demean_jackknife(Y_raw, X_raw, fe, group, n_groups)
 
                 # optional: beta_bar in MNW (2022)
                 #center = "estimate"
@@ -302,13 +544,84 @@ class Feols:
                 #    beta_center = np.mean(beta_jack, axis = 0)
                 beta_center = beta_hat
 
-                vcov = np.zeros((k_params, k_params))
-                for ixg, g in enumerate(clusters):
-                    beta_centered = beta_jack[ixg,:] - beta_center
-                    vcov += np.outer(beta_centered, beta_centered)
+                beta_centered = beta_jack - beta_center
+                vcov = np.transpose(beta_centered) @ beta_centered
 
                 self.vcov = self.ssc * vcov
 
+    def _get_sandwich(self, Omega):
+
+        '''
+        Compute the sandwich A Omega A for a meat matrix Omega of the scores, with A the bread
+        of the OLS or IV estimator.
+        Args:
+            Omega (np.ndarray): A k_instruments x k_instruments meat matrix.
+        Returns:
+            A k x k matrix.
+        '''
+
+        if self.is_iv == False:
+            return self.tZXinv @ Omega @ self.tZXinv
+        else:
+            meat = self.tXZ @ self.tZZinv  @ Omega  @ self.tZZinv @ self.tZX # k x k
+            bread = np.linalg.inv(self.tXZ @ self.tZZinv @ self.tZX)
+            return bread @ meat @ bread
+
+    def _get_model_matrix(self):
+
+        '''
+        Recreate the dependent variable and the covariates of the estimation sample before demeaning.
+        Returns:
+            Y_raw (np.ndarray): The dependent variable.
+            X_raw (np.ndarray): An N x k matrix of covariates, in the order of coefnames.
+        '''
+
+        if self._model_spec is not None:
+            # reuse the spec of the estimation, so that the columns are encoded identically
+            Y_raw, X_raw = self._model_spec.get_model_matrix(self.data)
+            Y_raw = Y_raw[[self.fml.split("~")[0].strip()]]
+        else:
+            Y_raw, X_raw = model_matrix(self.fml.split("|")[0], self.data)
+        if Y_raw.shape[0] != self.N:
+            raise ValueError("The model matrix could not be recreated for the estimation sample.")
+
+        Y_raw = Y_raw.iloc[:, 0].to_numpy().astype(np.float64)
+        X_raw = X_raw[list(self.coefnames)].to_numpy().astype(np.float64)
+
+        return Y_raw, X_raw
+
+    def _get_scores(self):
+        '''
+        Compute the scores Z_i * u_i, which are shared by all heteroskedasticity-robust and
+        cluster-robust covariance matrices. The scores are computed once and then cached.
+        Returns:
+            An N x k_instruments array of scores.
+        '''
+
+        if self._scores is None:
+            self._scores = self.Z * self.u_hat.reshape((self.N, 1))
+
+        return self._scores
+
+    def _get_leverage(self):
+        '''
+        Compute the diagonal of the hat matrix, as required for HC2 and HC3 inference.
+        For models with fixed effects, the leverage includes the fixed effects, without
+        creating dummy variables (see `_get_fixef_leverage()`). The leverage is computed
+        once and then cached.
+        Returns:
+            An array of length N.
+        '''
+
+        if self._leverage is None:
+            self._leverage = np.sum(self.X * (self.X @ self.tZXinv), axis=1)
+            if self.has_fixef:
+                # by FWL, the leverage of the full model is the sum of the leverage
+                # of the fixed effects and the leverage of the demeaned covariates
+                self._leverage += _get_fixef_leverage(_get_fixef_codes(self.data, self.fixef))
+
+        return self._leverage
+
     def get_inference(self, alpha = 0.95):
         '''
         Compute standard errors, t-statistics and p-values for the regression model.
@@ -324,55 +637,227 @@ class Feols:
 
         '''
 
+        # the attributes are read directly, as the properties would trigger the
+        # computation of a pending vcov type
         self.se = (
-            np.sqrt(np.diagonal(self.vcov))
+            np.sqrt(np.diagonal(self._vcov))
         )
 
         self.tstat = (
-            self.beta_hat / self.se
+            self.beta_hat / self._se
         )
 
-        if self.vcov_type in ["iid", "hetero"]:
+        if self.vcov_type in ["iid", "hetero", "conley", "HAC"]:
             df = self.N - self.k
         else:
             df = self.G - 1
         self.pvalue = (
-            2*(1-t.cdf(np.abs(self.tstat), df))
+            2*(1-t.cdf(np.abs(self._tstat), df))
         )
 
         z = norm.ppf(1 - (alpha / 2))
         self.conf_int = (
-            np.array([z * self.se - self.beta_hat, z * self.se + self.beta_hat])
+            np.array([z * self._se - self.beta_hat, z * self._se + self.beta_hat])
         )
 
 
     def get_Ftest(self, vcov, is_iv = False):
 
         '''
-        compute an F-test statistic of the form H0: R*beta = q
-        Args: is_iv (bool): If True, the F-test is computed for the first stage regression of an IV model. Default is False.
+        compute an F-test statistic of the form H0: R*beta = q. If is_iv is False, the null hypothesis is that
+        all coefficients except the intercept are zero. If is_iv is True, the F-test is computed for the first stage
+        regression of the endogenous variable, with the null hypothesis that all coefficients of the excluded
+        instruments are zero.
+        Args:
+            vcov (Union[str, Dict[str, str]]): The vcov type used for the F-test. See `get_vcov()` for details.
+            is_iv (bool): If True, the F-test is computed for the first stage regression of an IV model. Default is False.
         Returns: None
         '''
 
-        R = np.ones(self.k).reshape((1, self.k))
-        q = 0
-        beta = self.beta_hat
-        Rbetaq = R @ beta - q
-        #Rbetaq = self.beta_hat
+        if is_iv:
+            model = self._get_first_stage()
+            model.get_vcov(vcov = vcov)
+            restricted = [x not in list(self.coefnames) for x in model.coefnames]
+        else:
+            model = self
+            restricted = [x != "Intercept" for x in model.coefnames]
 
-        if self.is_iv:
-            first_stage = Feols(self.Y, self.Z, self.Z)
-            first_stage.get_fit()
-            first_stage.get_vcov(vcov = vcov)
-            vcov = first_stage.vcov
+        R = np.eye(model.k)[restricted]
+        res = model.wald_test(R)
+
+        self.F_stat = res["statistic"].iloc[0]
+        self.F_pvalue = res["pvalue"].iloc[0]
+
+
+    def _get_first_stage(self):
+
+        '''
+        Create the first stage regression of an IV model, i.e. the regression of the endogenous variable
+        on all exogenous variables and instruments, with the same data, fixed effects and small sample corrections.
+        Returns:
+            An object of type "Feols".
+        '''
+
+        if not self.is_iv:
+            raise ValueError("The first stage regression is only available for IV models.")
+
+        endogvar = [x for x in self.coefnames if x not in list(self.zcolnames)]
+        if len(endogvar) != 1:
+            raise ValueError("The first stage regression is only supported for a single endogenous variable.")
+
+        endog = self.X[:, [list(self.coefnames).index(endogvar[0])]]
+
+        first_stage = Feols(endog, self.Z, self.Z)
+        first_stage.is_iv = False
+        first_stage.fml = endogvar[0] + " ~ " + "+".join(self.zcolnames)
+        first_stage.ssc_dict = self.ssc_dict
+        first_stage.get_fit(estimator = "ols")
+        first_stage.data = self.data
+        first_stage.na_index = self.na_index
+        first_stage.na_mask = self.na_mask
+        first_stage.has_fixef = self.has_fixef
+        if self.has_fixef:
+            first_stage.fixef = self.fixef
+            first_stage.fml = first_stage.fml + "|" + self.fixef
+        first_stage.coefnames = self.zcolnames
+        first_stage.zcolnames = self.zcolnames
+
+        return first_stage
+
+
+    def get_IV_diag(self) -> pd.Series:
+
+        '''
+        Compute first stage, reduced form and weak instrument diagnostics for an IV model with a single
+        endogenous variable. All statistics are derived from the cross-products Z'X, Z'Z, Z'y and X'X
+        cached in `get_fit()`. Only the robust statistics require one pass over the first stage residuals.
+        Heteroskedasticity-robust statistics are computed for models with iid or heteroskedastic inference,
+        cluster-robust statistics for models with cluster-robust inference.
+
+        The following attributes are set:
+            first_stage_coef (pd.Series): The first stage coefficients of the endogenous variable.
+            reduced_form_coef (pd.Series): The reduced form coefficients of the dependent variable.
+            F_first_stage (float): The conventional first stage F-statistic of the excluded instruments.
+            F_KP (float): The Kleibergen-Paap rk Wald F-statistic. With a single endogenous variable,
+                this is the robust first stage F-statistic of the excluded instruments.
+            F_eff (float): The effective F-statistic of Montiel Olea and Pflueger (2013).
+
+        Returns:
+            A pd.Series with the F-statistics.
+        '''
+
+        if not self.is_iv:
+            raise ValueError("IV diagnostics are only available for IV models.")
+
+        coefnames = list(self.coefnames)
+        zcolnames = list(self.zcolnames)
+        endogvar = [x for x in coefnames if x not in zcolnames]
+        if len(endogvar) != 1:
+            raise ValueError("IV diagnostics are only supported for a single endogenous variable.")
+
+        e = coefnames.index(endogvar[0])
+        excl = [i for i, x in enumerate(zcolnames) if x not in coefnames]
+        q = len(excl)
+        lz = len(zcolnames)
+
+        # first stage and reduced form coefficients
+        tZx = self.tZX[:, e]
+        pi = self.tZZinv @ tZx
+        rho = self.tZZinv @ self.tZy.flatten()
+        pi_excl = pi[excl]
+
+        # conventional F-statistic
+        rss = self.tXX[e, e] - pi @ tZx
+        sigma2 = rss / (self.N - lz)
+        vcov_iid = sigma2 * self.tZZinv[np.ix_(excl, excl)]
+        F_first_stage = pi_excl @ np.linalg.solve(vcov_iid, pi_excl) / q
+
+        # robust F-statistics
+        self._update_inference()
+        first_stage_scores = self.Z * (self.X[:, e] - self.Z @ pi).reshape((self.N, 1))
+        if self.is_clustered:
+            clustervar_list = self.clustervar.split("+")
+            if len(clustervar_list) > 1:
+                raise ValueError("IV diagnostics are not supported with multiway clustering.")
+            cluster_codes, cluster_G = _get_cluster_codes(self.data, clustervar_list)
+            first_stage_scores = _segment_sum(first_stage_scores, cluster_codes[:, 0], cluster_G[0])
+            ssc = get_ssc(ssc_dict = self.ssc_dict, N = self.N, k = lz, G = cluster_G[0], vcov_sign = 1, vcov_type = "CRV")
+        else:
+            ssc = get_ssc(ssc_dict = self.ssc_dict, N = self.N, k = lz, G = 1, vcov_sign = 1, vcov_type = "hetero")
+
+        meat = np.transpose(first_stage_scores) @ first_stage_scores
+        vcov_robust = ssc * (self.tZZinv @ meat @ self.tZZinv)[np.ix_(excl, excl)]
+        F_KP = pi_excl @ np.linalg.solve(vcov_robust, pi_excl) / q
+
+        # effective F: the cross-product of the excluded instruments, partialled out on the exogenous variables
+        tZZ_excl = np.linalg.inv(self.tZZinv[np.ix_(excl, excl)])
+        F_eff = (pi_excl @ tZZ_excl @ pi_excl) / np.trace(vcov_robust @ tZZ_excl)
+
+        self.first_stage_coef = pd.Series(pi, index = zcolnames)
+        self.reduced_form_coef = pd.Series(rho, index = zcolnames)
+        self.F_first_stage = F_first_stage
+        self.F_KP = F_KP
+        self.F_eff = F_eff
+
+        return pd.Series({
+            'F_first_stage': F_first_stage,
+            'F_KP': F_KP,
+            'F_eff': F_eff
+        })
+
+
+    def wald_test(self, R: Union[np.ndarray, List[np.ndarray]], q: Union[np.ndarray, List[np.ndarray], None] = None) -> pd.DataFrame:
+
+        '''
+        Compute Wald tests of one or many linear hypotheses of the form H0: R*beta = q, based on the
+        covariance matrix of the model. Hypotheses with the same number of restrictions are evaluated
+        jointly, with one batched solve of the stacked matrices R V R'.
+
+        Args:
+            R (Union[np.ndarray, List[np.ndarray]]): A m x k matrix of restrictions for a single hypothesis,
+                a H x m x k array of H hypotheses, or a list of matrices with possibly different numbers of restrictions.
+            q (Union[np.ndarray, List[np.ndarray], None]): The values of R*beta under the null hypotheses, of a shape
+                that matches R. Zero by default.
+
+        Returns:
+            A pd.DataFrame with one row per hypothesis, with the F-statistic (Wald statistic divided by the number of
+            restrictions), its p-value and its degrees of freedom.
+        '''
+
+        R_list, q_list = _get_wald_hypotheses(R, q, self.k)
+
+        # triggers the computation of a pending vcov type
+        vcov = self.vcov
+
+        if self.vcov_type == "CRV":
+            df2 = self.G - 1
         else:
-            vcov = self.vcov
+            df2 = self.N - self.k
+
+        statistic = np.zeros(len(R_list))
+        df1 = np.array([R_h.shape[0] for R_h in R_list])
+
+        for m in np.unique(df1):
+            idx = np.where(df1 == m)[0]
+            R_m = np.stack([R_list[i] for i in idx])
+            q_m = np.stack([q_list[i] for i in idx])
+            Rbetaq = R_m @ self.beta_hat - q_m
+            RVR = R_m @ vcov @ np.transpose(R_m, (0, 2, 1))
+            wald = np.sum(Rbetaq * np.linalg.solve(RVR, Rbetaq[:, :, np.newaxis])[:, :, 0], axis = 1)
+            statistic[idx] = wald / m
 
+        res = pd.DataFrame({
+            'hypothesis': np.arange(len(R_list)),
+            'statistic': statistic,
+            'pvalue': 1 - f.cdf(statistic, df1, df2),
+            'df1': df1,
+            'df2': df2
+        }).set_index('hypothesis')
 
-        self.F_stat = Rbetaq @ np.linalg.inv(R @ self.vcov @ np.transpose(R)) @ Rbetaq
+        return res
 
 
-    def get_wildboottest(self, B:int, cluster : Union[np.ndarray, pd.Series, pd.DataFrame, None], param : Union[str, None], weights_type: str, impose_null: bool , bootstrap_type: str, seed: Union[str, None] , adj: bool , cluster_adj: bool):
+    def get_wildboottest(self, B:int, cluster : Union[np.ndarray, pd.Series, pd.DataFrame, None], param : Union[str, None], weights_type: str, impose_null: bool , bootstrap_type: str, seed: Union[int, None] , adj: bool , cluster_adj: bool, conf_int: bool = False, alpha: float = 0.05):
 
         '''
         Run a wild cluster bootstrap based on an object of type "Feols"
@@ -381,74 +866,83 @@ class Feols:
 
         B (int): The number of bootstrap iterations to run
         cluster (Union[None, np.ndarray, pd.Series, pd.DataFrame], optional): If None (default), a 'heteroskedastic' wild boostrap
-            is run. For a wild cluster bootstrap, requires a numpy array of dimension one,a  pandas Series or DataFrame, containing the clustering variable.
+            is run. Otherwise, a wild cluster bootstrap is run, clustered by the cluster variable of the model's vcov.
         param (Union[str, None], optional): A string of length one, containing the test parameter of interest. Defaults to None.
         weights_type (str, optional): The type of bootstrap weights. Either 'rademacher', 'mammen', 'webb' or 'normal'.
                             'rademacher' by default. Defaults to 'rademacher'.
-        impose_null (bool, optional): Should the null hypothesis be imposed on the bootstrap dgp, or not?
+        impose_null (bool, optional): Should the null hypothesis be imposed on the bootstrap dgp (WCR), or not (WCU)?
                             Defaults to True.
         bootstrap_type (str, optional):A string of length one. Allows to choose the bootstrap type
-                            to be run. Either '11', '31', '13' or '33'. '11' by default. Defaults to '11'.
-        seed (Union[str, None], optional): Option to provide a random seed. Defaults to None.
-
-        Returns: a pd.DataFrame with bootstrapped t-statistic and p-value
+                            to be run. Either '11', '31', '13' or '33'. The first digit selects the residuals
+                            of the bootstrap dgp ('3' for leave-one-cluster-out residuals), the second the
+                            variance estimator of the t-statistics ('1' for CRV1, '3' for CRV3). For models with
+                            fixed effects, the jackknife variants are computed from the demeaned data, which is
+                            exact if the fixed effects are nested within the clusters.
+        seed (Union[int, None], optional): Option to provide a random seed. Defaults to None.
+        conf_int (bool, optional): Whether to compute a bootstrap confidence interval by test inversion. Defaults to False.
+        alpha (float, optional): The significance level of the confidence interval. Defaults to 0.05.
+
+        Returns: a pd.Series with bootstrapped t-statistic and p-value, and optionally the bounds of the confidence interval
         '''
 
-        try:
-            from wildboottest.wildboottest import WildboottestCL, WildboottestHC
-        except ImportError:
-            print("Module 'wildboottest' not found. Please install 'wildboottest'. Note that it 'wildboottest 'requires Python < 3.11 due to its dependency on 'numba'.")
+        # lazy loading to avoid circular import
+        from pyfixest.bootstrap import wildboottest
 
         if self.is_iv:
             raise ValueError("Wild cluster bootstrap is not supported with IV estimation.")
-        if self.has_fixef:
-            raise ValueError("Wild cluster bootstrap is not supported with fixed effects.")
+        if bootstrap_type not in ["11", "13", "31", "33"]:
+            raise ValueError("bootstrap_type must be one of '11', '13', '31' or '33'.")
 
-        xnames = self.coefnames.to_list()
-        Y = self.Y.flatten()
-        X = self.X
+        xnames = list(self.coefnames)
 
         # later: allow r <> 0 and custom R
         R = np.zeros(len(xnames))
         R[xnames.index(param)] = 1
         r = 0
 
-        if cluster is None:
-
-            boot = WildboottestHC(X = X, Y = Y, R = R, r = r, B = B, seed = seed)
-            boot.get_adjustments(bootstrap_type = bootstrap_type)
-            boot.get_uhat(impose_null = impose_null)
-            boot.get_tboot(weights_type = weights_type)
-            boot.get_tstat()
-            boot.get_pvalue(pval_type = "two-tailed")
-            full_enumeration_warn = False
-
-        else:
-
-            cluster = self.data[self.clustervar]
-
-            boot = WildboottestCL(X = X, Y = Y, cluster = cluster,
-                                R = R, B = B, seed = seed)
-            boot.get_scores(bootstrap_type = bootstrap_type, impose_null = impose_null, adj=adj, cluster_adj=cluster_adj)
-            _, _, full_enumeration_warn = boot.get_weights(weights_type = weights_type)
-            boot.get_numer()
-            boot.get_denom()
-            boot.get_tboot()
-            boot.get_vcov()
-            boot.get_tstat()
-            boot.get_pvalue(pval_type = "two-tailed")
+        if cluster is not None:
+
+            if len(self.clustervar.split("+")) > 1:
+                raise ValueError("Wild cluster bootstrap is not supported with multiway clustering.")
+
+            cluster = self.data[self.clustervar].to_numpy()
+
+        if "3" in bootstrap_type and self.has_fixef:
+            group = np.arange(self.N) if cluster is None else pd.factorize(cluster)[0]
+            if not _is_nested(_get_fixef_codes(self.data, self.fixef), group):
+                warnings.warn("The fixed effects are not nested within the bootstrap clusters. The leave-one-cluster-out estimates of bootstrap_type '" + bootstrap_type + "' are computed from the demeaned data and only approximate the jackknife.")
+
+        boot = wildboottest(
+            X = self.X,
+            Y = self.Y,
+            cluster = cluster,
+            R = R,
+            r = r,
+            B = B,
+            weights_type = weights_type,
+            impose_null = impose_null,
+            seed = seed,
+            adj = adj,
+            cluster_adj = cluster_adj,
+            conf_int = conf_int,
+            alpha = alpha,
+            bootstrap_type = bootstrap_type
+        )
 
-            if full_enumeration_warn:
-                warnings.warn("2^G < the number of boot iterations, setting full_enumeration to True.")
+        if boot["full_enumeration"]:
+            warnings.warn("2^G < the number of boot iterations, setting full_enumeration to True.")
 
         res = {
             'param':param,
-            'statistic': boot.t_stat,
-            'pvalue': boot.pvalue,
+            'statistic': boot["t_stat"],
+            'pvalue': boot["pvalue"],
             'bootstrap_type': bootstrap_type,
             'impose_null' : impose_null
         }
 
+        if conf_int:
+            res['conf_int'] = boot["conf_int"]
+
         res_df = pd.Series(res)
 
         return res_df
@@ -456,6 +950,102 @@ class Feols:
 
 
 
+    def get_bayesian_bootstrap(self, B: int, cluster: Union[str, None], seed: Union[int, None]):
+
+        '''
+        Run a weighted (Bayesian) bootstrap based on an object of type "Feols"
+
+        Args:
+
+        B (int): The number of bootstrap iterations to run.
+        cluster (Union[str, None]): If provided, bootstrap weights are drawn at the level of the cluster variable.
+        seed (Union[int, None]): Option to provide a random seed.
+
+        Returns: a B x k np.ndarray with bootstrapped coefficients
+        '''
+
+        # lazy loading to avoid circular import
+        from pyfixest.bootstrap import bayesian_bootstrap
+
+        if self.is_iv:
+            raise ValueError("The Bayesian bootstrap is not supported with IV estimation.")
+
+        if self.has_fixef:
+            if "/" in self.fixef:
+                raise ValueError("The Bayesian bootstrap is not supported with varying slopes.")
+            fe = _get_fixef_codes(self.data, self.fixef)
+            Y, X = self._get_model_matrix()
+        else:
+            fe = None
+            Y, X = self.Y, self.X
+
+        return bayesian_bootstrap(
+            X = X,
+            Y = Y,
+            fe = fe,
+            cluster = None if cluster is None else self.data[cluster].to_numpy(),
+            B = B,
+            seed = seed
+        )
+
+
+    def get_ritest(self, param: str, resampvar: str, reps: int, cluster: Union[str, None], strata: Union[str, None], seed: Union[int, None]):
+
+        '''
+        Run a randomization inference test based on an object of type "Feols"
+
+        Args:
+
+        param (str): The test parameter of interest.
+        resampvar (str): The variable to be permuted. Currently, this needs to be the test parameter.
+        reps (int): The number of permutations.
+        cluster (Union[str, None]): If provided, the treatment is permuted at the level of the cluster variable.
+        strata (Union[str, None]): If provided, the treatment is permuted within strata.
+        seed (Union[int, None]): Option to provide a random seed.
+
+        Returns: a pd.Series with the estimated coefficient and the randomization inference p-value
+        '''
+
+        # lazy loading to avoid circular import
+        from pyfixest.ritest import ritest
+
+        if self.is_iv:
+            raise ValueError("Randomization inference is not supported with IV estimation.")
+        if param != resampvar:
+            raise ValueError("Currently, resampvar needs to be the test parameter.")
+        if param not in list(self.coefnames):
+            raise ValueError(f"The parameter {param} is not included in the model.")
+        if resampvar not in self.data.columns:
+            raise ValueError(f"The variable {resampvar} is not included in the data.")
+
+        fe = None
+        if self.has_fixef:
+            if "/" in self.fixef:
+                raise ValueError("Randomization inference is not supported with varying slopes.")
+            fe = _get_fixef_codes(self.data, self.fixef)
+
+        ri = ritest(
+            X = self.X,
+            Y = self.Y,
+            param_index = list(self.coefnames).index(param),
+            treatment = self.data[resampvar].to_numpy(),
+            fe = fe,
+            cluster = None if cluster is None else self.data[cluster].to_numpy(),
+            strata = None if strata is None else self.data[strata].to_numpy(),
+            reps = reps,
+            seed = seed
+        )
+
+        res = {
+            'param': param,
+            'estimate': ri["beta_hat"],
+            'pvalue': ri["pvalue"],
+            'se_pvalue': ri["se_pvalue"]
+        }
+
+        return pd.Series(res)
+
+
     def get_nobs(self):
 
         '''
@@ -479,6 +1069,36 @@ class Feols:
 
 
 
+# CRV3 inference with fixed effects that are not nested within the clusters demeans the data once per
+# cluster. A warning is raised if the number of clusters times the number of observations exceeds this size
+_CRV3_JACKKNIFE_WARN_SIZE = 10 ** 8
+
+
+# attributes set by get_vcov() and get_inference() that are stored per vcov type. vcov, se, tstat,
+# pvalue and conf_int are stored under their private names, so that storing them does not trigger
+# the lazy computation of inference
+_VCOV_ATTRIBUTES = ["_vcov", "vcov_type", "vcov_type_detail", "is_clustered", "clustervar", "ssc", "G", "_se", "_tstat", "_pvalue", "_conf_int"]
+
+
+def _get_vcov_key(vcov):
+
+    '''
+    Create a hashable key for a vcov type, e.g. "HC1" or "CRV1:clustervar".
+    Args:
+        vcov (dict, str): The vcov argument passed to the Feols class.
+    Returns:
+        A string.
+    '''
+
+    if isinstance(vcov, dict):
+        value = list(vcov.values())[0]
+        if isinstance(value, tuple):
+            value = ",".join(str(x) for x in value)
+        return list(vcov.keys())[0] + ":" + value
+
+    return vcov
+
+
 def _check_vcov_input(vcov, data):
 
     '''
@@ -492,12 +1112,28 @@ def _check_vcov_input(vcov, data):
 
     assert isinstance(vcov, (dict, str, list)), "vcov must be a dict, string or list"
     if isinstance(vcov, dict):
-        assert list(vcov.keys())[0] in ["CRV1", "CRV3"], "vcov dict key must be CRV1 or CRV3"
-        assert isinstance(list(vcov.values())[0], str), "vcov dict value must be a string"
-        assert list(vcov.values())[0] in data.columns, "vcov dict value must be a column in the data"
+        assert list(vcov.keys())[0] in ["CRV1", "CRV3", "conley", "DK", "NW"], "vcov dict key must be CRV1, CRV3, conley, DK or NW"
+        if list(vcov.keys())[0] in ["DK", "NW"]:
+            value = list(vcov.values())[0]
+            n_vars = 1 if list(vcov.keys())[0] == "DK" else 2
+            if isinstance(value, str):
+                value = (value,)
+            assert isinstance(value, tuple) and len(value) in [n_vars, n_vars + 1], "vcov dict value for DK must be 'time' or ('time', lag), for NW ('unit', 'time') or ('unit', 'time', lag)"
+            assert all(v in data.columns for v in value[:n_vars]), "HAC unit and time variables must be columns in the data"
+            assert len(value) == n_vars or (isinstance(value[n_vars], int) and value[n_vars] >= 0), "HAC lag must be a non-negative integer"
+        elif list(vcov.keys())[0] == "conley":
+            value = list(vcov.values())[0]
+            assert isinstance(value, tuple) and len(value) in [3, 4], "vcov dict value for conley must be a tuple (lat, lon, cutoff) or (lat, lon, cutoff, kernel)"
+            assert all(v in data.columns for v in value[:2]), "conley coordinates must be columns in the data"
+            assert isinstance(value[2], (int, float)) and value[2] > 0, "conley cutoff must be a positive number"
+            assert len(value) == 3 or value[3] in ["uniform", "bartlett"], "conley kernel must be uniform or bartlett"
+        else:
+            assert isinstance(list(vcov.values())[0], str), "vcov dict value must be a string"
+            assert all(v in data.columns for v in list(vcov.values())[0].split("+")), "vcov dict value must be a column in the data"
     if isinstance(vcov, list):
-        assert all(isinstance(v, str) for v in vcov), "vcov list must contain strings"
-        assert all(v in data.columns for v in vcov), "vcov list must contain columns in the data"
+        assert all(isinstance(v, (dict, str)) for v in vcov), "vcov list must contain strings or dicts"
+        for v in vcov:
+            _check_vcov_input(v, data)
     if isinstance(vcov, str):
         assert vcov in ["iid", "hetero", "HC1", "HC2", "HC3"], "vcov string must be iid, hetero, HC1, HC2, or HC3"
 
@@ -512,21 +1148,20 @@ def _deparse_vcov_input(vcov, has_fixef, is_iv):
         has_fixef (bool): Whether the regression has fixed effects.
         is_iv (bool): Whether the regression is an IV regression.
     Returns:
-        vcov_type (str): The type of vcov to be used. Either "iid", "hetero", or "CRV"
-        vcov_type_detail (str, list): The type of vcov to be used, with more detail. Either "iid", "hetero", "HC1", "HC2", "HC3", "CRV1", or "CRV3"
+        vcov_type (str): The type of vcov to be used. Either "iid", "hetero", "CRV", "conley" or "HAC"
+        vcov_type_detail (str, list): The type of vcov to be used, with more detail. Either "iid", "hetero", "HC1", "HC2", "HC3", "CRV1", "CRV3", "conley", "DK" or "NW"
         is_clustered (bool): Whether the vcov is clustered.
-        clustervar (str): The name of the cluster variable.
+        clustervar (str): The name of the cluster variable. For multiway clustering, the cluster variables
+            are separated by "+", e.g. "clustervar1+clustervar2".
     '''
 
     if isinstance(vcov, dict):
         vcov_type_detail = list(vcov.keys())[0]
         clustervar = list(vcov.values())[0]
-    elif isinstance(vcov, list):
-        vcov_type_detail = vcov
     elif isinstance(vcov, str):
         vcov_type_detail = vcov
     else:
-        assert False, "arg vcov needs to be a dict, string or list"
+        assert False, "arg vcov needs to be a dict or string"
 
     if vcov_type_detail == "iid":
         vcov_type = "iid"
@@ -535,13 +1170,17 @@ def _deparse_vcov_input(vcov, has_fixef, is_iv):
         vcov_type = "hetero"
         is_clustered = False
         if vcov_type_detail in ["HC2", "HC3"]:
-            if has_fixef:
-                raise ValueError("HC2 and HC3 inference types are not supported for regressions with fixed effects.")
             if is_iv:
                 raise ValueError("HC2 and HC3 inference types are not supported for IV regressions.")
     elif vcov_type_detail in ["CRV1", "CRV3"]:
         vcov_type = "CRV"
         is_clustered = True
+    elif vcov_type_detail == "conley":
+        vcov_type = "conley"
+        is_clustered = False
+    elif vcov_type_detail in ["DK", "NW"]:
+        vcov_type = "HAC"
+        is_clustered = False
 
     if is_clustered:
         clustervar = list(vcov.values())[0]
@@ -551,6 +1190,520 @@ def _deparse_vcov_input(vcov, has_fixef, is_iv):
     return vcov_type, vcov_type_detail, is_clustered, clustervar
 
 
+def _get_conley_spec(value):
+
+    '''
+    Unpack the specification of Conley spatial HAC inference.
+    Args:
+        value (tuple): A tuple (lat, lon, cutoff) or (lat, lon, cutoff, kernel).
+    Returns:
+        lat (str), lon (str), cutoff (float) and kernel (str).
+    '''
+
+    lat, lon, cutoff = value[:3]
+    kernel = value[3] if len(value) == 4 else "uniform"
+
+    return lat, lon, float(cutoff), kernel
+
+
+def _get_conley_meat(scores, lat, lon, cutoff, kernel = "uniform", chunk_size = 10_000):
+
+    '''
+    Compute the meat of the Conley (1999) spatial HAC covariance matrix,
+    sum_i sum_j K(d_ij) s_i s_j', with s_i the scores and d_ij the great-circle distance.
+    Pairs of observations within the cutoff are found via a KD-tree on the unit sphere, on which the
+    Euclidean (chord) distance is monotone in the great-circle distance. Neighbours are searched
+    in parallel for chunks of chunk_size observations, and each chunk is accumulated via a sparse
+    chunk_size x N kernel matrix, so that the full list of neighbours is never materialised.
+    Args:
+        scores (np.ndarray): An N x k matrix of scores.
+        lat (np.ndarray): Latitudes in degrees.
+        lon (np.ndarray): Longitudes in degrees.
+        cutoff (float): The distance cutoff in km.
+        kernel (str): Either "uniform" or "bartlett".
+        chunk_size (int): The number of observations for which neighbours are searched at once.
+    Returns:
+        A k x k matrix.
+    '''
+
+    earth_radius = 6371.01
+    N, k = scores.shape
+
+    lat_rad = np.radians(lat)
+    lon_rad = np.radians(lon)
+    points = np.column_stack([
+        np.cos(lat_rad) * np.cos(lon_rad),
+        np.cos(lat_rad) * np.sin(lon_rad),
+        np.sin(lat_rad)
+    ])
+
+    # the chord length of the cutoff on the unit sphere
+    radius = 2 * np.sin(min(cutoff / earth_radius, np.pi) / 2)
+    tree = cKDTree(points)
+
+    meat = np.zeros((k, k))
+    for start in range(0, N, chunk_size):
+
+        stop = min(start + chunk_size, N)
+        neighbours = tree.query_ball_point(points[start:stop], r = radius, workers = -1, return_sorted = False)
+        counts = np.array([len(x) for x in neighbours])
+        cols = np.concatenate(neighbours).astype(np.int64)
+        rows = np.repeat(np.arange(stop - start), counts)
+
+        if kernel == "uniform":
+            weights = np.ones(len(cols))
+        else:
+            chord = np.sqrt(np.sum((points[start + rows] - points[cols]) ** 2, axis = 1))
+            distance = 2 * earth_radius * np.arcsin(np.minimum(chord / 2, 1))
+            weights = np.maximum(1 - distance / cutoff, 0)
+
+        K = sparse.csr_matrix((weights, (rows, cols)), shape = (stop - start, N))
+        meat += np.transpose(scores[start:stop]) @ (K @ scores)
+
+    return meat
+
+
+def _get_hac_spec(vcov_type_detail, value):
+
+    '''
+    Unpack the specification of Driscoll-Kraay and Newey-West inference.
+    Args:
+        vcov_type_detail (str): Either "DK" or "NW".
+        value (str, tuple): "time" or ("time", lag) for DK, ("unit", "time") or ("unit", "time", lag) for NW.
+    Returns:
+        unit (str, None), time (str) and lag (int, None). unit is None for DK, lag is None if not specified.
+    '''
+
+    if isinstance(value, str):
+        value = (value,)
+
+    if vcov_type_detail == "DK":
+        unit = None
+        time = value[0]
+        lag = value[1] if len(value) == 2 else None
+    else:
+        unit, time = value[:2]
+        lag = value[2] if len(value) == 3 else None
+
+    return unit, time, lag
+
+
+def _get_time_index(time):
+
+    '''
+    Map a time variable to integer periods 0, ..., T-1, the ranks of the sorted unique values of
+    the time variable. This holds for all time variables, including integer valued ones: gaps between
+    observed periods are not kept, so that lags count observed periods and calendar codes such as
+    YYYYMMDD dates or epoch timestamps do not inflate T.
+    Args:
+        time (pd.Series): The time variable.
+    Returns:
+        An array of integer periods.
+    '''
+
+    codes, _ = pd.factorize(time, sort = True)
+    return codes.astype(np.int64)
+
+
+def _get_dk_meat(scores, time_index, lag):
+
+    '''
+    Compute the meat of the Driscoll-Kraay (1998) covariance matrix. The scores are summed per time period,
+    and the Newey-West estimator is applied to the time series of summed scores:
+    Gamma_0 + sum_l w_l (Gamma_l + Gamma_l'), with Gamma_l = sum_t h_t h_{t-l}' and w_l = 1 - l / (lag + 1).
+    Each lag term is a single T x k matrix product, so the cost is O(N + T * lag * k^2).
+    Args:
+        scores (np.ndarray): An N x k matrix of scores.
+        time_index (np.ndarray): An array of integer periods, as returned by `_get_time_index()`.
+        lag (int): The number of lags.
+    Returns:
+        A k x k matrix.
+    '''
+
+    T = np.max(time_index) + 1
+    H = _segment_sum(scores, time_index, T)
+
+    meat = np.transpose(H) @ H
+    for l in range(1, min(lag, T - 1) + 1):
+        Gamma = np.transpose(H[l:]) @ H[:T - l]
+        meat += (1 - l / (lag + 1)) * (Gamma + np.transpose(Gamma))
+
+    return meat
+
+
+def _get_nw_meat(scores, unit_codes, time_index, lag):
+
+    '''
+    Compute the meat of the panel Newey-West covariance matrix, which allows for serial correlation
+    within units: sum_i [Gamma_i0 + sum_l w_l (Gamma_il + Gamma_il')], with Gamma_il = sum_t s_it s_i,t-l'
+    and w_l = 1 - l / (lag + 1). For each lag, the lagged observation of each observation is found
+    via a binary search over sorted unit-period keys.
+    Args:
+        scores (np.ndarray): An N x k matrix of scores.
+        unit_codes (np.ndarray): An array of integer unit codes.
+        time_index (np.ndarray): An array of integer periods, as returned by `_get_time_index()`.
+        lag (int): The number of lags.
+    Returns:
+        A k x k matrix.
+    '''
+
+    T = np.max(time_index) + 1
+    keys = unit_codes.astype(np.int64) * T + time_index
+
+    order = np.argsort(keys, kind = "stable")
+    sorted_keys = keys[order]
+    if np.any(np.diff(sorted_keys) == 0):
+        raise ValueError("NW inference requires unique unit-time observations.")
+
+    meat = np.transpose(scores) @ scores
+    for l in range(1, min(lag, T - 1) + 1):
+        has_lag = time_index >= l
+        pos = np.searchsorted(sorted_keys, keys[has_lag] - l)
+        pos = np.minimum(pos, len(sorted_keys) - 1)
+        found = sorted_keys[pos] == keys[has_lag] - l
+        Gamma = np.transpose(scores[has_lag][found]) @ scores[order[pos[found]]]
+        meat += (1 - l / (lag + 1)) * (Gamma + np.transpose(Gamma))
+
+    return meat
+
+
+def _get_wald_hypotheses(R, q, k):
+
+    '''
+    Bring the restrictions of one or many linear hypotheses H0: R*beta = q into a common format.
+    Args:
+        R (np.ndarray, list): A m x k matrix, a H x m x k array or a list of m_h x k matrices.
+        q (np.ndarray, list, None): The values of R*beta under the null hypotheses. Zero if None.
+        k (int): The number of coefficients.
+    Returns:
+        R_list (list): A list of m_h x k matrices.
+        q_list (list): A list of vectors of length m_h.
+    '''
+
+    if isinstance(R, list):
+        R_list = [np.atleast_2d(np.asarray(R_h, dtype = np.float64)) for R_h in R]
+    else:
+        R = np.asarray(R, dtype = np.float64)
+        if R.ndim == 1:
+            R = R.reshape((1, -1))
+        R_list = [R] if R.ndim == 2 else list(R)
+
+    if q is None:
+        q_list = [np.zeros(R_h.shape[0]) for R_h in R_list]
+    elif isinstance(q, list):
+        q_list = [np.atleast_1d(np.asarray(q_h, dtype = np.float64)) for q_h in q]
+    else:
+        q = np.asarray(q, dtype = np.float64)
+        q_list = [np.atleast_1d(q)] if len(R_list) == 1 and q.ndim <= 1 else list(np.atleast_2d(q))
+
+    if len(q_list) != len(R_list):
+        raise ValueError("R and q must contain the same number of hypotheses.")
+    for R_h, q_h in zip(R_list, q_list):
+        if R_h.shape[1] != k:
+            raise ValueError(f"R must have {k} columns, one for each coefficient.")
+        if R_h.shape[0] != len(q_h):
+            raise ValueError("The number of restrictions in R and q must match.")
+
+    return R_list, q_list
+
+
+def _get_cluster_codes(data, clustervar_list):
+
+    '''
+    Factorize the cluster variables into integer codes.
+    Args:
+        data (pd.DataFrame): The data containing the cluster variables.
+        clustervar_list (list): A list with the names of the cluster variables.
+    Returns:
+        cluster_codes (np.ndarray): An N x len(clustervar_list) array of integer cluster codes.
+        cluster_G (np.ndarray): The number of clusters in each clustering dimension.
+    '''
+
+    cluster_codes = np.zeros((data.shape[0], len(clustervar_list)), dtype = np.int64)
+    cluster_G = np.zeros(len(clustervar_list), dtype = np.int64)
+
+    for i, clustervar in enumerate(clustervar_list):
+
+        codes, clustid = pd.factorize(data[clustervar])
+
+        if np.any(codes == -1):
+            raise ValueError("CRV inference not supported with missing values in the cluster variable. Please drop missing values before running the regression.")
+
+        cluster_codes[:, i] = codes
+        cluster_G[i] = len(clustid)
+
+    return cluster_codes, cluster_G
+
+
+def _get_multiway_cluster_terms(cluster_codes):
+
+    '''
+    Create the terms of the inclusion-exclusion formula for multiway clustering (Cameron, Gelbach & Miller, 2011).
+    For two-way clustering, V = V_1 + V_2 - V_12, for three-way clustering,
+    V = V_1 + V_2 + V_3 - V_12 - V_13 - V_23 + V_123, and so on.
+    Intersections of clusters are built by combining the integer codes of the
+    individual clustering dimensions.
+    Args:
+        cluster_codes (np.ndarray): An N x M array of integer cluster codes, as returned by `_get_cluster_codes()`.
+    Returns:
+        A list of tuples (codes, G, vcov_sign), where codes are the integer codes of the
+        (intersected) clusters, G the number of clusters and vcov_sign the sign of the term.
+    '''
+
+    n_dims = cluster_codes.shape[1]
+    terms = []
+
+    for n_vars in range(1, n_dims + 1):
+        for combination in combinations(range(n_dims), n_vars):
+            codes = cluster_codes[:, combination[0]]
+            for j in combination[1:]:
+                codes, _ = pd.factorize(codes * (np.max(cluster_codes[:, j]) + 1) + cluster_codes[:, j])
+            G = np.max(codes) + 1
+            vcov_sign = 1 if n_vars % 2 == 1 else -1
+            terms.append((codes, G, vcov_sign))
+
+    return terms
+
+
+def _segment_sum(x, codes, G):
+
+    '''
+    Sum the rows of x within groups.
+    Args:
+        x (np.ndarray): An N x k array.
+        codes (np.ndarray): An array of length N with integer group codes in 0, ..., G-1.
+        G (int): The number of groups.
+    Returns:
+        A G x k array with the group-wise sums of x.
+    '''
+
+    N, k = x.shape
+    idx = (codes.reshape((N, 1)) * k + np.arange(k)).ravel()
+
+    return np.bincount(idx, weights = x.ravel(), minlength = G * k).reshape((G, k))
+
+
+def _crv3_jackknife(X, Y, cluster, G):
+
+    '''
+    Compute leave-one-cluster-out regression coefficients for a regression of Y on X.
+    The data is sorted by cluster once, all per-cluster cross-products X_g'X_g and X_g'Y_g are
+    computed in a single pass, and the G leave-one-out systems are solved in one batched solve.
+    Args:
+        X (np.ndarray): An N x k matrix of covariates.
+        Y (np.ndarray): The dependent variable, of length N.
+        cluster (np.ndarray): An array of length N with integer cluster codes in 0, ..., G-1.
+        G (int): The number of clusters.
+    Returns:
+        beta_jack (np.ndarray): A G x k matrix of leave-one-cluster-out coefficients.
+    '''
+
+    order = np.argsort(cluster, kind = "stable")
+    counts = np.bincount(cluster, minlength = G)
+    starts = np.concatenate([np.zeros(1, dtype = np.int64), np.cumsum(counts)[:-1]])
+
+    X_sorted = np.ascontiguousarray(X[order], dtype = np.float64)
+    Y_sorted = np.ascontiguousarray(Y.flatten()[order], dtype = np.float64)
+
+    tXgXg, tXgyg = _cluster_crossproducts(X_sorted, Y_sorted, starts, counts)
+
+    tXX = np.sum(tXgXg, axis = 0)
+    tXy = np.sum(tXgyg, axis = 0)
+
+    A = tXX[np.newaxis, :, :] - tXgXg
+    b = (tXy[np.newaxis, :] - tXgyg)[:, :, np.newaxis]
+
+    try:
+        beta_jack = np.linalg.solve(A, b)
+    except np.linalg.LinAlgError:
+        # singular leave-one-out systems, e.g. if a dummy variable is only
+        # observed in a single cluster
+        beta_jack = np.linalg.pinv(A) @ b
+
+    return beta_jack[:, :, 0]
+
+
+@njit(parallel = True)
+def _cluster_crossproducts(X, Y, starts, counts):
+
+    '''
+    Compute per-cluster cross-products X_g'X_g and X_g'Y_g for data sorted by cluster,
+    in parallel over clusters.
+    Args:
+        X (np.ndarray): An N x k matrix of covariates, sorted by cluster.
+        Y (np.ndarray): The dependent variable, of length N, sorted by cluster.
+        starts (np.ndarray): The first row of each cluster in the sorted data.
+        counts (np.ndarray): The number of observations of each cluster.
+    Returns:
+        tXgXg (np.ndarray): A G x k x k array of X_g'X_g.
+        tXgyg (np.ndarray): A G x k array of X_g'Y_g.
+    '''
+
+    G = len(starts)
+    k = X.shape[1]
+
+    tXgXg = np.zeros((G, k, k))
+    tXgyg = np.zeros((G, k))
+
+    for g in prange(G):
+        for i in range(starts[g], starts[g] + counts[g]):
+            for j in range(k):
+                tXgyg[g, j] += X[i, j] * Y[i]
+                for l in range(j + 1):
+                    tXgXg[g, j, l] += X[i, j] * X[i, l]
+        for j in range(k):
+            for l in range(j):
+                tXgXg[g, l, j] = tXgXg[g, j, l]
+
+    return tXgXg, tXgyg
+
+
+def _get_fixef_codes(data, fixef):
+
+    '''
+    Factorize the fixed effects of a regression model into integer codes.
+    Args:
+        data (pd.DataFrame): The data containing the fixed effects.
+        fixef (str): The fixed effects, separated by "+", e.g. "fe1+fe2".
+    Returns:
+        An N x n_fixef array of integer codes.
+    '''
+
+    fixef_list = fixef.split("+")
+
+    if any("/" in x for x in fixef_list):
+        raise ValueError("CRV3, HC2 and HC3 inference are not supported with varying slopes.")
+
+    fe = np.zeros((data.shape[0], len(fixef_list)), dtype = np.int64)
+    for i, x in enumerate(fixef_list):
+        fe[:, i] = pd.factorize(data[x])[0]
+
+    return fe
+
+
+def _get_fixef_leverage(fe, max_levels = 2000, tol = 0.02, batch_size = 50, max_draws = 2000, seed = 8762):
+
+    '''
+    Compute the diagonal of the projection matrix P_D = D(D'D)^{+}D' of the fixed effects,
+    without creating the dummy matrix D.
+    With a single fixed effect, the leverage is 1 / n_g, with n_g the number of observations
+    of the fixed effect level. With multiple fixed effects, the leverage is computed exactly
+    from a (pseudo-)inverse of D'D if the total number of fixed effect levels is at most
+    `max_levels`. Otherwise, the leverage is estimated via random projections. As the column
+    space of the fixed effect with the most levels, D_1, is part of the column space of D,
+    P_D - P_1 is a projection, and the leverage is 1 / n_g of D_1 plus the diagonal of P_D - P_1.
+    Only the latter is estimated: for Rademacher vectors r, E[((P_D - P_1) r)_i^2] = (P_D - P_1)_ii,
+    with P_D r obtained by demeaning r and P_1 r the group means of r. Random vectors are drawn in
+    batches of `batch_size` until the largest estimated standard error of the leverages is below
+    `tol` times the mean leverage, or `max_draws` vectors have been drawn.
+    Args:
+        fe (np.ndarray): An N x n_fixef array of integer fixed effect codes.
+        max_levels (int): The maximum number of fixed effect levels for the exact computation.
+        tol (float): The tolerance for the standard error of the randomized estimator, relative to the mean leverage.
+        batch_size (int): The number of random vectors per batch.
+        max_draws (int): The maximum number of random vectors.
+        seed (int): The seed of the random number generator.
+    Returns:
+        An array of length N with the fixed effects leverage of each observation.
+    '''
+
+    N, n_fixef = fe.shape
+
+    if n_fixef == 1:
+        counts = np.bincount(fe[:, 0])
+        return 1 / counts[fe[:, 0]]
+
+    n_levels = np.max(fe, axis = 0) + 1
+    offsets = np.concatenate([np.zeros(1, dtype = np.int64), np.cumsum(n_levels)[:-1]])
+    L = np.sum(n_levels)
+    idx = fe + offsets
+
+    if L <= max_levels:
+
+        tDD = np.zeros((L, L))
+        for a in range(n_fixef):
+            for b in range(n_fixef):
+                tDD += np.bincount(idx[:, a] * L + idx[:, b], minlength = L * L).reshape((L, L))
+
+        tDDinv = np.linalg.pinv(tDD, hermitian = True)
+
+        leverage = np.zeros(N)
+        for a in range(n_fixef):
+            for b in range(n_fixef):
+                leverage += tDDinv[idx[:, a], idx[:, b]]
+
+        return leverage
+
+    # the leverage of the fixed effect with the most levels is computed exactly
+    codes = fe[:, np.argmax(n_levels)]
+    counts = np.bincount(codes)
+    leverage_1 = 1 / counts[codes]
+
+    rng = np.random.default_rng(seed)
+    flist = fe.astype(np.int64)
+    weights = np.ones(N)
+
+    sum_h = np.zeros(N)
+    sum_h2 = np.zeros(N)
+    n_draws = 0
+
+    while n_draws < max_draws:
+
+        R = rng.choice(np.array([-1.0, 1.0]), size = (N, batch_size))
+        group_means = np.stack([np.bincount(codes, weights = R[:, j]) for j in range(batch_size)], axis = 1) / counts[:, np.newaxis]
+        # the projections only need to be accurate to about 1e-05 per observation
+        H = (R - demean(R, flist, weights, 1e-05 * N) - group_means[codes]) ** 2
+        sum_h += np.sum(H, axis = 1)
+        sum_h2 += np.sum(H ** 2, axis = 1)
+        n_draws += batch_size
+
+        leverage = leverage_1 + sum_h / n_draws
+        se = np.sqrt(np.maximum(sum_h2 / n_draws - (sum_h / n_draws) ** 2, 0) / n_draws)
+        if np.max(se) < tol * np.mean(leverage):
+            break
+
+    return np.clip(leverage, 0, 1)
+
+
+def _is_nested(fe, cluster):
+
+    '''
+    Check if all fixed effects are nested within the clusters, i.e. if each fixed effect level
+    is observed in only one cluster.
+    Args:
+        fe (np.ndarray): An N x n_fixef array of integer fixed effect codes.
+        cluster (np.ndarray): An array of length N with integer cluster codes.
+    Returns:
+        True if all fixed effects are nested within the clusters, False otherwise.
+    '''
+
+    for i in range(fe.shape[1]):
+        n_levels = len(np.unique(fe[:, i]))
+        n_pairs = len(np.unique(fe[:, i] * (np.max(cluster) + 1) + cluster))
+        if n_pairs != n_levels:
+            return False
+
+    return True
+
+
+def _fix_vcov_eigenvalues(vcov):
+
+    '''
+    Set negative eigenvalues of a covariance matrix to zero, as proposed in Cameron, Gelbach & Miller (2011)
+    for multiway clustered covariance matrices, which are not guaranteed to be positive semi-definite.
+    Args:
+        vcov (np.ndarray): A k x k covariance matrix.
+    Returns:
+        The fixed covariance matrix. If all eigenvalues are non-negative, vcov is returned unchanged.
+    '''
+
+    eigval, eigvec = np.linalg.eigh(vcov)
+    if np.all(eigval >= 0):
+        return vcov
+
+    return eigvec @ np.diag(np.maximum(eigval, 0)) @ np.transpose(eigvec)
+
+
 def _feols_input_checks(Y, X, Z):
 
     '''
@@ -1,5 +1,10 @@
+import os
+import numba
 import pyhdfe
 import re
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 import pandas as pd
@@ -7,17 +12,86 @@ from matplotlib import pyplot as plt
 
 from typing import Any, Union, Dict, Optional, List, Tuple
 from scipy.stats import norm
-from formulaic import model_matrix
+from formulaic import model_matrix, Formula
 
 from pyfixest.feols import Feols
+from pyfixest.bootstrap import _wildboot_components, wildboottest_multi, _get_rwolf_pvalues, _get_wyoung_pvalues
 from pyfixest.FormulaParser import FixestFormulaParser, _flatten_list
 from pyfixest.ssc_utils import ssc
+from pyfixest.threads import _worker_threads
 
 
 class DepvarIsNotNumericError(Exception):
     pass
 
 
+# attributes of a feols() call that are set on the Fixest object, as used by the summary and plotting methods
+_CALL_ATTRIBUTES = ["fml", "split", "fsplit", "is_iv", "fml_dict", "var_dict", "fml_dict2", "ivars", "icovars", "splitvar", "na_patterns_dict", "is_fixef_multi"]
+
+
+class _EstimationContext:
+
+    '''
+    The state of a single feols() call: the parsed formulas, the data and split samples, the demeaned
+    data and the thread pool. Keeping this state out of the Fixest object allows concurrent feols() calls
+    on the same Fixest object.
+    '''
+
+    def __init__(self, fml: str, fxst_fml: FixestFormulaParser, ssc_dict: dict, drop_singletons: bool, split: Optional[str], fsplit: Optional[str]) -> None:
+
+        self.fml = fml
+        self.split = split
+        self.fsplit = fsplit
+        self.is_iv = fxst_fml.is_iv
+
+        self.fml_dict = fxst_fml.fml_dict
+        self.var_dict = fxst_fml.var_dict
+        self.fml_dict2 = fxst_fml.fml_dict2
+
+        if self.is_iv:
+            self.fml_dict_iv = fxst_fml.fml_dict_iv
+            self.var_dict_iv = fxst_fml.var_dict_iv
+            self.fml_dict2_iv = fxst_fml.fml_dict2_iv
+        else:
+            self.fml_dict_iv = self.fml_dict
+            self.var_dict_iv = self.var_dict
+            self.fml_dict2_iv = self.fml_dict2
+
+        self.ivars = fxst_fml.ivars
+        self.icovars = None
+        self.is_fixef_multi = _is_multiple_estimation(self.fml_dict)
+
+        self.ssc_dict = ssc_dict
+        self.drop_singletons = drop_singletons
+
+        # dropped_data_dict and demeaned_data_dict are
+        # dictionaries with keys for each fixed effects combination and
+        # has values of lists of demeaned dataframes
+        # the list is a singelton list unless split sample estimation is used
+        # e.g it looks like this (without split estimation):
+        # {'fe1': [demeaned_data_df], 'fe1+fe2': [demeaned_data_df]}
+        # and like this (with split estimation):
+        # {'fe1': [demeaned_data_df1, demeaned_data_df2], 'fe1+fe2': [demeaned_data_df1, demeaned_data_df2]}
+        # the lists are sorted in the order of the split variable
+
+        self.dropped_data_dict = dict()
+        # number of distinct missing value patterns per fixed effects combination
+        # (and split), i.e. the number of demeaning passes
+        self.na_patterns_dict = dict()
+        self.demeaned_data_dict = dict()
+        # names of depvar, X, Z matrices
+        self.yxz_name_dict = dict()
+
+        # the data of the call, and a list of (split_log, data) tuples: the full sample and / or the split samples
+        self.data = None
+        self.splitvar = None
+        self.samples = None
+
+        # thread pool of the call, None for sequential estimation
+        self.executor = None
+        self.numba_threads = None
+
+
 class Fixest:
 
     def __init__(self, data: pd.DataFrame) -> None:
@@ -31,28 +105,94 @@ class Fixest:
 
         self.data = data
         self.model_res = dict()
+        # caches that are shared by all feols() calls: compiled formulaic model specs,
+        # keyed by formula, and factorized fixed effects of the full data, keyed by
+        # fixed effects specification. all writes to shared state are guarded by the lock
+        self._model_specs = dict()
+        self._fixef_cache = dict()
+        self._lock = threading.Lock()
+
+    def _model_matrix(self, fml, data):
+        '''
+        Evaluate a formula via a cached formulaic model spec. The spec is built on the full
+        data set, so that subsets of the data (e.g. for split sample estimation) and repeated calls
+        share the same transforms, categorical levels and column encoding. Missing values are kept.
+        Args:
+            fml: A formula string.
+            data: The pd.DataFrame to evaluate the formula on. Either self.data or a subset thereof.
+        Returns:
+            A formulaic model matrix (or model matrices, for two-sided formulas).
+        '''
 
-    def _clean_fe(self, data, fval):
+        model_spec = self._model_specs.get(fml)
+        if model_spec is None:
+            mm = model_matrix(fml, self.data, na_action="ignore")
+            with self._lock:
+                model_spec = self._model_specs.setdefault(fml, mm.model_spec)
+            if data is self.data and model_spec is mm.model_spec:
+                return mm
 
-        fval_list = fval.split("+")
+        return model_spec.get_model_matrix(data)
+
+    def _add_interacted_fixef(self, fixef_keys):
+
+        '''
+        Add interacted fixed effects (via "^") as columns to the data. This is done once for the
+        full data set, before the data is partitioned into split samples. The data is replaced by
+        a copy with the new columns rather than modified in place, so that concurrent feols() calls
+        keep a consistent view of their data.
+        Args:
+            fixef_keys: A list of all fixed effects specifications, e.g. ["X4", "X3^X4+X2"].
+        Returns:
+            The data, including all interacted fixed effects.
+        '''
 
+        data = self.data
         # find interacted fixed effects via "^"
-        interacted_fes = [x for x in fval_list if '^' in x]
-             
-        varying_slopes = [x for x in fval_list if '/' in x]
+        interacted_fes = [x for fval in fixef_keys for x in fval.split("+") if '^' in x and x not in data.columns]
+        if len(interacted_fes) == 0:
+            return data
 
+        new_columns = dict()
         for x in interacted_fes:
             vars = x.split("^")
-            data[x] = data[vars].fillna(method='ffill', axis=1).apply(lambda x: '^'.join(
+            new_columns[x] = data[vars].fillna(method='ffill', axis=1).apply(lambda row: '^'.join(
                 row.dropna().astype(str)), axis=1)
 
+        with self._lock:
+            new_columns = {x: value for x, value in new_columns.items() if x not in self.data.columns}
+            if len(new_columns) > 0:
+                self.data = pd.concat([self.data, pd.DataFrame(new_columns, index = self.data.index)], axis = 1)
+            return self.data
+
+    def _clean_fe(self, data, fval, cache = False):
+
+        '''
+        Factorize the fixed effects of a fixed effects specification.
+        Args:
+            data: The pd.DataFrame with the fixed effects.
+            fval: A specification of fixed effects, such as "X4" or "X3+X2".
+            cache: Whether data is the full data set. The factorized fixed effects of the full data set
+                are cached and shared by all feols() calls.
+        Returns:
+            fe: An N x (number of fixed effects) array of integer codes.
+            fe_na: A boolean pd.Series, True for rows with a missing fixed effect.
+        '''
+
+        if cache and fval in self._fixef_cache:
+            return self._fixef_cache[fval]
+
+        fval_list = fval.split("+")
+
+        varying_slopes = [x for x in fval_list if '/' in x]
+
         fe = data[fval_list]
         # all fes to factors / categories
 
         if varying_slopes != []: 
           
             for x in varying_slopes: 
-                mm_vs = model_matrix("-1 + " + x, data)
+                mm_vs = self._model_matrix("-1 + " + x, data)
             
             fe = pd.concat([fe, mm_vs], axis = 1)
         
@@ -60,13 +200,18 @@ class Fixest:
         fe = fe.apply(lambda x: pd.factorize(x)[0])
         fe = fe.to_numpy()
 
+        if cache:
+            with self._lock:
+                return self._fixef_cache.setdefault(fval, (fe, fe_na))
+
         return fe, fe_na
 
-    def _demean_model(self, data: pd.DataFrame, fval: str, ivars: List[str], drop_ref: str) -> None:
+    def _demean_model(self, ctx: _EstimationContext, data: pd.DataFrame, fval: str, ivars: List[str], drop_ref: str) -> None:
         '''
         Demean all regressions for a specification of fixed effects.
 
         Args:
+            ctx: The estimation context of the feols() call.
             data: The input pd.DataFrame for the object. Either self.data or a subset thereof (for split sample estimation).
             fval: A specification of fixed effects. A string indicating the fixed effects to be demeaned,
                 such as "X4" or "X3 + X2".
@@ -75,7 +220,10 @@ class Fixest:
                       category is dropped from the regression.
 
         Returns:
-            None
+            YXZ_dict: A dictionary of demeaned model frames, keyed by formula.
+            na_dict: A dictionary of boolean masks of the rows of data that are dropped, keyed by formula.
+            var_dict: A dictionary of the variable names of each model, keyed by formula.
+            n_na_patterns: The number of distinct missing value patterns.
         '''
 
         YXZ_dict = dict()
@@ -83,309 +231,373 @@ class Fixest:
         var_dict = dict()
 
         if fval != "0":
-            fe, fe_na = self._clean_fe(data, fval)
-            fe_na = list(fe_na[fe_na == True])
+            fe, fe_na = self._clean_fe(data, fval, cache = data is ctx.data)
+            fe_na = fe_na.to_numpy()
         else:
             fe = None
             fe_na = None
 
-        dict2fe = self.fml_dict2.get(fval)
-        if self.is_iv:
-            dict2fe_iv = self.fml_dict2_iv.get(fval)
-
-        # create lookup table with NA index key
-        # for each regression, check if lookup table already
-        # populated with "demeaned" data for some (or all)
-        # variables of the model. if demeaned variable for
-        # NA key already exists -> use it. else rerun demeaning
-        # algorithm
-
-        lookup_demeaned_data = dict()
+        dict2fe = ctx.fml_dict2.get(fval)
+        if ctx.is_iv:
+            dict2fe_iv = ctx.fml_dict2_iv.get(fval)
 
-        # loop over both dict2fe and dict2fe_iv (if the latter is not None)
+        # collect all models for the fixed effect specification
+        models = []
         for depvar in dict2fe.keys():
-
             # [(0, 'X1+X2'), (1, ['X1+X3'])]
-            for _, covar in enumerate(dict2fe.get(depvar)):
+            for i, covar in enumerate(dict2fe.get(depvar)):
+                if ctx.is_iv:
+                    # the i-th first stage belongs to the i-th second stage
+                    instruments2 = dict2fe_iv.get(depvar)[i]
+                    endogvar_list = list(set(covar.split("+")) - set(instruments2.split("+")))#[0]
+                    instrument_list = list(set(instruments2.split("+")) - set(covar.split("+")))#[0]
+                else:
+                    endogvar_list = []
+                    instrument_list = []
+                models.append((depvar, covar, endogvar_list, instrument_list))
+
+        # build one design matrix for the union of all models, from which each
+        # model selects its columns by name. missing values are kept, so that
+        # every model can drop the rows that are missing for its own variables
+        union_lhs = list(dict.fromkeys(
+            [depvar for depvar, _, _, _ in models] +
+            [z for _, _, _, instrument_list in models for z in instrument_list]
+        ))
+        union_rhs = list(dict.fromkeys([covar for _, covar, _, _ in models]))
+        union_fml = "+".join(union_lhs) + " ~ " + "+".join(union_rhs)
+        lhs_all, rhs_all = self._model_matrix(union_fml, data)
+
+        YXZ_all = pd.concat([lhs_all, rhs_all], axis = 1)
+        YXZ_all = YXZ_all.loc[:, ~YXZ_all.columns.duplicated()]
+        YXZ_columns = dict(zip(YXZ_all.columns, range(YXZ_all.shape[1])))
+        YXZ_all = YXZ_all.to_numpy(dtype = float)
+
+        # missing values are detected once for all columns and variables
+        YXZ_na = np.isnan(YXZ_all)
+        term_vars = list(lhs_all.model_spec.term_variables.values()) + list(rhs_all.model_spec.term_variables.values())
+        term_vars = set(str(var) for variables in term_vars for var in variables)
+        data_vars = [x for x in data.columns if x in term_vars]
+        data_na = data[data_vars].isna().to_numpy()
+        data_vars = dict(zip(data_vars, range(len(data_vars))))
+
+        # planning stage: for each model, collect its variables and the
+        # rows that need to be dropped because of missing values
+        model_plans = []
+        for depvar, covar, endogvar_list, instrument_list in models:
+
+            covar2 = covar
+            depvar2 = depvar
+
+            fml = depvar2 + " ~ " + covar2
+
+            x_cols, x_vars = _get_term_columns(rhs_all, covar2)
+            _, y_vars = _get_term_columns(lhs_all, "+".join([depvar2] + instrument_list))
+
+            # a row is dropped if any of the model's variables is missing - either
+            # in the data or after the formula transformations are applied
+            model_cols = [YXZ_columns[x] for x in [depvar] + x_cols + instrument_list]
+            model_vars = list(dict.fromkeys(data_vars[x] for x in x_vars + y_vars if x in data_vars))
+            na_mask = YXZ_na[:, model_cols].any(axis=1)
+            if len(model_vars) > 0:
+                na_mask |= data_na[:, model_vars].any(axis=1)
+            if fe is not None:
+                na_mask |= fe_na
+
+            # drop variables before collecting variable names
+            x_names = list(x_cols)
+            if ctx.ivars is not None:
+                if drop_ref is not None:
+                    x_names.remove(drop_ref)
+
+            # levels of categorical variables that do not occur in the estimation
+            # sample (e.g. only in dropped rows or in other splits) are not part of the model
+            level_cols = [x for x in x_names if "[" in x]
+            if len(level_cols) > 0:
+                level_index = [YXZ_columns[x] for x in level_cols]
+                is_used = np.any(YXZ_all[np.ix_(~na_mask, level_index)] != 0, axis=0)
+                unused_levels = set(np.array(level_cols)[~is_used])
+                x_names = [x for x in x_names if x not in unused_levels]
+
+                # if the reference level of a categorical variable does not occur in the estimation
+                # sample, its remaining levels are collinear with the intercept (or the fixed effects).
+                # as when the model is fit on the estimation sample only, the first remaining level
+                # becomes the reference level
+                if "Intercept" in x_names or fe is not None:
+                    for term_cols in _get_level_columns(rhs_all, x_names):
+                        term_index = [YXZ_columns[x] for x in term_cols]
+                        if np.all(YXZ_all[np.ix_(~na_mask, term_index)].sum(axis=1) == 1):
+                            x_names.remove(term_cols[0])
+
+            y_names = [depvar]
+            yxz_names = list(y_names) + list(x_names)
+            if ctx.is_iv:
+                iv_names = list(instrument_list)
+                x_names_copy = x_names.copy()
+                x_names_copy = [x for x in x_names_copy if x not in endogvar_list]
+                z_names = x_names_copy + instrument_list
+                cols = yxz_names + iv_names
+            else:
+                iv_names = None
+                z_names = None
+                cols = yxz_names
 
-                covar2 = covar
-                depvar2 = depvar
+            if ctx.ivars is not None:
+                icovars = [s for s in x_names if s.startswith(
+                    ivars[0]) and s.endswith(ivars[1])]
+            else:
+                icovars = None
 
-                fml = depvar2 + " ~ " + covar2
+            # with fixed effects, the intercept is projected out
+            if fe is not None:
+                x_names.remove("Intercept")
+                cols.remove("Intercept")
+                if ctx.is_iv:
+                    z_names.remove("Intercept")
+
+            model_plans.append(dict({
+                'fml': fml,
+                'na_mask': na_mask,
+                'cols': cols,
+                'var_dict': dict({
+                    'y_names': y_names,
+                    'x_names': x_names,
+                    'iv_names': iv_names,
+                    'z_names': z_names,
+                    'icovars': icovars,
+                    'union_fml': union_fml
+                })
+            }))
+
+        # group the models by missing value pattern. the packed NA mask
+        # serves as key. all models of a group share the estimation sample
+        na_patterns = dict()
+        for plan in model_plans:
+            plan['na_key'] = np.packbits(plan['na_mask']).tobytes()
+            na_patterns.setdefault(plan['na_key'], []).append(plan)
+
+        # demean the union of the columns of all models of a group in one pass.
+        # for IV, this includes instruments and endogenous variables, so that they
+        # are demeaned once and shared by all first and second stages
+        demeaned_patterns = dict()
+        for na_key, plans in na_patterns.items():
+
+            na_mask = plans[0]['na_mask']
+            union_cols = list(dict.fromkeys([x for plan in plans for x in plan['cols']]))
+            YXZ = YXZ_all[np.ix_(~na_mask, [YXZ_columns[x] for x in union_cols])]
+
+            # variant 1: if there are fixed effects to be projected out
+            if fe is not None:
+                algorithm = pyhdfe.create(
+                    ids=fe[~na_mask],
+                    residualize_method='map',
+                    drop_singletons=ctx.drop_singletons,
+                )
 
-                if self.is_iv:
-                    instruments2 = dict2fe_iv.get(depvar)[0]
-                    endogvar_list = list(set(covar2.split("+")) - set(instruments2.split("+")))#[0]
-                    instrument_list = list(set(instruments2.split("+")) - set(covar2.split("+")))#[0]
+                if ctx.drop_singletons == True and algorithm.singletons != 0 and algorithm.singletons is not None:
+                    print(algorithm.singletons, "columns are dropped due to singleton fixed effects.")
+                    na_mask = na_mask.copy()
+                    na_mask[np.flatnonzero(~na_mask)[algorithm._singleton_indices]] = True
 
-                    fml2 = "+".join(instrument_list) + "+" + fml
+                YXZ_demeaned = algorithm.residualize(YXZ)
+                if YXZ_demeaned.ndim == 1:
+                    YXZ_demeaned = YXZ_demeaned.reshape(len(YXZ_demeaned), 1)
 
-                else:
-                    fml2 = fml
-
-                lhs, rhs = model_matrix(fml2, data)
-
-                untransformed_depvar = _find_untransformed_depvar(depvar2)
-
-                Y = lhs[[depvar]]
-                X = rhs
-                if self.is_iv:
-                    I = lhs[instrument_list]
-
-                # get NA index before converting Y to numpy array
-                na_index = list(set(data.index) - set(Y.index))
-
-                # drop variables before collecting variable names
-                if self.ivars is not None:
-                    if drop_ref is not None:
-                        X = X.drop(drop_ref, axis=1)
-
-                y_names = list(Y.columns)
-                x_names = list(X.columns)
-                yxz_names = list(y_names) + list(x_names)
-                if self.is_iv:
-                    iv_names = list(I.columns)
-                    x_names_copy = x_names.copy()
-                    x_names_copy = [x for x in x_names_copy if x not in endogvar_list]
-                    z_names = x_names_copy + instrument_list
-                    cols = yxz_names + iv_names
-                else:
-                    iv_names = None
-                    z_names = None
-                    cols = yxz_names
+            else:
+                # if no fixed effects
+                YXZ_demeaned = YXZ
 
-                if self.ivars is not None:
-                    self.icovars = [s for s in x_names if s.startswith(
-                        ivars[0]) and s.endswith(ivars[1])]
-                else:
-                    self.icovars = None
-
-
-                Y = Y.to_numpy()
-                X = X.to_numpy()
-                if self.is_iv:
-                    I = I.to_numpy()
-
-                if Y.shape[1] > 1:
-                    raise ValueError(
-                        "Dependent variable must be a single column. Please make sure that the dependent variable" + depvar2 + "is of a numeric type (int or float).")
-
-                # variant 1: if there are fixed effects to be projected out
-                if fe is not None:
-                    na_index = (na_index + fe_na)
-                    fe2 = np.delete(fe, na_index, axis=0)
-                    # drop intercept
-                    intercept_index = x_names.index("Intercept")
-                    X = np.delete(X, intercept_index, axis = 1)
-                    x_names.remove("Intercept")
-                    yxz_names.remove("Intercept")
-                    if self.is_iv:
-                        z_names.remove("Intercept")
-                        cols.remove("Intercept")
-
-                    # check if variables have already been demeaned
-                    Y = np.delete(Y, fe_na, axis=0)
-                    X = np.delete(X, fe_na, axis=0)
-                    if self.is_iv:
-                        I = np.delete(I, fe_na, axis=0)
-
-                    if self.is_iv:
-                        YXZ = np.concatenate([Y, X, I], axis = 1)
-                    else:
-                        YXZ = np.concatenate([Y, X], axis=1)
-
-                    na_index_str = ','.join(str(x) for x in na_index)
-
-                    # check if looked dict has data for na_index
-                    if lookup_demeaned_data.get(na_index_str) is not None:
-                        # get data out of lookup table: list of [algo, data]
-                        algorithm, YXZ_demeaned_old = lookup_demeaned_data.get(
-                            na_index_str)
-
-                        # get not yet demeaned covariates
-                        var_diff_names = list(
-                            set(yxz_names) - set(YXZ_demeaned_old.columns))[0]
-                        var_diff_index = list(yxz_names).index(var_diff_names)
-                        var_diff = YXZ[:, var_diff_index]
-                        if var_diff.ndim == 1:
-                            var_diff = var_diff.reshape(len(var_diff), 1)
-
-                        YXZ_demean_new = algorithm.residualize(var_diff)
-                        YXZ_demeaned = np.concatenate(
-                            [YXZ_demeaned_old, YXZ_demean_new], axis=1)
-                        YXZ_demeaned = pd.DataFrame(YXZ_demeaned)
-
-                        YXZ_demeaned.columns = list(
-                            YXZ_demeaned_old.columns) + [var_diff_names]
-
-                    else:
-                        # not data demeaned yet for NA combination
-                        algorithm = pyhdfe.create(
-                            ids=fe2,
-                            residualize_method='map',
-                            drop_singletons=self.drop_singletons,
-                        )
-
-                        if self.drop_singletons == True and algorithm.singletons != 0 and algorithm.singletons is not None:
-                            print(algorithm.singletons, "columns are dropped due to singleton fixed effects.")
-                            dropped_singleton_indices = (
-                                np.where(algorithm._singleton_indices))[0].tolist()
-                            na_index += dropped_singleton_indices
-
-                        YXZ_demeaned = algorithm.residualize(YXZ)
-                        YXZ_demeaned = pd.DataFrame(YXZ_demeaned)
-
-                        YXZ_demeaned.columns = cols
-
-                    lookup_demeaned_data[na_index_str] = [
-                        algorithm, YXZ_demeaned]
+            demeaned_patterns[na_key] = (pd.DataFrame(YXZ_demeaned, columns = union_cols), na_mask)
 
-                else:
-                    # if no fixed effects
-                    if self.is_iv:
-                        YXZ = np.concatenate([Y, X, I], axis=1)
-                    else:
-                        YXZ = np.concatenate([Y, X], axis=1)
+        # collect the models in formula order, not in the order of the missing value patterns
+        for plan in model_plans:
+            YXZ_demeaned, na_mask = demeaned_patterns[plan['na_key']]
+            YXZ_dict[plan['fml']] = YXZ_demeaned[plan['cols']]
+            na_dict[plan['fml']] = na_mask
+            var_dict[plan['fml']] = plan['var_dict']
 
-                    YXZ_demeaned = pd.DataFrame(YXZ)
+        # number of distinct missing value patterns, each of which requires a separate demeaning pass
+        n_na_patterns = len(na_patterns)
 
-                    YXZ_demeaned.columns = cols
+        return YXZ_dict, na_dict, var_dict, n_na_patterns
 
-                YXZ_dict[fml] = YXZ_demeaned
-                na_dict[fml] = na_index
-                var_dict[fml] = dict({
-                    'y_names': y_names,
-                    'x_names': x_names,
-                    'iv_names': iv_names,
-                    'z_names': z_names
-                })
+    def _map(self, ctx, fn, tasks):
+
+        '''
+        Apply fn to all tasks, on the thread pool of the feols() call if there is one.
+        Results are returned in the order of the tasks.
+        Args:
+            ctx: The estimation context of the feols() call.
+            fn: A function of a single task.
+            tasks: A list of tasks.
+        Returns:
+            A list of the results.
+        '''
+
+        if ctx.executor is None:
+            return [fn(task) for task in tasks]
 
+        def run(task):
+            # the number of numba threads is thread local
+            numba.set_num_threads(ctx.numba_threads)
+            return fn(task)
 
-        return YXZ_dict, na_dict, var_dict
+        return list(ctx.executor.map(run, tasks))
 
-    def _demean_all_models(self, fixef_keys, ivars, drop_ref, estimate_full_model, estimate_split_model):
+    def _demean_all_models(self, ctx, fixef_keys, ivars, drop_ref):
 
         '''
         demean multiple models. essentially, the function loops
-        over all split var and fixed effects variables and demeans the
-        specified dependend variables and covariates
+        over all split samples and fixed effects variables and demeans the
+        specified dependend variables and covariates. all combinations
+        of fixed effects and split samples are independent tasks, which
+        are demeaned concurrently if feols() is called with n_jobs != 1.
         Args:
+            ctx: the estimation context of the feols() call
             fixef_keys: fixed effect variables
             ivars: interaction variables
             drop_ref: drop reference category
-            estimate_full_model: boolean, whether to estimate the full model
-            estimate_split_model: boolean, whether to estimate the split model
         '''
 
-        if estimate_full_model:
-            for _, fval in enumerate(fixef_keys):
-                self.demeaned_data_dict[fval] = []
-                self.dropped_data_dict[fval] = []
-                self.yxz_name_dict[fval] = []
-                data = self.data
-                demeaned_data, dropped_data, yxz_name_dict= self._demean_model(
-                    data, fval, ivars, drop_ref)
-                self.demeaned_data_dict[fval].append(demeaned_data)
-                self.dropped_data_dict[fval].append(dropped_data)
-                self.yxz_name_dict[fval].append(yxz_name_dict)
-
-        if estimate_split_model:
-            for _, fval in enumerate(fixef_keys):
-                self.demeaned_data_dict[fval] = []
-                self.dropped_data_dict[fval] = []
-                self.yxz_name_dict[fval] = []
-                for x in self.split_categories:
-                    sub_data = self.data[x == self.splitvar]
-                    demeaned_data, dropped_data, yxz_name_dict = self._demean_model(
-                        sub_data, fval, ivars, drop_ref)
-                    self.demeaned_data_dict[fval].append(demeaned_data)
-                    self.dropped_data_dict[fval].append(dropped_data)
-                    self.yxz_name_dict[fval].append(yxz_name_dict)
-
-    def _estimate_all_models(self, vcov):
-
-        # estimate models based on demeaned model matrix and dependent variables
-        for _, fval in enumerate(self.fml_dict.keys()):
-            model_splits = self.demeaned_data_dict[fval]
-            for x, _ in enumerate(model_splits):
-                model_frames = model_splits[x]
-                for _, fml in enumerate(model_frames):
-
-                    # get the (demeaned) model frame. key is fml without fixed effects
-                    model_frame = model_frames[fml]
-
-                    # update formula with fixed effect. fval is "0" for no fixed effect
-                    if fval == "0":
-                        fml2 = fml
-                    else:
-                        fml2 = fml + "|" + fval
-
-                    # formula log: add information on sample split
-                    if self.splitvar is not None:
-                        split_log = str(self.split_categories[x])
-                        full_fml = fml2 + "| split =" + split_log
-                    else:
-                        split_log = None
-                        full_fml = fml2
-
-                    name_dict = self.yxz_name_dict[fval][0][fml]
-                    depvar_name = name_dict["y_names"]
-                    xvar_names = name_dict["x_names"]
-                    if name_dict["z_names"] is None:
-                        zvar_names = name_dict["x_names"]
-                    else:
-                        zvar_names = name_dict["z_names"]
-
-                    Y = model_frame[depvar_name]
-                    X = model_frame[xvar_names]
-                    Z = model_frame[zvar_names]
-
-                    colnames = X.columns
-                    zcolnames = Z.columns
-
-                    Y = Y.to_numpy()
-                    X = X.to_numpy()
-                    Z = Z.to_numpy()
-
-                    N = X.shape[0]
-                    k = X.shape[1]
-
-                    # check for multicollinearity
-                    _multicollinearity_checks(X, Z, self.ivars, fml2)
-
-                    FEOLS = Feols(Y, X, Z)
-                    FEOLS.is_iv = self.is_iv
-                    FEOLS.fml = fml2
-                    FEOLS.ssc_dict = self.ssc_dict
-                    if self.is_iv:
-                        FEOLS.get_fit(estimator = "2sls")
-                    else:
-                        FEOLS.get_fit(estimator = "ols")
-                    FEOLS.na_index = self.dropped_data_dict[fval][x][fml]
-                    FEOLS.data = self.data.iloc[~self.data.index.isin(
-                        FEOLS.na_index), :]
-                    FEOLS.N = N
-                    FEOLS.k = k
-                    if fval != "0":
-                        FEOLS.has_fixef = True
-                        FEOLS.fixef = fval
-                    else:
-                        FEOLS.has_fixef = False
-
-                    vcov_type = _get_vcov_type(vcov, fval)
-
-                    FEOLS.vcov_log = vcov_type
-                    FEOLS.split_log = x
-                    FEOLS.get_vcov(vcov=vcov_type)
-                    FEOLS.get_inference()
-                    FEOLS.coefnames = colnames
-                    if self.icovars is not None:
-                        FEOLS.icovars = self.icovars
-                    self.model_res[full_fml] = FEOLS
-
-
-
-    def feols(self, fml: str, vcov: Union[None, str, Dict[str, str]] = None, ssc=ssc(), fixef_rm: str = "none") -> None:
+        tasks = [(fval, x) for fval in fixef_keys for x in range(len(ctx.samples))]
+        res = self._map(ctx, 
+            lambda task: self._demean_model(ctx, ctx.samples[task[1]][1], task[0], ivars, drop_ref), tasks
+        )
+
+        for fval in fixef_keys:
+            ctx.demeaned_data_dict[fval] = []
+            ctx.dropped_data_dict[fval] = []
+            ctx.yxz_name_dict[fval] = []
+            ctx.na_patterns_dict[fval] = []
+        for (fval, _), (demeaned_data, dropped_data, yxz_name_dict, n_na_patterns) in zip(tasks, res):
+            ctx.demeaned_data_dict[fval].append(demeaned_data)
+            ctx.dropped_data_dict[fval].append(dropped_data)
+            ctx.yxz_name_dict[fval].append(yxz_name_dict)
+            ctx.na_patterns_dict[fval].append(n_na_patterns)
+
+        # the interacted covariates of the last model, used by iplot(). they are set
+        # here, after all concurrent demeaning tasks are done
+        name_dicts = list(ctx.yxz_name_dict[fixef_keys[-1]][-1].values())
+        if len(name_dicts) > 0:
+            ctx.icovars = name_dicts[-1]["icovars"]
+
+    def _estimate_all_models(self, ctx, vcov):
+
+        '''
+        estimate all models based on the demeaned data. the models are estimated
+        concurrently if feols() is called with n_jobs != 1.
+        Args:
+            ctx: the estimation context of the feols() call
+            vcov: the vcov type for inference
+        Returns:
+            A dictionary of the estimated models, keyed by formula, in the order of the
+            fixed effects, split samples and formulas.
+        '''
+
+        tasks = [
+            (fval, x, fml)
+            for fval in ctx.fml_dict.keys()
+            for x in range(len(ctx.samples))
+            for fml in ctx.demeaned_data_dict[fval][x]
+        ]
+        res = self._map(ctx, lambda task: self._estimate_model(ctx, *task, vcov), tasks)
+
+        return dict(res)
+
+    def _estimate_model(self, ctx, fval, x, fml, vcov):
+
+        '''
+        estimate a single model
+        Args:
+            ctx: the estimation context of the feols() call
+            fval: the fixed effects specification
+            x: the index of the sample in ctx.samples
+            fml: the formula of the model, without fixed effects
+            vcov: the vcov type for inference
+        Returns:
+            A tuple of the full formula and the fitted Feols object.
+        '''
+
+        split_log, model_data, positions = ctx.samples[x]
+
+        # get the (demeaned) model frame. key is fml without fixed effects
+        model_frame = ctx.demeaned_data_dict[fval][x][fml]
+
+        # update formula with fixed effect. fval is "0" for no fixed effect
+        if fval == "0":
+            fml2 = fml
+        else:
+            fml2 = fml + "|" + fval
+
+        # formula log: add information on sample split
+        if split_log is not None:
+            full_fml = fml2 + "| split =" + split_log
+        else:
+            full_fml = fml2
+
+        name_dict = ctx.yxz_name_dict[fval][x][fml]
+        depvar_name = name_dict["y_names"]
+        xvar_names = name_dict["x_names"]
+        if name_dict["z_names"] is None:
+            zvar_names = name_dict["x_names"]
+        else:
+            zvar_names = name_dict["z_names"]
+
+        Y = model_frame[depvar_name]
+        X = model_frame[xvar_names]
+        Z = model_frame[zvar_names]
+
+        colnames = X.columns
+        zcolnames = Z.columns
+
+        Y = Y.to_numpy()
+        X = X.to_numpy()
+        Z = Z.to_numpy()
+
+        N = X.shape[0]
+        k = X.shape[1]
+
+        # check for multicollinearity
+        _multicollinearity_checks(X, Z, ctx.ivars, fml2)
+
+        FEOLS = Feols(Y, X, Z)
+        FEOLS.is_iv = ctx.is_iv
+        FEOLS.fml = fml2
+        FEOLS.ssc_dict = ctx.ssc_dict
+        if ctx.is_iv:
+            FEOLS.get_fit(estimator = "2sls")
+        else:
+            FEOLS.get_fit(estimator = "ols")
+        # boolean mask of the rows of the (split) data that are not part of the estimation sample
+        FEOLS.na_mask = ctx.dropped_data_dict[fval][x][fml]
+        FEOLS.data = model_data[~FEOLS.na_mask]
+        FEOLS.na_index = model_data.index[FEOLS.na_mask]
+        # row positions of the estimation sample in the data of the Fixest object
+        FEOLS._data_positions = positions[~FEOLS.na_mask]
+        FEOLS.N = N
+        FEOLS.k = k
+        if fval != "0":
+            FEOLS.has_fixef = True
+            FEOLS.fixef = fval
+        else:
+            FEOLS.has_fixef = False
+
+        vcov_type = _get_vcov_type(vcov, fval)
+
+        FEOLS.split_log = split_log
+        FEOLS.coefnames = colnames
+        FEOLS.zcolnames = zcolnames
+        FEOLS._model_spec = self._model_specs[name_dict["union_fml"]]
+        # inference is computed lazily, on first access - or right away, if the
+        # models are estimated concurrently
+        FEOLS.set_vcov(vcov=vcov_type)
+        if ctx.executor is not None:
+            FEOLS._update_inference()
+        if name_dict["icovars"] is not None:
+            FEOLS.icovars = name_dict["icovars"]
+
+        return full_fml, FEOLS
+
+    def feols(self, fml: str, vcov: Union[None, str, Dict[str, str], List[Union[str, Dict[str, str]]]] = None, ssc=ssc(), fixef_rm: str = "none", split: Optional[str] = None, fsplit: Optional[str] = None, n_jobs: Optional[int] = 1) -> "Fixest":
         '''
         Method for fixed effects regression modeling using the PyHDFE package for projecting out fixed effects.
         Args:
@@ -419,9 +631,23 @@ class Fixest:
             vcov (Union(str, dict)): A string or dictionary specifying the type of variance-covariance matrix to use for inference.
                 If a string, it can be one of "iid", "hetero", "HC1", "HC2", "HC3".
                 If a dictionary, it should have the format dict("CRV1":"clustervar") for CRV1 inference or dict(CRV3":"clustervar") for CRV3 inference.
+                For multiway clustering, use dict("CRV1":"clustervar1+clustervar2").
+                For Conley spatial HAC inference, use dict("conley": ("lat", "lon", cutoff)), with the distance cutoff in km.
+                For Driscoll-Kraay and panel Newey-West inference, use dict("DK": "time") and dict("NW": ("unit", "time")).
+                If a list of strings and dictionaries, all vcov types are computed and stored, and the first one
+                is used for inference. Other stored vcov types can be activated via `vcov()` without recomputation.
             fixef_rm: A string specifiny whether singleton fixed effects should be dropped. Options are "none" (default) and "singleton". If "singleton", singleton fixed effects are dropped.
+            split: A string specifying a variable for split sample estimation. All models are estimated separately
+                for each value of the variable.
+            fsplit: As split, but the models are additionally estimated on the full sample.
+            n_jobs: The number of threads used to demean (per fixed effects specification and split sample)
+                and to estimate the models (including the inference of the specified vcov type). Defaults to 1,
+                i.e. sequential estimation. If None, one thread per CPU is used. The numba and BLAS threads
+                (see pyfixest.set_num_threads()) are split evenly across the threads. The results do not depend on n_jobs.
         Returns:
-            None
+            A Fixest object with the models of this call. The models are also added to the models of
+            this Fixest object. With concurrent feols() calls on the same Fixest object, use the returned
+            object to access the results of a single call.
         Examples:
             Standard formula:
                 fml = 'Y ~ X1 + X2'
@@ -438,6 +664,8 @@ class Fixest:
                 fml = 'Y1 + Y2 ~ csw(X1, X2, X3) '
             Combinations:
                 fml = 'Y1 + Y2 ~ csw(X1, X2, X3) | sw(X4, X5) + X6'
+            Split sample estimation:
+                fixest_model = Fixest(data=data).feols('Y ~ X1 | fe1', split='group')
 
         Details:
             The method proceeds in the following steps:
@@ -447,106 +675,106 @@ class Fixest:
             4. fit all models
         '''
 
-        self.fml = fml.replace(" ", "")
-        self.split = None
-
         # deparse formula, at least partially
         fxst_fml = FixestFormulaParser(fml)
 
-        if fxst_fml.is_iv:
-            self.is_iv = True
-        else:
-            self.is_iv = False
-
         # add function argument to these methods for IV
         fxst_fml.get_fml_dict()
         fxst_fml.get_var_dict()
         fxst_fml._transform_fml_dict()
 
-        if self.is_iv:
+        if fxst_fml.is_iv:
             # create required dicts for first stage IV regressions
             fxst_fml.get_fml_dict(iv = True)
             fxst_fml.get_var_dict(iv = True)
             fxst_fml._transform_fml_dict(iv = True)
 
-
-        self.fml_dict = fxst_fml.fml_dict
-        self.var_dict = fxst_fml.var_dict
-        self.fml_dict2 = fxst_fml.fml_dict2
-
-        if self.is_iv:
-            self.fml_dict_iv = fxst_fml.fml_dict_iv
-            self.var_dict_iv = fxst_fml.var_dict_iv
-            self.fml_dict2_iv = fxst_fml.fml_dict2_iv
-        else:
-            self.fml_dict_iv = self.fml_dict
-            self.var_dict_iv = self.var_dict
-            self.fml_dict2_iv = self.fml_dict2
-
-        self.ivars = fxst_fml.ivars
-
-
-        self.ssc_dict = ssc
-        self.drop_singletons = _drop_singletons(fixef_rm)
+        # all state of this call lives in the estimation context, so that
+        # several feols() calls can run concurrently on the same Fixest object
+        ctx = _EstimationContext(
+            fml = fml.replace(" ", ""),
+            fxst_fml = fxst_fml,
+            ssc_dict = ssc,
+            drop_singletons = _drop_singletons(fixef_rm),
+            split = split,
+            fsplit = fsplit
+        )
 
         # get all fixed effects combinations
-        fixef_keys = list(self.var_dict.keys())
+        fixef_keys = list(ctx.var_dict.keys())
 
-        ivars, drop_ref = _clean_ivars(self.ivars, self.data)
+        ctx.splitvar, _, estimate_split_model, estimate_full_model = _prepare_split_estimation(split, fsplit, self.data, ctx.var_dict)
 
-        # dropped_data_dict and demeaned_data_dict are
-        # dictionaries with keys for each fixed effects combination and
-        # has values of lists of demeaned dataframes
-        # the list is a singelton list unless split sample estimation is used
-        # e.g it looks like this (without split estimation):
-        # {'fe1': [demeaned_data_df], 'fe1+fe2': [demeaned_data_df]}
-        # and like this (with split estimation):
-        # {'fe1': [demeaned_data_df1, demeaned_data_df2], 'fe1+fe2': [demeaned_data_df1, demeaned_data_df2]}
-        # the lists are sorted in the order of the split variable
+        # interacted fixed effects are created before the data is split
+        ctx.data = self._add_interacted_fixef(fixef_keys)
 
-        self.dropped_data_dict = dict()
-        self.demeaned_data_dict = dict()
-        # names of depvar, X, Z matrices
-        self.yxz_name_dict = dict()
+        ivars, drop_ref = _clean_ivars(ctx.ivars, ctx.data)
 
-        estimate_full_model = True
-        estimate_split_model = False
-        # currently no fsplit allowed
-        fsplit = None
+        # list of (split_log, data) tuples: the full sample and / or the split samples
+        ctx.samples = _get_split_samples(ctx.data, ctx.splitvar, estimate_full_model)
 
-        self.splitvar, _, estimate_split_model, estimate_full_model = _prepare_split_estimation(self.split, fsplit, self.data, self.var_dict)
+        if n_jobs is not None and (not isinstance(n_jobs, int) or n_jobs < 1):
+            raise ValueError("n_jobs must be None or a positive integer.")
 
-        # demean all models: based on fixed effects x split x missing value combinations
-        self._demean_all_models(fixef_keys, ivars, drop_ref, estimate_full_model, estimate_split_model)
+        n_workers = n_jobs if n_jobs is not None else (os.cpu_count() or 1)
 
-        # create self.is_fixef_multi flag
-        self._is_multiple_estimation()
+        with _worker_threads(n_workers) as numba_threads:
+            # a thread pool is only started if the models are estimated concurrently
+            ctx.executor = ThreadPoolExecutor(max_workers = n_workers) if n_workers > 1 else None
+            ctx.numba_threads = numba_threads
+            try:
+                # demean all models: based on fixed effects x split x missing value combinations
+                self._demean_all_models(ctx, fixef_keys, ivars, drop_ref)
 
-        if self.is_fixef_multi and self.is_iv:
-            raise ValueError("Multiple Estimations is currently not supported with IV. This is mostly due to insufficient testing and will be possible with the next release of PyFixest.")
+                # estimate all regression models based on demeaned data
+                model_res = self._estimate_all_models(ctx, vcov = vcov)
+            finally:
+                if ctx.executor is not None:
+                    ctx.executor.shutdown()
+                ctx.executor = None
 
-        # estimate all regression models based on demeaned data
-        self._estimate_all_models(vcov = vcov)
+        # the results of this call, independent of concurrent feols() calls
+        fixest = self._get_call_view(ctx, model_res)
 
-        return self
+        # the Fixest object collects the models of all feols() calls. the results are
+        # published with a single update: readers of model_res never see a partially
+        # updated dictionary
+        with self._lock:
+            model_res = dict(self.model_res)
+            model_res.update(fixest.model_res)
+            self.model_res = model_res
+            # attributes of the last feols() call, used by the summary and plotting methods
+            for attr in _CALL_ATTRIBUTES:
+                setattr(self, attr, getattr(ctx, attr))
 
+        return fixest
 
-    def _is_multiple_estimation(self):
+    def _get_call_view(self, ctx, model_res):
 
         '''
-        helper method to check if multiple regression models will be estimated
+        Create a Fixest object that holds the results of a single feols() call. It shares the data
+        and the caches (and their lock) with this Fixest object, but has its own models.
+        Args:
+            ctx: the estimation context of the feols() call
+            model_res: the models estimated in the feols() call
+        Returns:
+            A Fixest object.
         '''
 
-        self.is_fixef_multi = False
-        if len(self.fml_dict.keys()) > 1:
-            self.is_fixef_multi = True
-        elif len(self.fml_dict.keys()) == 1:
-            first_key = next(iter(self.fml_dict))
-            if len(self.fml_dict[first_key]) > 1:
-                self.is_fixef_multi = True
+        fixest = Fixest.__new__(Fixest)
+        fixest.data = ctx.data
+        fixest.model_res = model_res
+        fixest._model_specs = self._model_specs
+        fixest._fixef_cache = self._fixef_cache
+        fixest._lock = self._lock
+
+        for attr in _CALL_ATTRIBUTES:
+            setattr(fixest, attr, getattr(ctx, attr))
+
+        return fixest
 
 
-    def vcov(self, vcov: Union[str, Dict[str, str]]) -> None:
+    def vcov(self, vcov: Union[str, Dict[str, str], List[Union[str, Dict[str, str]]]], vcov_fix: bool = True) -> None:
         '''
         Update regression inference "on the fly".
         By calling vcov() on a "Fixest" object, all inference procedures applied
@@ -555,7 +783,15 @@ class Fixest:
             vcov: A string or dictionary specifying the type of variance-covariance matrix to use for inference.
                 If a string, can be one of "iid", "hetero", "HC1", "HC2", "HC3".
                 If a dictionary, it should have the format {"CRV1":"clustervar"} for CRV1 inference
-                or {"CRV3":"clustervar"} for CRV3 inference.
+                or {"CRV3":"clustervar"} for CRV3 inference. For multiway clustering, use
+                {"CRV1":"clustervar1+clustervar2"}.
+                For Conley spatial HAC inference, use {"conley": ("lat", "lon", cutoff)}.
+                For Driscoll-Kraay and panel Newey-West inference, use {"DK": "time"} and {"NW": ("unit", "time")}.
+                If a list, all vcov types are computed and the first one is used for inference.
+                The covariance matrices are computed lazily, when standard errors, t-statistics or p-values
+                are first accessed. vcov types that have already been computed for a model are not computed again.
+            vcov_fix: Only relevant for multiway clustering. If True (default), negative eigenvalues of
+                the covariance matrix are set to zero.
         Returns:
             None
         '''
@@ -565,13 +801,30 @@ class Fixest:
         for model in list(self.model_res.keys()):
 
             fxst = self.model_res[model]
-            fxst.vcov_log = vcov
-
-            fxst.get_vcov(vcov=vcov)
-            fxst.get_inference()
+            fxst.set_vcov(vcov=vcov, vcov_fix=vcov_fix)
 
         return self
 
+    def vcov_all(self, vcov: List[Union[str, Dict[str, str]]], vcov_fix: bool = True) -> None:
+        '''
+        Compute multiple variance covariance matrices for all models at once.
+        All vcov types are derived from the same scores, which are only computed once per model.
+        The first vcov type is used for inference, all others can be activated via
+        `vcov()` without recomputation.
+        Args:
+            vcov: A list of strings and dictionaries specifying the types of variance-covariance matrices,
+                e.g. ["iid", "HC1", {"CRV1":"clustervar"}]. See `vcov()` for details.
+            vcov_fix: Only relevant for multiway clustering. If True (default), negative eigenvalues of
+                the covariance matrix are set to zero.
+        Returns:
+            None
+        '''
+
+        if not isinstance(vcov, list):
+            raise ValueError("vcov must be a list of vcov types.")
+
+        return self.vcov(vcov, vcov_fix = vcov_fix)
+
     def tidy(self, type: Optional[str] = None) -> Union[pd.DataFrame, str]:
         '''
         Returns the results of an estimation using `feols()` as a tidy Pandas DataFrame.
@@ -672,8 +925,23 @@ class Fixest:
             A pd.DataFrame with coefficient names and Estimates. The key indicates which models the estimated statistic derives from.
         '''
 
-        df = self.tidy()
-        return df[['coefnames', 'Estimate']]
+        # build from the coefficients only, so that inference is not triggered
+        res = []
+        for x in list(self.model_res.keys()):
+
+            fxst = self.model_res[x]
+
+            res.append(
+                pd.DataFrame(
+                    {
+                        'fml': x,
+                        'coefnames': fxst.coefnames,
+                        'Estimate': fxst.beta_hat
+                    }
+                )
+            )
+
+        return pd.concat(res, axis=0).set_index('fml')
 
     def se(self)-> pd.DataFrame:
         '''
@@ -780,10 +1048,69 @@ class Fixest:
             rotate_xticks=rotate_xticks
         )
 
-    def wildboottest(self, B, param: Union[str, None] = None, weights_type: str = 'rademacher', impose_null: bool = True, bootstrap_type: str = '11', seed: Union[str, None] = None, adj: bool = True, cluster_adj: bool = True) -> pd.DataFrame:
+    def wald_test(self, R: Union[pd.DataFrame, List[pd.DataFrame], np.ndarray, List[np.ndarray]], q: Union[np.ndarray, List[np.ndarray], None] = None) -> pd.DataFrame:
+
+        '''
+        Compute Wald tests of one or many linear hypotheses of the form H0: R*beta = q for all regressions in the Fixest object.
+        Args:
+            R: The restrictions. Either a pd.DataFrame with one row per restriction and columns named after the coefficients,
+                or a list of such pd.DataFrames for multiple hypotheses. Hypotheses that involve coefficients which are not
+                included in a model are reported as NaN for this model. If all models have the same coefficients, R can
+                also be passed as a np.ndarray or a list thereof, see `Feols.wald_test()`.
+            q: The values of R*beta under the null hypotheses. Zero by default.
+        Returns:
+            A pd.DataFrame with one row per model and hypothesis, with the F-statistic, its p-value and its degrees of freedom.
+            The index indicates which model the estimated statistic derives from.
+        '''
+
+        R_list = R if isinstance(R, list) else [R]
+        if q is not None and not isinstance(q, list):
+            q = [q] if not isinstance(R, list) else list(np.atleast_2d(q))
+
+        res = []
+        for x in list(self.model_res.keys()):
+
+            fxst = self.model_res[x]
+            coefnames = list(fxst.coefnames)
+
+            # align named restrictions with the coefficients of the model
+            applicable = []
+            R_model = []
+            for R_h in R_list:
+                if isinstance(R_h, pd.DataFrame):
+                    used = R_h.columns[(R_h != 0).any(axis = 0)]
+                    applicable.append(all(col in coefnames for col in used))
+                    R_model.append(R_h.reindex(columns = coefnames, fill_value = 0).to_numpy())
+                else:
+                    applicable.append(True)
+                    R_model.append(np.asarray(R_h))
+            applicable = np.array(applicable)
+
+            wald_res = pd.DataFrame(
+                np.nan,
+                index = pd.Index(np.arange(len(R_list)), name = 'hypothesis'),
+                columns = ['statistic', 'pvalue', 'df1', 'df2']
+            )
+            if np.any(applicable):
+                idx = np.where(applicable)[0]
+                q_model = None if q is None else [q[i] for i in idx]
+                wald_res.iloc[idx] = fxst.wald_test([R_model[i] for i in idx], q_model).to_numpy()
+
+            wald_res = wald_res.reset_index()
+            wald_res.insert(0, 'fml', x)
+            res.append(wald_res)
+
+        res = pd.concat(res, axis=0).set_index('fml')
+
+        return res
+
+    def wildboottest(self, B, param: Union[str, None] = None, weights_type: str = 'rademacher', impose_null: bool = True, bootstrap_type: str = '11', seed: Union[int, None] = None, adj: bool = True, cluster_adj: bool = True, conf_int: bool = False, alpha: float = 0.05) -> pd.DataFrame:
 
         '''
         Run a wild cluster bootstrap for all regressions in the Fixest object.
+        If the models are estimated with cluster robust inference, a wild cluster bootstrap is run,
+        clustered by the same cluster variable. Otherwise, a heteroskedastic wild bootstrap is run.
+        Models with fixed effects are supported, models estimated via IV are not.
 
         Args:
 
@@ -795,10 +1122,17 @@ class Fixest:
                                 Defaults to True.
             bootstrap_type (str, optional):A string of length one. Allows to choose the bootstrap type
                                 to be run. Either '11', '31', '13' or '33'. '11' by default. Defaults to '11'.
-            seed (Union[str, None], optional): Option to provide a random seed. Defaults to None.
+            seed (Union[int, None], optional): Option to provide a random seed. Defaults to None.
+            adj (bool, optional): Whether to apply a small sample adjustment of (N-1) / (N-k). Defaults to True.
+            cluster_adj (bool, optional): Whether to apply a small sample adjustment of G / (G-1). Defaults to True.
+            conf_int (bool, optional): Whether to compute a bootstrap confidence interval by test inversion, i.e. as the set of
+                                all null hypotheses that are not rejected at level alpha. All nulls are evaluated with the same
+                                bootstrap weights. Defaults to False.
+            alpha (float, optional): The significance level of the confidence interval. Defaults to 0.05.
 
         Returns:
-            A pd.DataFrame with bootstrapped t-statistic and p-value. The index indicates which model the estimated statistic derives from.
+            A pd.DataFrame with bootstrapped t-statistic and p-value, and, if conf_int is True, the bounds of the
+            confidence interval. The index indicates which model the estimated statistic derives from.
         '''
 
 
@@ -806,25 +1140,115 @@ class Fixest:
         for x in list(self.model_res.keys()):
 
             fxst = self.model_res[x]
+            fxst._update_inference()
 
             if hasattr(fxst, 'clustervar'):
                 cluster = fxst.clustervar
             else:
                 cluster = None
 
-            boot_res = fxst.get_wildboottest(B, cluster, param,  weights_type, impose_null, bootstrap_type, seed, adj, cluster_adj)
+            boot_res = fxst.get_wildboottest(B, cluster, param,  weights_type, impose_null, bootstrap_type, seed, adj, cluster_adj, conf_int, alpha)
 
             pvalue = boot_res["pvalue"]
             tstat = boot_res["statistic"]
 
+            res_dict = {
+                'fml': x,
+                'param':param,
+                't value': tstat,
+                'Pr(>|t|)': pvalue
+            }
+
+            if conf_int:
+                res_dict[f"{alpha / 2 * 100} %"] = boot_res["conf_int"][0]
+                res_dict[f"{(1 - alpha / 2) * 100} %"] = boot_res["conf_int"][1]
+
+            res.append(pd.Series(res_dict))
+
+        res = pd.concat(res, axis=1).T.set_index('fml')
+
+        return res
+
+
+    def bayesian_bootstrap(self, B: int = 999, cluster: Optional[str] = None, seed: Union[int, None] = None, alpha: float = 0.05) -> pd.DataFrame:
+
+        '''
+        Run a weighted (Bayesian) bootstrap for all regressions in the Fixest object. For each draw, observation
+        or cluster weights are drawn from a standard exponential distribution and the model is re-estimated
+        via weighted least squares. Models with fixed effects are demeaned under all weight vectors in parallel,
+        without duplicating the data.
+
+        Args:
+            B (int, optional): The number of bootstrap iterations to run. Defaults to 999.
+            cluster (Optional[str], optional): If provided, bootstrap weights are drawn at the cluster level. Defaults to None.
+            seed (Union[int, None], optional): Option to provide a random seed. Defaults to None.
+            alpha (float, optional): The significance level of the percentile confidence intervals. Defaults to 0.05.
+
+        Returns:
+            A pd.DataFrame with the estimated coefficients, bootstrap standard errors and percentile confidence intervals.
+            The index indicates which model the estimated statistic derives from. The bootstrapped coefficients of each model
+            are stored in the attribute `beta_boot` of the model.
+        '''
+
+        res = []
+        for x in list(self.model_res.keys()):
+
+            fxst = self.model_res[x]
+            fxst.beta_boot = fxst.get_bayesian_bootstrap(B, cluster, seed)
+
+            res.append(
+                pd.DataFrame(
+                    {
+                        'fml': x,
+                        'coefnames': fxst.coefnames,
+                        'Estimate': fxst.beta_hat,
+                        'Std. Error': np.std(fxst.beta_boot, axis = 0, ddof = 1),
+                        f"{alpha / 2 * 100} %": np.quantile(fxst.beta_boot, alpha / 2, axis = 0),
+                        f"{(1 - alpha / 2) * 100} %": np.quantile(fxst.beta_boot, 1 - alpha / 2, axis = 0)
+                    }
+                )
+            )
+
+        res = pd.concat(res, axis=0).set_index('fml')
+
+        return res
+
+
+    def ritest(self, param: str, resampvar: str, reps: int = 1000, cluster: Optional[str] = None, strata: Optional[str] = None, seed: Union[int, None] = None) -> pd.DataFrame:
+
+        '''
+        Run a randomization inference test of the sharp null hypothesis of no effect of param for all regressions
+        in the Fixest object. The treatment is permuted reps times and the coefficient re-estimated for each permutation.
+        Only the treatment is demeaned anew, in batches over permutations.
+
+        Args:
+            param (str): The test parameter of interest.
+            resampvar (str): The variable to be permuted. Currently, this needs to be the test parameter.
+            reps (int, optional): The number of permutations. Defaults to 1000.
+            cluster (Optional[str], optional): If provided, the treatment is permuted at the cluster level, i.e.
+                                all observations of a cluster are assigned the same treatment. Defaults to None.
+            strata (Optional[str], optional): If provided, the treatment is permuted within strata. Defaults to None.
+            seed (Union[int, None], optional): Option to provide a random seed. Defaults to None.
+
+        Returns:
+            A pd.DataFrame with the estimated coefficients, the randomization inference p-values and
+            their standard errors. The index indicates which model the estimated statistic derives from.
+        '''
+
+        res = []
+        for x in list(self.model_res.keys()):
+
+            fxst = self.model_res[x]
+            ri_res = fxst.get_ritest(param, resampvar, reps, cluster, strata, seed)
 
             res.append(
                 pd.Series(
                     {
                         'fml': x,
-                        'param':param,
-                        't value': tstat,
-                        'Pr(>|t|)': pvalue
+                        'param': param,
+                        'Estimate': ri_res["estimate"],
+                        'Pr(>|t|)': ri_res["pvalue"],
+                        'Std. Error (Pr(>|t|))': ri_res["se_pvalue"]
                     }
                 )
             )
@@ -834,6 +1258,134 @@ class Fixest:
         return res
 
 
+    def rwolf(self, param: str, B: int = 999, weights_type: str = 'rademacher', impose_null: bool = True, seed: Union[int, None] = None, adj: bool = True, cluster_adj: bool = True) -> pd.DataFrame:
+
+        '''
+        Compute Romano-Wolf adjusted p-values for the hypotheses H0: param = 0 in all regressions in the Fixest object,
+        based on a wild (cluster) bootstrap. The bootstrap weights are drawn once and shared across all models.
+
+        Args:
+            param (str): The test parameter of interest.
+            B (int, optional): The number of bootstrap iterations to run. Defaults to 999.
+            weights_type (str, optional): The type of bootstrap weights. Either 'rademacher', 'mammen', 'webb' or 'normal'.
+                                Defaults to 'rademacher'.
+            impose_null (bool, optional): Should the null hypothesis be imposed on the bootstrap dgp, or not?
+                                Defaults to True.
+            seed (Union[int, None], optional): Option to provide a random seed. Defaults to None.
+            adj (bool, optional): Whether to apply a small sample adjustment of (N-1) / (N-k). Defaults to True.
+            cluster_adj (bool, optional): Whether to apply a small sample adjustment of G / (G-1). Defaults to True.
+
+        Returns:
+            A pd.DataFrame with the t-statistics, the unadjusted bootstrap p-values and the Romano-Wolf
+            adjusted p-values. The index indicates which model the estimated statistic derives from.
+        '''
+
+        return self._multiple_testing(param, "rwolf", B, weights_type, impose_null, seed, adj, cluster_adj)
+
+
+    def wyoung(self, param: str, B: int = 999, weights_type: str = 'rademacher', impose_null: bool = True, seed: Union[int, None] = None, adj: bool = True, cluster_adj: bool = True) -> pd.DataFrame:
+
+        '''
+        Compute Westfall-Young adjusted p-values for the hypotheses H0: param = 0 in all regressions in the Fixest object,
+        based on a wild (cluster) bootstrap. The bootstrap weights are drawn once and shared across all models.
+
+        Args:
+            param (str): The test parameter of interest.
+            B (int, optional): The number of bootstrap iterations to run. Defaults to 999.
+            weights_type (str, optional): The type of bootstrap weights. Either 'rademacher', 'mammen', 'webb' or 'normal'.
+                                Defaults to 'rademacher'.
+            impose_null (bool, optional): Should the null hypothesis be imposed on the bootstrap dgp, or not?
+                                Defaults to True.
+            seed (Union[int, None], optional): Option to provide a random seed. Defaults to None.
+            adj (bool, optional): Whether to apply a small sample adjustment of (N-1) / (N-k). Defaults to True.
+            cluster_adj (bool, optional): Whether to apply a small sample adjustment of G / (G-1). Defaults to True.
+
+        Returns:
+            A pd.DataFrame with the t-statistics, the unadjusted bootstrap p-values and the Westfall-Young
+            adjusted p-values. The index indicates which model the estimated statistic derives from.
+        '''
+
+        return self._multiple_testing(param, "wyoung", B, weights_type, impose_null, seed, adj, cluster_adj)
+
+
+    def _multiple_testing(self, param, method, B, weights_type, impose_null, seed, adj, cluster_adj):
+
+        '''
+        Run a wild (cluster) bootstrap for all regressions in the Fixest object with shared bootstrap weights
+        and compute multiple testing adjusted p-values.
+        Args:
+            param (str): The test parameter of interest.
+            method (str): Either "rwolf" or "wyoung".
+            Other arguments: See `rwolf()`.
+        Returns:
+            A pd.DataFrame with the t-statistics, the unadjusted and the adjusted bootstrap p-values.
+        '''
+
+        fmls = list(self.model_res.keys())
+        clustervars = set()
+        for x in fmls:
+            fxst = self.model_res[x]
+            fxst._update_inference()
+            if fxst.is_iv:
+                raise ValueError("Wild cluster bootstrap is not supported with IV estimation.")
+            if param not in fxst.coefnames:
+                raise ValueError(f"The parameter {param} is not included in the model {x}.")
+            clustervars.add(fxst.clustervar if fxst.is_clustered else None)
+
+        if len(clustervars) > 1:
+            raise ValueError("Multiple testing corrections require all models to use the same vcov type.")
+        clustervar = clustervars.pop()
+
+        if clustervar is None:
+            # heteroskedastic bootstrap: one weight per observation of the full data set
+            global_codes = None
+            G = self.data.shape[0]
+        else:
+            if len(clustervar.split("+")) > 1:
+                raise ValueError("Wild cluster bootstrap is not supported with multiway clustering.")
+            global_codes, uniques = pd.factorize(self.data[clustervar])
+            G = len(uniques)
+
+        components_list = []
+        index_list = []
+        for x in fmls:
+
+            fxst = self.model_res[x]
+            positions = fxst._data_positions
+
+            R = np.zeros(len(fxst.coefnames))
+            R[list(fxst.coefnames).index(param)] = 1
+
+            cluster = None if global_codes is None else global_codes[positions]
+            components = _wildboot_components(fxst.X, fxst.Y.flatten(), cluster, R, impose_null, adj, cluster_adj)
+
+            components_list.append(components)
+            index_list.append(positions if global_codes is None else np.asarray(components["uniques"]))
+
+        boot = wildboottest_multi(components_list, index_list, G, B, weights_type, seed)
+
+        t_stat = boot["t_stat"]
+        t_boot = boot["t_boot"]
+        pvalue = np.mean(np.abs(t_stat)[:, np.newaxis] < np.abs(t_boot), axis = 1)
+
+        if method == "rwolf":
+            adj_pvalue = _get_rwolf_pvalues(t_stat, t_boot)
+            adj_name = "RW Pr(>|t|)"
+        else:
+            adj_pvalue = _get_wyoung_pvalues(t_stat, t_boot)
+            adj_name = "WY Pr(>|t|)"
+
+        res = pd.DataFrame({
+            'fml': fmls,
+            'param': param,
+            't value': t_stat,
+            'Pr(>|t|)': pvalue,
+            adj_name: adj_pvalue
+        }).set_index('fml')
+
+        return res
+
+
 def _coefplot(models: List, df: pd.DataFrame, figsize: Tuple[int, int], alpha: float, yintercept: Optional[int] = None,
               xintercept: Optional[int] = None, is_iplot: bool = False,
               rotate_xticks: float = 0) -> None:
@@ -979,6 +1531,10 @@ def _prepare_split_estimation(split, fsplit, data, var_dict):
         estimate_full_model (bool): Whether to estimate the full model.
     '''
 
+    for x in [split, fsplit]:
+        if x is not None and x not in data.columns:
+            raise ValueError("Split variable " + x + " not found in data.")
+
     if split is not None:
         if fsplit is not None:
             raise ValueError(
@@ -991,7 +1547,7 @@ def _prepare_split_estimation(split, fsplit, data, var_dict):
     elif fsplit is not None:
         splitvar = data[fsplit]
         splitvar_name = fsplit
-        estimate_full_model = False
+        estimate_full_model = True
         estimate_split_model = True
     else:
         splitvar = None
@@ -1001,18 +1557,43 @@ def _prepare_split_estimation(split, fsplit, data, var_dict):
 
 
     if splitvar is not None:
-        split_categories = np.unique(splitvar)
-        if splitvar_name not in data.columns:
-            raise ValueError("Split variable " +
-                            splitvar + " not found in data.")
         if splitvar_name in var_dict.keys():
-            raise ValueError("Split variable " + splitvar +
+            raise ValueError("Split variable " + splitvar_name +
                             " cannot be a fixed effect variable.")
-        if splitvar.dtype.name != "category":
-            splitvar = pd.Categorical(splitvar)
 
     return splitvar, splitvar_name, estimate_split_model, estimate_full_model
 
+
+def _get_split_samples(data, splitvar, estimate_full_model):
+
+    '''
+    Partitions the data into split samples, via a single stable sort on the codes of the split variable.
+    Rows with a missing split variable are not part of any split sample.
+
+    Args:
+        data (pandas.DataFrame): The dataframe containing the data used for the model fitting.
+        splitvar (pandas.Series): The split variable. None if no split sample estimation.
+        estimate_full_model (bool): Whether to estimate the full model.
+    Returns:
+        samples (list): A list of tuples (split_log, data, positions). split_log is None for the full sample
+            and the value of the split variable for a split sample. positions are the row positions of the
+            sample in data, which (unlike the index of data) are unique.
+    '''
+
+    samples = []
+    if estimate_full_model:
+        samples.append((None, data, np.arange(data.shape[0])))
+
+    if splitvar is not None:
+        codes, categories = pd.factorize(splitvar, sort = True)
+        order = np.argsort(codes, kind = "stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(categories) + 1))
+        for i, category in enumerate(categories):
+            positions = order[bounds[i]:bounds[i + 1]]
+            samples.append((str(category), data.iloc[positions], positions))
+
+    return samples
+
 def _multicollinearity_checks(X, Z, ivars, fml2):
 
     '''
@@ -1117,18 +1698,71 @@ def _drop_singletons(fixef_rm):
 
 
 
-def _find_untransformed_depvar(transformed_depvar):
+def _get_term_columns(mm, fml):
 
     '''
     Args:
-        transformed_depvar (str): The transformed depvar
+        mm (formulaic.ModelMatrix): A model matrix built for a superset of the terms in fml.
+        fml (str): A one-sided formula, e.g. "X1+np.log(X2)".
+    Returns:
+        columns (list): The columns of mm that belong to the terms of fml, in formulaic's term order.
+        variables (list): The names of the variables the terms of fml are computed from.
 
-    find untransformed depvar in a formula
-    i.e. if "a" is transormed to "log(a)", then "a" is returned
+    select the columns of the terms of a formula from a model matrix
     '''
 
-    match = re.search(r'\((.*?)\)', transformed_depvar)
-    if match:
-        return match.group(1)
-    else:
-        return transformed_depvar
+    term_slices = {str(term): term_slice for term, term_slice in mm.model_spec.term_slices.items()}
+    term_variables = {str(term): term_vars for term, term_vars in mm.model_spec.term_variables.items()}
+
+    columns = []
+    variables = []
+    for term in Formula(fml):
+        term = str(term)
+        # a left hand side model matrix has no intercept
+        if term == "1" and term not in term_slices:
+            continue
+        columns += list(mm.columns[term_slices[term]])
+        variables += [str(x) for x in term_variables[term]]
+
+    return columns, variables
+
+
+def _get_level_columns(mm, x_names):
+
+    '''
+    Args:
+        mm (formulaic.ModelMatrix): A model matrix.
+        x_names (list): The columns of mm in the model.
+    Returns:
+        A list with the columns in x_names of each term of mm that consists of categorical levels only.
+
+    group the level columns of categorical variables by term
+    '''
+
+    level_columns = []
+    for term_slice in mm.model_spec.term_slices.values():
+        columns = list(mm.columns[term_slice])
+        if all("[" in x for x in columns):
+            columns = [x for x in columns if x in x_names]
+            if len(columns) > 0:
+                level_columns.append(columns)
+
+    return level_columns
+
+
+def _is_multiple_estimation(fml_dict: dict) -> bool:
+
+    '''
+    helper function to check if multiple regression models are estimated
+    Args:
+        fml_dict: the dictionary of formulas of a feols() call
+    Returns:
+        True if more than one model is estimated
+    '''
+
+    if len(fml_dict.keys()) > 1:
+        return True
+    elif len(fml_dict.keys()) == 1:
+        first_key = next(iter(fml_dict))
+        return len(fml_dict[first_key]) > 1
+    return False
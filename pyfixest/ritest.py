@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+
+from typing import Union, Optional
+from pyfixest.demean import demean
+
+
+def ritest(X: np.ndarray, Y: np.ndarray, param_index: int, treatment: np.ndarray, fe: Optional[np.ndarray] = None, cluster: Optional[np.ndarray] = None, strata: Optional[np.ndarray] = None, reps: int = 1000, seed: Union[int, None] = None, max_elements: int = 10_000_000) -> dict:
+
+    '''
+    Run a randomization inference test of the sharp null hypothesis of no treatment effect
+    for a regression of Y on X. For models with fixed effects, X and Y are the demeaned data.
+
+    The treatment is permuted (at the cluster level, and within strata if provided) and the
+    coefficient of the treatment is re-estimated for each permutation. By the Frisch-Waugh-Lovell
+    theorem, the coefficient is d'Y / d'd, with d the permuted treatment, demeaned by the fixed effects
+    and residualized on the remaining (demeaned) covariates. As only the treatment changes across
+    permutations, Y and the remaining covariates are demeaned only once, and the permuted treatments
+    are demeaned in batches of at most `max_elements` / N permutations via `demean()`, which
+    demeans all columns in parallel.
+
+    Args:
+        X (np.ndarray): An N x k matrix of covariates.
+        Y (np.ndarray): The dependent variable.
+        param_index (int): The column of X that contains the treatment.
+        treatment (np.ndarray): The treatment variable of length N, not demeaned.
+        fe (np.ndarray, None): An N x n_fixef array of integer codes of the fixed effects. None if the
+            model has no fixed effects.
+        cluster (np.ndarray, None): An array of length N. If provided, the treatment is permuted at the
+            cluster level. The treatment needs to be constant within clusters.
+        strata (np.ndarray, None): An array of length N. If provided, the treatment is permuted within strata.
+            The strata need to be constant within clusters.
+        reps (int): The number of permutations. 1000 by default.
+        seed (int, None): A random seed. None by default.
+        max_elements (int): The maximum number of elements of a N x reps_chunk matrix of permuted treatments.
+
+    Returns:
+        A dictionary with the estimated coefficient ("beta_hat"), the coefficients of all
+        permutations ("beta_perm"), the randomization inference p-value ("pvalue")
+        and its standard error ("se_pvalue").
+    '''
+
+    N, k = X.shape
+    Y = Y.flatten()
+    treatment = np.asarray(treatment, dtype = np.float64)
+
+    unit_codes, unit_treatment, unit_strata = _get_permutation_units(treatment, cluster, strata)
+
+    # residualize on all other (demeaned) covariates
+    W = np.delete(X, param_index, axis = 1)
+    A = np.linalg.pinv(np.transpose(W) @ W)
+
+    d = X[:, param_index]
+    d = d - W @ (A @ (np.transpose(W) @ d))
+    beta_hat = d @ Y / (d @ d)
+
+    rng = np.random.default_rng(seed)
+    chunk_size = int(max(1, min(reps, max_elements // N)))
+    beta_perm = np.zeros(reps)
+
+    if fe is not None:
+        fe = np.ascontiguousarray(fe, dtype = np.int64)
+        weights = np.ones(N)
+
+    for start in range(0, reps, chunk_size):
+        reps_chunk = min(chunk_size, reps - start)
+        D = _permute_treatment(unit_treatment, unit_strata, reps_chunk, rng)[unit_codes]
+        if fe is not None:
+            D = demean(D, fe, weights)
+        D = D - W @ (A @ (np.transpose(W) @ D))
+        beta_perm[start:start + reps_chunk] = (np.transpose(D) @ Y) / np.sum(D ** 2, axis = 0)
+
+    # a small tolerance, so that permutations that reproduce the observed treatment count as extreme
+    pvalue = np.mean(np.abs(beta_perm) >= np.abs(beta_hat) * (1 - 1e-10))
+
+    return {
+        "beta_hat": beta_hat,
+        "beta_perm": beta_perm,
+        "pvalue": pvalue,
+        "se_pvalue": np.sqrt(pvalue * (1 - pvalue) / reps)
+    }
+
+
+def _get_permutation_units(treatment, cluster, strata):
+
+    '''
+    Collapse the treatment and the strata to the units at which the treatment is permuted.
+    Args:
+        treatment (np.ndarray): The treatment variable of length N.
+        cluster (np.ndarray, None): The cluster variable of length N. If None, each observation is a unit.
+        strata (np.ndarray, None): The strata variable of length N. If None, there is a single stratum.
+    Returns:
+        unit_codes (np.ndarray): An array of length N, mapping observations to units.
+        unit_treatment (np.ndarray): The treatment of each unit.
+        unit_strata (np.ndarray): The stratum code of each unit.
+    '''
+
+    N = len(treatment)
+
+    if cluster is None:
+        unit_codes = np.arange(N)
+    else:
+        unit_codes, _ = pd.factorize(cluster)
+        if np.any(unit_codes == -1):
+            raise ValueError("Randomization inference is not supported with missing values in the cluster variable.")
+
+    n_units = np.max(unit_codes) + 1
+    # the first observation of each unit
+    first = np.zeros(n_units, dtype = np.int64)
+    first[unit_codes[::-1]] = np.arange(N)[::-1]
+
+    unit_treatment = treatment[first]
+    if np.any(unit_treatment[unit_codes] != treatment):
+        raise ValueError("The treatment is not constant within clusters.")
+
+    if strata is None:
+        unit_strata = np.zeros(n_units, dtype = np.int64)
+    else:
+        strata_codes, _ = pd.factorize(strata)
+        if np.any(strata_codes == -1):
+            raise ValueError("Randomization inference is not supported with missing values in the strata variable.")
+        unit_strata = strata_codes[first]
+        if np.any(unit_strata[unit_codes] != strata_codes):
+            raise ValueError("The strata are not constant within clusters.")
+
+    return unit_codes, unit_treatment, unit_strata
+
+
+def _permute_treatment(unit_treatment, unit_strata, reps, rng):
+
+    '''
+    Draw reps permutations of the unit-level treatment within strata at once. Units are sorted by
+    strata, and random keys are offset by the stratum code, so that sorting the keys column-wise
+    only permutes units within their stratum.
+    Args:
+        unit_treatment (np.ndarray): The treatment of each unit.
+        unit_strata (np.ndarray): The stratum code of each unit.
+        reps (int): The number of permutations.
+        rng (np.random.Generator): A random number generator.
+    Returns:
+        An n_units x reps matrix of permuted treatments.
+    '''
+
+    n_units = len(unit_treatment)
+    unit_order = np.argsort(unit_strata, kind = "stable")
+    sorted_strata = unit_strata[unit_order]
+
+    keys = sorted_strata[:, np.newaxis] + rng.random((n_units, reps))
+    perm = unit_order[np.argsort(keys, axis = 0)]
+
+    res = np.zeros((n_units, reps))
+    res[unit_order, :] = unit_treatment[perm]
+
+    return res
@@ -0,0 +1,257 @@
+import multiprocessing
+import threading
+import warnings
+
+import numba
+
+from contextlib import contextmanager
+from typing import Optional
+
+try:
+    from threadpoolctl import threadpool_limits, threadpool_info
+except ImportError:
+    threadpool_limits = None
+
+
+# global thread configuration, read by each feols() call. None means that the defaults are used
+_config = {"numba_threads": None, "blas_threads": None}
+# number of BLAS threads before the first limit is set
+_blas_default = None
+
+# BLAS limits are process wide: the first of several concurrent feols() calls sets the limit
+# and the last one restores the previous setting, so that limits are never restored out of order
+_blas_lock = threading.Lock()
+_blas_state = {"active": 0, "limits": None}
+
+# numba's threading layer is launched lazily, by the first call that uses the thread configuration
+_launch_lock = threading.Lock()
+_launched = False
+
+
+def set_num_threads(numba_threads: Optional[int] = None, blas_threads: Optional[int] = None) -> None:
+
+    '''
+    Set the number of threads used by the numba kernels of pyfixest (demeaning, bootstrap, cluster
+    robust inference) and by the BLAS library of numpy (via threadpoolctl, if installed).
+    The setting is read by every subsequent feols() call, from any thread, and applied to the threads
+    that run its stages. For feols(n_jobs = ...), the threads are split evenly across the workers of the
+    thread pool. The numba setting also applies to the calling thread, e.g. for the bootstrap.
+    By default, pyfixest uses all cores, and a single thread inside the worker process of a process pool.
+
+    Args:
+        numba_threads (int, optional): The number of numba threads. None restores the numba default.
+        blas_threads (int, optional): The number of BLAS threads. None restores the BLAS default.
+    Returns:
+        None
+    '''
+
+    for x in [numba_threads, blas_threads]:
+        if x is not None and (not isinstance(x, int) or x < 1):
+            raise ValueError("The number of threads must be None or a positive integer.")
+
+    _launch_threading_layer()
+
+    _config["numba_threads"] = numba_threads
+    _config["blas_threads"] = blas_threads
+
+    numba.set_num_threads(_clip_numba_threads(numba_threads))
+    _set_blas_threads(blas_threads)
+
+
+def get_num_threads() -> dict:
+
+    '''
+    Get the current thread configuration.
+    Returns:
+        A dictionary with the number of numba threads of the calling thread and the number of BLAS
+        threads set via set_num_threads() (None if the BLAS default is used).
+    '''
+
+    _launch_threading_layer()
+
+    return dict({
+        "numba_threads": numba.get_num_threads(),
+        "blas_threads": _config["blas_threads"]
+    })
+
+
+@contextmanager
+def num_threads(numba_threads: Optional[int] = None, blas_threads: Optional[int] = None):
+
+    '''
+    Context manager that temporarily sets the number of numba and BLAS threads, see set_num_threads().
+    Arguments that are None keep their current setting.
+
+    Examples:
+        with pf.num_threads(numba_threads = 4, blas_threads = 1):
+            fixest.feols("Y ~ X1 | X2", n_jobs = 4)
+    '''
+
+    _launch_threading_layer()
+
+    old_config = dict(_config)
+    old_numba_threads = numba.get_num_threads()
+
+    set_num_threads(
+        numba_threads = old_config["numba_threads"] if numba_threads is None else numba_threads,
+        blas_threads = old_config["blas_threads"] if blas_threads is None else blas_threads
+    )
+    try:
+        yield
+    finally:
+        _config.update(old_config)
+        numba.set_num_threads(old_numba_threads)
+        _set_blas_threads(old_config["blas_threads"])
+
+
+@contextmanager
+def _worker_threads(n_workers: int):
+
+    '''
+    Split the thread budget of a feols() call across the workers of its thread pool, so that the
+    thread pool, numba and BLAS do not oversubscribe the cores. BLAS limits are process wide and set
+    once per call, for the duration of the context. numba threads are thread local: they are set for
+    the calling thread here, and need to be set in each worker via numba.set_num_threads(). For
+    sequential estimation (n_workers = 1), the numba threads of the calling thread are left as they are.
+
+    Args:
+        n_workers (int): The number of workers of the thread pool.
+    Yields:
+        The number of numba threads per worker.
+    '''
+
+    _launch_threading_layer()
+
+    numba_threads, blas_threads = _get_thread_budget(n_workers)
+
+    _acquire_blas_limits(blas_threads)
+    # the calling thread runs the sequential stages
+    old_numba_threads = numba.get_num_threads()
+    if n_workers > 1:
+        numba.set_num_threads(numba_threads)
+    else:
+        numba_threads = old_numba_threads
+    try:
+        yield numba_threads
+    finally:
+        if n_workers > 1:
+            numba.set_num_threads(old_numba_threads)
+        _release_blas_limits()
+
+
+def _launch_threading_layer():
+
+    '''
+    Launch numba's threading layer, once per process. With the TBB threading layer, the interpreter
+    hangs at exit if the layer was launched on a thread other than the main thread, e.g. on the worker
+    of a thread pool that calls feols(). In that case, OpenMP is preferred over TBB, unless a threading
+    layer is set explicitly via NUMBA_THREADING_LAYER.
+    '''
+
+    global _launched
+    if _launched:
+        return
+
+    with _launch_lock:
+        if not _launched:
+            if threading.current_thread() is not threading.main_thread() and numba.config.THREADING_LAYER == "default":
+                numba.config.THREADING_LAYER_PRIORITY = ["omp", "tbb", "workqueue"]
+            numba.get_num_threads()
+            _launched = True
+
+
+def _get_thread_budget(n_workers):
+
+    '''
+    Split the numba and BLAS threads of the global configuration (or the defaults) across the workers
+    of a thread pool.
+    Args:
+        n_workers (int): The number of workers of the thread pool.
+    Returns:
+        A tuple of the number of numba threads and BLAS threads per worker. The number of BLAS
+        threads is None if BLAS threads cannot be limited.
+    '''
+
+    default = 1 if _in_worker_process() else None
+
+    numba_total = _config["numba_threads"] or default or numba.config.NUMBA_NUM_THREADS
+    numba_threads = _clip_numba_threads(max(1, numba_total // n_workers))
+
+    blas_total = _config["blas_threads"] or default or _get_blas_default()
+    blas_threads = None if blas_total is None else max(1, blas_total // n_workers)
+
+    return numba_threads, blas_threads
+
+
+def _in_worker_process():
+
+    '''
+    Whether the current process was started by multiprocessing, e.g. as the worker of a process pool.
+    '''
+
+    return multiprocessing.parent_process() is not None
+
+
+def _get_blas_default():
+
+    '''
+    The number of BLAS threads before the first limit is set, or None if threadpoolctl is not installed.
+    '''
+
+    global _blas_default
+    if threadpool_limits is None:
+        return None
+    if _blas_default is None:
+        _blas_default = max([x["num_threads"] for x in threadpool_info() if x["user_api"] == "blas"], default = None)
+    return _blas_default
+
+
+def _acquire_blas_limits(blas_threads):
+
+    '''
+    Limit the number of BLAS threads for the duration of a feols() call. Only the first of several
+    concurrent calls sets the limit.
+    '''
+
+    with _blas_lock:
+        _blas_state["active"] += 1
+        if _blas_state["active"] == 1 and threadpool_limits is not None and blas_threads is not None:
+            _blas_state["limits"] = threadpool_limits(limits = blas_threads, user_api = "blas")
+
+
+def _release_blas_limits():
+
+    '''
+    Restore the number of BLAS threads once the last of several concurrent feols() calls has finished.
+    '''
+
+    with _blas_lock:
+        _blas_state["active"] -= 1
+        if _blas_state["active"] == 0 and _blas_state["limits"] is not None:
+            _blas_state["limits"].restore_original_limits()
+            _blas_state["limits"] = None
+
+
+def _clip_numba_threads(n):
+
+    '''
+    numba supports at most NUMBA_NUM_THREADS threads. None is mapped to this maximum.
+    '''
+
+    if n is None:
+        return numba.config.NUMBA_NUM_THREADS
+    return min(n, numba.config.NUMBA_NUM_THREADS)
+
+
+def _set_blas_threads(blas_threads):
+
+    '''
+    Limit the number of BLAS threads via threadpoolctl. None restores the BLAS default.
+    '''
+
+    if threadpool_limits is None:
+        if blas_threads is not None:
+            warnings.warn("threadpoolctl is not installed, so the number of BLAS threads cannot be set. Please install threadpoolctl, or set OMP_NUM_THREADS before importing numpy.")
+        return
+
+    threadpool_limits(limits = _get_blas_default() if blas_threads is None else blas_threads, user_api = "blas")
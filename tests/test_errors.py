@@ -55,22 +55,6 @@ def test_cluster_na():
     with pytest.raises(ValueError):
         fixest.feols('Y ~ X1', vcov = {'CRV1': 'X3'})
 
-def test_error_hc23_fe():
-
-    '''
-    test if HC2&HC3 inference with fixed effects regressions raises an error (currently not supported)
-    '''
-    data = get_data().dropna()
-
-    fixest = Fixest(data)
-    with pytest.raises(ValueError):
-        fixest.feols('Y ~ X1 | X2', vcov = "HC2")
-
-    with pytest.raises(ValueError):
-        fixest.feols('Y ~ X1 | X2', vcov = "HC3")
-
-
-
 def test_depvar_numeric():
 
     '''
@@ -112,12 +96,6 @@ def test_iv_errors():
     # wild bootstrap
     with pytest.raises(ValueError):
         fixest.feols('Y ~ 1 | Z1 ~ X1 ').wildboottest(param = "Z1", B = 999)
-    with pytest.raises(ValueError):
-        fixest.feols('Y + Y2 ~ 1 | Z1 ~ X1 ')
-    with pytest.raises(ValueError):
-        fixest.feols('Y  ~ 1 | sw(X2, X3) | Z1 ~ X1 ')
-    with pytest.raises(ValueError):
-        fixest.feols('Y  ~ csw(X2, X3) | Z1 ~ X1 ')
     with pytest.raises(ValueError):
         fixest.feols('Y  ~ 1 | Z1 ~ X1', vcov = "HC2")
 
@@ -126,3 +104,40 @@ def test_iv_errors():
 
 
 
+
+def test_conley_errors():
+
+    data = get_data()
+    data["lat"] = np.linspace(40, 50, data.shape[0])
+    data["lon"] = np.linspace(0, 10, data.shape[0])
+
+    fixest = Fixest(data)
+    # missing cutoff
+    with pytest.raises(AssertionError):
+        fixest.feols('Y ~ X1', vcov = {"conley": ("lat", "lon")})
+    # unknown kernel
+    with pytest.raises(AssertionError):
+        fixest.feols('Y ~ X1', vcov = {"conley": ("lat", "lon", 100, "gaussian")})
+
+    data["lat"][5] = np.nan
+    fixest = Fixest(data)
+    with pytest.raises(ValueError):
+        fixest.feols('Y ~ X1', vcov = {"conley": ("lat", "lon", 100)})
+
+def test_hac_errors():
+
+    data = get_data()
+    data["unit"] = np.arange(data.shape[0]) // 10
+    data["time"] = np.arange(data.shape[0]) % 10
+
+    fixest = Fixest(data)
+    # negative lag
+    with pytest.raises(AssertionError):
+        fixest.feols('Y ~ X1', vcov = {"DK": ("time", -1)})
+    # NW requires a unit and a time variable
+    with pytest.raises(AssertionError):
+        fixest.feols('Y ~ X1', vcov = {"NW": "time"})
+    # duplicate unit-time observations
+    fixest.feols('Y ~ X1', vcov = {"NW": ("X2", "time")})
+    with pytest.raises(ValueError):
+        fixest.se()
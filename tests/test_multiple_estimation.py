@@ -0,0 +1,226 @@
+import pytest
+import numpy as np
+import pyfixest as pf
+from pyfixest.utils import get_data
+
+
+@pytest.fixture
+def data():
+    return get_data()
+
+
+@pytest.mark.parametrize("fml, single_fmls", [
+    ("Y + Y2 ~ csw(X2, X3) | X4 | Z1 ~ X1", ["Y ~ X2 | X4 | Z1 ~ X1", "Y ~ X2 + X3 | X4 | Z1 ~ X1", "Y2 ~ X2 | X4 | Z1 ~ X1", "Y2 ~ X2 + X3 | X4 | Z1 ~ X1"]),
+    ("Y ~ X2 | sw(X3, X4) | Z1 ~ X1 + Z2", ["Y ~ X2 | X3 | Z1 ~ X1 + Z2", "Y ~ X2 | X4 | Z1 ~ X1 + Z2"]),
+    ("Y ~ sw0(X2, X3) | Z1 ~ X1", ["Y ~ 1 | Z1 ~ X1", "Y ~ X2 | Z1 ~ X1", "Y ~ X3 | Z1 ~ X1"]),
+])
+def test_iv_multiple_estimation(data, fml, single_fmls):
+
+    '''
+    test that IV multiple estimation with shared demeaning yields the same results as separate estimations
+    '''
+
+    fixest = pf.Fixest(data)
+    fixest.feols(fml, vcov = "hetero")
+    res = fixest.tidy()
+
+    assert len(fixest.model_res) == len(single_fmls)
+
+    for model, single_fml in zip(fixest.model_res.values(), single_fmls):
+        fixest_single = pf.Fixest(data)
+        fixest_single.feols(single_fml, vcov = "hetero")
+        single = list(fixest_single.model_res.values())[0]
+
+        assert list(model.coefnames) == list(single.coefnames)
+        assert np.allclose(model.beta_hat, single.beta_hat)
+        assert np.allclose(model.se, single.se)
+
+
+@pytest.mark.parametrize("fml", [
+    "Y + Y2 ~ csw(X1, f1, X2:X3) | csw0(X4)",
+    "Y + Y2 ~ Z1 + sw(X1, f1)",
+])
+def test_ols_multiple_estimation(data, fml):
+
+    '''
+    test that models which select their columns from a shared design matrix match separate estimations,
+    also when the models have different missing values and categorical levels that only occur in dropped rows
+    '''
+
+    data = data.copy()
+    data["f1"] = data["X2"].astype(str)
+    data.loc[1, "f1"] = "only_in_dropped_row"
+    data.loc[4, "f1"] = np.nan
+
+    fixest = pf.Fixest(data)
+    fixest.feols(fml, vcov = "hetero")
+
+    for model_fml, model in fixest.model_res.items():
+        fixest_single = pf.Fixest(data)
+        fixest_single.feols(model_fml, vcov = "hetero")
+        single = list(fixest_single.model_res.values())[0]
+
+        assert list(model.coefnames) == list(single.coefnames)
+        assert model.N == single.N
+        assert np.allclose(model.beta_hat, single.beta_hat)
+        assert np.allclose(model.se, single.se)
+
+
+def test_model_spec_cache(data):
+
+    '''
+    test that the formulaic model spec is built once and reused across feols() calls and data subsets
+    '''
+
+    data = data.copy()
+    data["f1"] = data["X2"].astype(str)
+
+    fixest = pf.Fixest(data)
+    fixest.feols("Y ~ X1 + f1", vcov = "hetero")
+    model_specs = dict(fixest._model_specs)
+    assert len(model_specs) == 1
+
+    fixest.feols("Y ~ X1 + f1 | X4", vcov = "hetero")
+    assert fixest._model_specs.keys() == model_specs.keys()
+    for fml, model_spec in model_specs.items():
+        assert fixest._model_specs[fml] is model_spec
+
+        # a subset without the level "1" is encoded with the same columns
+        lhs, rhs = fixest._model_matrix(fml, data[data["f1"] != "1"])
+        _, rhs_full = fixest._model_matrix(fml, data)
+        assert list(rhs.columns) == list(rhs_full.columns)
+        assert not rhs["f1[T.1]"].any()
+
+    fit = fixest.model_res["Y ~ X1+f1"]
+    Y, X = fit._get_model_matrix()
+    assert np.allclose(X, fit.X)
+    assert np.allclose(Y, fit.Y.flatten())
+
+
+def test_demean_columns_once(data, monkeypatch):
+
+    '''
+    test that every column is demeaned at most once per fixed effect and missing value pattern,
+    and that singletons are dropped for all models that share a pattern
+    '''
+
+    import pyhdfe
+    from pyfixest import fixest as fixest_module
+
+    create = pyhdfe.create
+    n_demeaned = []
+
+    class CountingAlgorithm:
+        def __init__(self, algorithm):
+            self.algorithm = algorithm
+        def __getattr__(self, name):
+            return getattr(self.algorithm, name)
+        def residualize(self, x):
+            n_demeaned.append(x.shape[1])
+            return self.algorithm.residualize(x)
+
+    monkeypatch.setattr(fixest_module.pyhdfe, "create", lambda *args, **kwargs: CountingAlgorithm(create(*args, **kwargs)))
+
+    data = data.copy()
+    data["fe"] = np.arange(data.shape[0]) // 3
+    data.loc[:4, "fe"] = -np.arange(1, 6)
+
+    fixest = pf.Fixest(data)
+    fixest.feols("Y + Y2 ~ csw(X2, X3, X4) | fe", fixef_rm = "singleton", vcov = "hetero")
+
+    # Y and Y2 have different missing values, so X2, X3 and X4 are demeaned once per pattern,
+    # in one pass per pattern
+    assert sum(n_demeaned) == 8
+    assert len(n_demeaned) == 2
+    assert fixest.na_patterns_dict["fe"] == [2]
+
+    for model_fml, model in fixest.model_res.items():
+        fixest_single = pf.Fixest(data)
+        fixest_single.feols(model_fml, fixef_rm = "singleton", vcov = "hetero")
+        single = list(fixest_single.model_res.values())[0]
+
+        assert model.N == single.N == model.data.shape[0]
+        assert np.allclose(model.beta_hat, single.beta_hat)
+
+
+def test_na_mask(data):
+
+    '''
+    test that rows with missing values (also in the fixed effects) are dropped via boolean masks,
+    independently of the index of the data
+    '''
+
+    data = data.copy()
+    data["X4"] = data["X4"].astype(float)
+    data.loc[[2, 7], "X4"] = np.nan
+    data.index = ["row_" + str(i) for i in data.index[::-1]]
+
+    fixest = pf.Fixest(data)
+    fixest.feols("Y + Y2 ~ X1 + X2 | X4", vcov = "hetero")
+
+    for depvar in ["Y", "Y2"]:
+        fit = fixest.model_res[depvar + " ~ X1+X2|X4"]
+        complete = data[[depvar, "X1", "X2", "X4"]].notna().all(axis = 1).to_numpy()
+        assert np.array_equal(fit.na_mask, ~complete)
+        assert list(fit.data.index) == list(data.index[complete])
+
+        fixest_single = pf.Fixest(data[complete])
+        fixest_single.feols(depvar + " ~ X1 + X2 | X4", vcov = "hetero")
+        single = list(fixest_single.model_res.values())[0]
+        assert fit.N == single.N
+        assert np.allclose(fit.beta_hat, single.beta_hat)
+        assert np.allclose(fit.se, single.se)
+
+
+@pytest.mark.parametrize("n_jobs", [2, None])
+def test_n_jobs(data, n_jobs):
+
+    '''
+    test that concurrent estimation yields the same models, in the same order, as sequential estimation
+    '''
+
+    fml = "Y + Y2 ~ csw(X1, X2) | sw0(X3, X4)"
+
+    fixest = pf.Fixest(data)
+    fixest.feols(fml, vcov = {"CRV1": "group_id"})
+
+    fixest_parallel = pf.Fixest(data)
+    fixest_parallel.feols(fml, vcov = {"CRV1": "group_id"}, n_jobs = n_jobs)
+
+    assert list(fixest_parallel.model_res.keys()) == list(fixest.model_res.keys())
+    for model_fml, model in fixest.model_res.items():
+        fit = fixest_parallel.model_res[model_fml]
+        assert np.allclose(fit.beta_hat, model.beta_hat)
+        assert np.allclose(fit.se, model.se)
+
+    with pytest.raises(ValueError):
+        pf.Fixest(data).feols(fml, n_jobs = 0)
+
+
+@pytest.mark.parametrize("fml, single_fmls", [
+    ("Y ~ sw0(X2, X3) + X1 | X4", ["Y ~ X1 | X4", "Y ~ X1 + X2 | X4", "Y ~ X1 + X3 | X4"]),
+    ("Y + Y2 ~ csw0(X2, X3) + X1", ["Y ~ X1", "Y ~ X1 + X2", "Y ~ X1 + X2 + X3", "Y2 ~ X1", "Y2 ~ X1 + X2", "Y2 ~ X1 + X2 + X3"]),
+])
+def test_formula_order_with_na_patterns(data, fml, single_fmls):
+
+    '''
+    test that the models are returned in formula order when their missing value patterns differ
+    '''
+
+    data = data.copy()
+    data["X2"] = data["X2"].astype(float)
+    data.loc[2, "X2"] = np.nan
+
+    fixest = pf.Fixest(data)
+    fixest.feols(fml)
+
+    # the models are demeaned in groups by missing value pattern
+    assert sum(fixest.na_patterns_dict.popitem()[1]) > 1
+
+    fixest_single = pf.Fixest(data)
+    expected = [list(fixest_single.feols(single_fml).model_res)[0] for single_fml in single_fmls]
+    assert list(fixest.model_res) == expected
+
+    for model, single_fml in zip(fixest.model_res.values(), single_fmls):
+        single = list(pf.Fixest(data).feols(single_fml).model_res.values())[0]
+        assert np.allclose(model.beta_hat, single.beta_hat)
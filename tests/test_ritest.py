@@ -0,0 +1,82 @@
+import pytest
+import numpy as np
+import pandas as pd
+import pyfixest as pf
+from pyfixest.utils import get_data
+from pyfixest.ritest import ritest, _get_permutation_units, _permute_treatment
+from pyfixest.feols import _get_fixef_codes
+
+
+@pytest.fixture
+def data():
+    data = get_data().dropna()
+    rng = np.random.default_rng(8)
+    # a treatment assigned at the group_id level, and strata that are constant within group_id
+    group_treat = rng.integers(0, 2, data["group_id"].max() + 1)
+    data["D"] = group_treat[data["group_id"].to_numpy().astype(int)].astype(float)
+    data["strata"] = data["group_id"] % 3
+    return data
+
+
+@pytest.mark.parametrize("fml", ["Y ~ D + X1", "Y ~ D + X1 | X2", "Y ~ D | X2 + X3"])
+def test_ritest_vs_brute_force(data, fml):
+
+    '''
+    test the batched permutation coefficients against re-estimating the model with permuted
+    treatments and fixed effects dummies
+    '''
+
+    fixest = pf.Fixest(data)
+    fixest.feols(fml)
+    fit = list(fixest.model_res.values())[0]
+    res = fixest.ritest(param = "D", resampvar = "D", reps = 20, cluster = "group_id", seed = 3)
+
+    beta_hat = fit.beta_hat[list(fit.coefnames).index("D")]
+    assert np.allclose(res["Estimate"].astype(float), beta_hat)
+
+    # replicate the permutations
+    unit_codes, unit_treatment, unit_strata = _get_permutation_units(fit.data["D"].to_numpy(), fit.data["group_id"].to_numpy(), None)
+    D_perm = _permute_treatment(unit_treatment, unit_strata, 20, np.random.default_rng(3))[unit_codes]
+
+    covars = ["X1"] if "X1" in fml else []
+    fixef = fml.split("|")[1].strip().split(" + ") if "|" in fml else []
+    controls = [np.ones(fit.data.shape[0])] if not fixef else []
+    controls += [fit.data[x].to_numpy() for x in covars]
+    for i, fe in enumerate(fixef):
+        dummies = pd.get_dummies(fit.data[fe].astype(int)).to_numpy().astype(float)
+        controls.append(dummies if i == 0 else dummies[:, 1:])
+    controls = np.column_stack(controls)
+
+    beta_brute = []
+    for b in range(20):
+        Z = np.column_stack([D_perm[:, b], controls])
+        beta_brute.append(np.linalg.lstsq(Z, fit.data["Y"].to_numpy(), rcond = None)[0][0])
+
+    ri = ritest(fit.X, fit.Y, list(fit.coefnames).index("D"), fit.data["D"].to_numpy(),
+                fe = None if not fixef else _get_fixef_codes(fit.data, fit.fixef),
+                cluster = fit.data["group_id"].to_numpy(), reps = 20, seed = 3)
+
+    assert np.allclose(ri["beta_perm"], beta_brute, atol = 1e-06)
+
+
+def test_permute_within_strata(data):
+
+    unit_codes, unit_treatment, unit_strata = _get_permutation_units(data["D"].to_numpy(), data["group_id"].to_numpy(), data["strata"].to_numpy())
+    D_perm = _permute_treatment(unit_treatment, unit_strata, 100, np.random.default_rng(1))
+
+    for s in np.unique(unit_strata):
+        in_stratum = unit_strata == s
+        assert np.all(np.sum(D_perm[in_stratum], axis = 0) == np.sum(unit_treatment[in_stratum]))
+
+
+def test_ritest_errors(data):
+
+    fixest = pf.Fixest(data)
+    fixest.feols("Y ~ D + X1")
+
+    # resampvar differs from param
+    with pytest.raises(ValueError):
+        fixest.ritest(param = "D", resampvar = "X1")
+    # treatment not constant within clusters
+    with pytest.raises(ValueError):
+        fixest.ritest(param = "X1", resampvar = "X1", cluster = "group_id")
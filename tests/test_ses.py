@@ -1,5 +1,6 @@
 import pytest
 import numpy as np
+import pandas as pd
 import pyfixest as pf
 from pyfixest.ssc_utils import ssc
 from pyfixest.utils import get_data
@@ -61,7 +62,6 @@ def test_HC3_vs_CRV3(data):
     #if not np.allclose(res_hc3["Pr(>|t|)"], res_crv3["Pr(>|t|)"]):
     #    raise ValueError("HC3 and CRV3 p values are not the same.")
 
-@pytest.mark.skip("HC3 not implemented for regressions with fixed effects.")
 def test_HC3_vs_CRV3_fixef(data):
 
 
@@ -77,9 +77,12 @@ def test_HC3_vs_CRV3_fixef(data):
     _, B = next(iter(fixest.model_res.items()))
     N = B.N
 
+    # adj: default adjustments are different for HC3 and CRV3
+    adj_correction = np.sqrt((N-1) / N)
+
     #if not np.allclose(res_hc3["Std. Error"] * adj_correction , res_crv3["Std. Error"]):
     #    raise ValueError("HC3 and CRV3 ses are not the same.")
-    if not np.allclose(res_hc3["t value"] , res_crv3["t value"]):
+    if not np.allclose(res_hc3["t value"] / adj_correction, res_crv3["t value"]):
         raise ValueError("HC3 and CRV3 t values are not the same.")
     #if not np.allclose(res_hc3["Pr(>|t|)"], res_crv3["Pr(>|t|)"]):
     #    raise ValueError("HC3 and CRV3 p values are not the same.")
@@ -101,3 +104,387 @@ def test_CRV3_fixef(data):
         raise ValueError("HC3 and CRV3 ses are not the same.")
     if not np.allclose(res_crv3a["t value"], res_crv3b["t value"]):
         raise ValueError("HC3 and CRV3 t values are not the same.")
+
+
+def test_multiway_clustering(data):
+
+    '''
+    test that two-way clustered vcovs equal V_1 + V_2 - V_12
+    '''
+
+    data["X4_cl"] = data["X4"].astype(int)
+    data["intersection"] = data["group_id"].astype(str) + "_" + data["X4_cl"].astype(str)
+
+    fixest = pf.Fixest(data = data)
+    fixest.feols('Y~X1', vcov = {'CRV1':'group_id'}, ssc = ssc(cluster_df = "conventional"))
+    vcov_1 = fixest.model_res['Y ~ X1'].vcov
+    fixest.vcov({'CRV1':'X4_cl'})
+    vcov_2 = fixest.model_res['Y ~ X1'].vcov
+    fixest.vcov({'CRV1':'intersection'})
+    vcov_12 = fixest.model_res['Y ~ X1'].vcov
+
+    fixest.vcov({'CRV1':'group_id+X4_cl'}, vcov_fix = False)
+    vcov_twoway = fixest.model_res['Y ~ X1'].vcov
+
+    if not np.allclose(vcov_1 + vcov_2 - vcov_12, vcov_twoway):
+        raise ValueError("Two-way clustered vcov does not match V_1 + V_2 - V_12.")
+
+
+def _multiway_vcov_brute_force(X, Y, clusters, cluster_df):
+
+    '''
+    compute the multiway clustered CRV1 vcov via the inclusion-exclusion formula, with one loop over the
+    clusters of each (intersected) clustering dimension
+    '''
+
+    from itertools import combinations
+
+    N, k = X.shape
+    A = np.linalg.inv(X.T @ X)
+    u = Y - X @ (A @ X.T @ Y)
+    G_min = min(len(np.unique(x)) for x in clusters)
+
+    vcov = np.zeros((k, k))
+    for n_vars in range(1, len(clusters) + 1):
+        for combination in combinations(clusters, n_vars):
+            codes = pd.Series(["_".join(str(x[i]) for x in combination) for i in range(N)])
+            G = codes.nunique()
+            meat = np.zeros((k, k))
+            for g in codes.unique():
+                score = X[codes == g].T @ u[codes == g]
+                meat += np.outer(score, score)
+            G_adj = G_min if cluster_df == "min" else G
+            sign = 1 if n_vars % 2 == 1 else -1
+            vcov += sign * (N - 1) / (N - k) * G_adj / (G_adj - 1) * A @ meat @ A
+
+    return vcov
+
+
+@pytest.mark.parametrize("clustervar", ["group_id+X4_cl", "group_id+X4_cl+X3_cl"])
+@pytest.mark.parametrize("cluster_df", ["conventional", "min"])
+def test_multiway_clustering_vs_brute_force(data, clustervar, cluster_df):
+
+    '''
+    test two- and three-way clustered vcovs against a brute force inclusion-exclusion computation,
+    for both small sample corrections of the number of clusters
+    '''
+
+    data["X4_cl"] = data["X4"].astype(int)
+    data["X3_cl"] = data["X3"].astype(int)
+
+    fixest = pf.Fixest(data = data)
+    fixest.feols('Y~X1+X2', vcov = {'CRV1':clustervar}, ssc = ssc(cluster_df = cluster_df))
+    fit = fixest.model_res['Y ~ X1+X2']
+    fit.get_vcov({'CRV1':clustervar}, vcov_fix = False)
+
+    X = np.column_stack([np.ones(data.shape[0]), data[["X1", "X2"]].to_numpy()])
+    Y = data["Y"].to_numpy()
+    clusters = [data[x].to_numpy() for x in clustervar.split("+")]
+
+    assert np.allclose(fit.vcov, _multiway_vcov_brute_force(X, Y, clusters, cluster_df))
+
+
+def test_multiway_clustering_vcov_fix():
+
+    '''
+    test that with vcov_fix = True, negative eigenvalues of a multiway clustered vcov are set to zero
+    '''
+
+    rng = np.random.default_rng(1)
+    N = 60
+    data = pd.DataFrame({
+        "Y": rng.normal(size = N),
+        "X1": rng.normal(size = N),
+        "X2": rng.normal(size = N),
+        "c1": rng.integers(0, 4, N),
+        "c2": rng.integers(0, 4, N)
+    })
+
+    fixest = pf.Fixest(data = data)
+    fixest.feols('Y~X1+X2', vcov = {'CRV1':'c1+c2'})
+    fit = fixest.model_res['Y ~ X1+X2']
+    vcov_fixed = fit.vcov
+
+    fit.get_vcov({'CRV1':'c1+c2'}, vcov_fix = False)
+    vcov_raw = fit.vcov
+    eigval, eigvec = np.linalg.eigh(vcov_raw)
+    # the raw vcov is not positive semi-definite
+    assert np.min(eigval) < 0
+
+    assert np.allclose(vcov_fixed, eigvec @ np.diag(np.maximum(eigval, 0)) @ eigvec.T)
+    assert np.all(np.linalg.eigvalsh(vcov_fixed) >= -1e-12)
+
+
+@pytest.mark.parametrize("clustervar", ["group_id", "X2"])
+def test_CRV3_fixef_vs_dummies(data, clustervar):
+
+    '''
+    test the leave-one-cluster-out CRV3 vcov with fixed effects against a regression with
+    dummies, for fixed effects that are nested within clusters ("X2") and that are not ("group_id")
+    '''
+
+    fixest = pf.Fixest(data = data)
+    fixest.feols('Y~X1 + C(X2)', vcov = {'CRV3':clustervar}, ssc = ssc(adj = False, cluster_adj = False))
+    res_crv3a = fixest.tidy()
+    res_crv3a = res_crv3a[res_crv3a.coefnames == "X1"]
+
+    fixest2 = pf.Fixest(data = data)
+    fixest2.feols('Y~X1 | X2', vcov = {'CRV3':clustervar}, ssc = ssc(adj = False, cluster_adj = False))
+    res_crv3b = fixest2.tidy()
+
+    if not np.allclose(res_crv3a["Std. Error"] , res_crv3b["Std. Error"]):
+        raise ValueError("CRV3 ses with fixed effects and dummies are not the same.")
+
+
+def test_demean_jackknife_singular(data):
+
+    '''
+    test the leave-one-cluster-out coefficients with fixed effects that are not nested within the clusters
+    against a regression with dummies, if a covariate is only observed in a single cluster
+    '''
+
+    from pyfixest.demean import demean_jackknife
+
+    cluster = pd.factorize(data["group_id"])[0]
+    fe = pd.factorize(data["X2"])[0]
+    G = np.max(cluster) + 1
+
+    Y = data["Y"].to_numpy()
+    # the second covariate is zero outside of cluster 0
+    X = np.column_stack([data["X1"].to_numpy(), (cluster == 0) * data["X3"].to_numpy()])
+
+    beta_jack = demean_jackknife(Y, X, fe.reshape((-1, 1)), cluster, G)
+
+    dummies = pd.get_dummies(fe).to_numpy().astype(float)
+    for g in range(G):
+        keep = cluster != g
+        beta = np.linalg.lstsq(np.column_stack([X, dummies])[keep], Y[keep], rcond = None)[0]
+        assert np.allclose(beta_jack[g], beta[:2], atol = 1e-06)
+
+
+def test_CRV3_jackknife_warning(data, monkeypatch):
+
+    import pyfixest.feols as feols
+
+    monkeypatch.setattr(feols, "_CRV3_JACKKNIFE_WARN_SIZE", 0)
+    fixest = pf.Fixest(data = data)
+    fixest.feols('Y~X1 | X2', vcov = {'CRV3':'group_id'})
+    with pytest.warns(UserWarning, match = "once per cluster"):
+        fixest.tidy()
+
+
+def test_vcov_list(data):
+
+    '''
+    test that vcov types computed jointly via a list match individually computed vcov types
+    '''
+
+    vcov_list = ["iid", "HC1", "HC3", {"CRV1":"group_id"}, {"CRV3":"group_id"}]
+
+    fixest = pf.Fixest(data = data)
+    fixest.feols('Y~X1 + X2', vcov = vcov_list)
+
+    for vcov in vcov_list:
+
+        fixest2 = pf.Fixest(data = data)
+        fixest2.feols('Y~X1 + X2', vcov = vcov)
+
+        fixest.vcov(vcov)
+        if not np.allclose(fixest.se()["Std. Error"], fixest2.se()["Std. Error"]):
+            raise ValueError("Standard errors computed via a vcov list do not match.")
+
+    # the first vcov type is active after vcov_all()
+    fixest.vcov_all(["HC1", {"CRV1":"group_id"}])
+    fixest2.vcov("HC1")
+    if not np.allclose(fixest.se()["Std. Error"], fixest2.se()["Std. Error"]):
+        raise ValueError("vcov_all() does not activate the first vcov type.")
+
+
+def test_lazy_inference(data):
+
+    '''
+    test that inference is only computed on first access
+    '''
+
+    fixest = pf.Fixest(data = data)
+    fixest.feols('Y~X1 | X2', vcov = {'CRV1':'group_id'})
+    fxst = fixest.model_res['Y ~ X1|X2']
+
+    fixest.coef()
+    assert not hasattr(fxst, "_vcov")
+
+    se = fixest.se()["Std. Error"]
+    assert hasattr(fxst, "_vcov")
+
+    fxst2 = pf.Fixest(data = data).feols('Y~X1 | X2', vcov = "iid").model_res['Y ~ X1|X2']
+    fxst2.get_vcov({'CRV1':'group_id'})
+    fxst2.get_inference()
+    if not np.allclose(se, fxst2.se):
+        raise ValueError("Lazily computed standard errors do not match.")
+
+
+@pytest.mark.parametrize("vcov", ["HC2", "HC3"])
+@pytest.mark.parametrize("fml_fixef, fml_dummies", [
+    ("Y~X1 | X2", "Y~X1 + C(X2)"),
+    ("Y~X1 | X2 + X3", "Y~X1 + C(X2) + C(X3)"),
+])
+def test_HC23_fixef_vs_dummies(data, vcov, fml_fixef, fml_dummies):
+
+    '''
+    test HC2 and HC3 inference with fixed effects against a regression with dummies
+    '''
+
+    fixest = pf.Fixest(data = data)
+    fixest.feols(fml_dummies, vcov = vcov, ssc = ssc(adj = False))
+    res_dummies = fixest.tidy()
+    res_dummies = res_dummies[res_dummies.coefnames == "X1"]
+
+    fixest2 = pf.Fixest(data = data)
+    fixest2.feols(fml_fixef, vcov = vcov, ssc = ssc(adj = False))
+    res_fixef = fixest2.tidy()
+
+    if not np.allclose(res_dummies["Std. Error"], res_fixef["Std. Error"]):
+        raise ValueError("HC2/HC3 ses with fixed effects and dummies are not the same.")
+
+
+def test_fixef_leverage_randomized():
+
+    '''
+    test the randomized fixed effects leverage against the exact leverage. With the default relative
+    tolerance, the leverage of every observation is within 10% of the mean leverage of the exact one
+    '''
+
+    from pyfixest.feols import _get_fixef_leverage
+
+    rng = np.random.default_rng(1)
+    N = 2000
+    fe = np.column_stack([rng.integers(0, 150, N), rng.integers(0, 40, N)])
+
+    exact = _get_fixef_leverage(fe)
+    # force the randomized computation
+    randomized = _get_fixef_leverage(fe, max_levels = 10)
+
+    error = np.abs(randomized - exact) / np.mean(exact)
+    assert np.max(error) < 0.1
+    assert np.mean(error) < 0.025
+
+
+@pytest.mark.parametrize("kernel", ["uniform", "bartlett"])
+@pytest.mark.parametrize("fml", ["Y~X1+X2", "Y~X1|X3"])
+def test_conley_vs_brute_force(data, kernel, fml):
+
+    '''
+    test Conley standard errors against a brute force implementation over all pairs of observations
+    '''
+
+    rng = np.random.default_rng(5)
+    data["lat"] = rng.uniform(45, 48, data.shape[0])
+    data["lon"] = rng.uniform(5, 10, data.shape[0])
+    cutoff = 50
+
+    fixest = pf.Fixest(data = data)
+    fixest.feols(fml, vcov = {"conley": ("lat", "lon", cutoff, kernel)})
+    fit = list(fixest.model_res.values())[0]
+
+    lat, lon = np.radians(fit.data["lat"].to_numpy()), np.radians(fit.data["lon"].to_numpy())
+    a = np.sin((lat[:, None] - lat[None, :]) / 2) ** 2 + np.cos(lat[:, None]) * np.cos(lat[None, :]) * np.sin((lon[:, None] - lon[None, :]) / 2) ** 2
+    distance = 2 * 6371.01 * np.arcsin(np.sqrt(a))
+    if kernel == "uniform":
+        K = (distance <= cutoff).astype(float)
+    else:
+        K = np.maximum(1 - distance / cutoff, 0)
+
+    scores = fit.X * fit.u_hat.reshape((-1, 1))
+    bread = np.linalg.inv(fit.X.T @ fit.X)
+    vcov = fit.N / (fit.N - fit.k) * bread @ (scores.T @ K @ scores) @ bread
+
+    assert np.allclose(fit.vcov, vcov)
+
+
+def test_conley_small_cutoff_vs_hetero(data):
+
+    rng = np.random.default_rng(5)
+    data["lat"] = rng.uniform(45, 48, data.shape[0])
+    data["lon"] = rng.uniform(5, 10, data.shape[0])
+
+    fixest = pf.Fixest(data = data)
+    fixest.feols("Y~X1|X2", vcov = [{"conley": ("lat", "lon", 1e-06)}, "hetero"])
+    fit = list(fixest.model_res.values())[0]
+    se_conley = fit.se
+    fit.get_vcov("hetero")
+
+    assert np.allclose(se_conley, fit.se)
+
+
+@pytest.mark.parametrize("vcov_type", ["DK", "NW"])
+@pytest.mark.parametrize("fml", ["Y~X1+X2", "Y~X1|X3"])
+@pytest.mark.parametrize("lag", [0, 4])
+def test_hac_vs_brute_force(data, vcov_type, fml, lag):
+
+    '''
+    test Driscoll-Kraay and Newey-West standard errors against a brute force implementation over all pairs of observations
+    '''
+
+    # a panel of units observed in periods with gaps, with scrambled row order
+    rng = np.random.default_rng(2)
+    data = data.iloc[rng.permutation(data.shape[0])]
+    data["unit"] = np.arange(data.shape[0]) // 20
+    data["time"] = (np.arange(data.shape[0]) % 20) * 2
+
+    vcov = {"DK": ("time", lag)} if vcov_type == "DK" else {"NW": ("unit", "time", lag)}
+    fixest = pf.Fixest(data = data)
+    fixest.feols(fml, vcov = vcov)
+    fit = list(fixest.model_res.values())[0]
+
+    scores = fit.X * fit.u_hat.reshape((-1, 1))
+    unit = fit.data["unit"].to_numpy()
+    time = fit.data["time"].to_numpy()
+
+    # lags count observed periods, so the gaps of size two in the time variable are ignored
+    distance = np.abs(time[:, None] - time[None, :]) // 2
+    K = np.where(distance <= lag, 1 - distance / (lag + 1), 0)
+    if vcov_type == "NW":
+        K = K * (unit[:, None] == unit[None, :])
+    meat = scores.T @ K @ scores
+
+    bread = np.linalg.inv(fit.X.T @ fit.X)
+    vcov = fit.N / (fit.N - fit.k) * bread @ meat @ bread
+
+    assert np.allclose(fit.vcov, vcov)
+
+
+@pytest.mark.parametrize("vcov_type", ["DK", "NW"])
+def test_hac_calendar_time(data, vcov_type):
+
+    '''
+    test that a YYYYMMDD coded time variable gives the same standard errors as consecutive periods
+    '''
+
+    data["unit"] = np.arange(data.shape[0]) // 20
+    data["period"] = np.arange(data.shape[0]) % 20
+    # month ends of 2020 and 2021, which are neither evenly spaced nor small
+    month_ends = pd.date_range("2020-01-01", periods = 20, freq = "M")
+    data["date"] = month_ends.strftime("%Y%m%d").astype(np.int64)[data["period"]]
+
+    fits = []
+    for time in ["period", "date"]:
+        vcov = {"DK": (time, 3)} if vcov_type == "DK" else {"NW": ("unit", time, 3)}
+        fixest = pf.Fixest(data = data)
+        fixest.feols("Y~X1|X2", vcov = vcov)
+        fits.append(list(fixest.model_res.values())[0])
+
+    assert np.allclose(fits[0].se, fits[1].se)
+
+
+def test_nw_lag0_vs_hetero(data):
+
+    data["unit"] = np.arange(data.shape[0]) // 10
+    data["time"] = np.arange(data.shape[0]) % 10
+
+    fixest = pf.Fixest(data = data)
+    fixest.feols("Y~X1|X2", vcov = [{"NW": ("unit", "time", 0)}, "hetero"])
+    fit = list(fixest.model_res.values())[0]
+    se_nw = fit.se
+    fit.get_vcov("hetero")
+
+    assert np.allclose(se_nw, fit.se)
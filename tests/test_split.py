@@ -0,0 +1,82 @@
+import pytest
+import numpy as np
+import pyfixest as pf
+from pyfixest.utils import get_data
+
+
+@pytest.fixture
+def data():
+    return get_data()
+
+
+@pytest.mark.parametrize("fml", ["Y ~ X1 + X2", "Y + Y2 ~ csw(X1, X2) | X4", "Y ~ X2 | X4 | Z1 ~ X1"])
+@pytest.mark.parametrize("split_type", ["split", "fsplit"])
+def test_split_vs_subset(data, fml, split_type):
+
+    '''
+    test that split sample estimation matches separate estimations on the subsets of the data
+    '''
+
+    # shuffle the data, so that the split samples are not contiguous
+    data = data.sample(frac = 1, random_state = 3)
+
+    fixest = pf.Fixest(data)
+    fixest.feols(fml, vcov = "hetero", n_jobs = 4, **{split_type: "X3"})
+
+    fixest_full = pf.Fixest(data)
+    fixest_full.feols(fml, vcov = "hetero")
+    n_models = len(fixest_full.model_res)
+    n_splits = data["X3"].nunique()
+
+    if split_type == "fsplit":
+        assert len(fixest.model_res) == n_models * (n_splits + 1)
+        for model_fml, full in fixest_full.model_res.items():
+            assert np.allclose(fixest.model_res[model_fml].beta_hat, full.beta_hat)
+    else:
+        assert len(fixest.model_res) == n_models * n_splits
+
+    for category in np.unique(data["X3"]):
+        sub_data = data[data["X3"] == category]
+        fixest_sub = pf.Fixest(sub_data)
+        fixest_sub.feols(fml, vcov = "hetero")
+        for model_fml, sub in fixest_sub.model_res.items():
+            fit = fixest.model_res[model_fml + "| split =" + str(category)]
+            assert fit.split_log == str(category)
+            assert list(fit.data.index) == list(sub.data.index)
+            assert np.allclose(fit.beta_hat, sub.beta_hat)
+            assert np.allclose(fit.se, sub.se)
+
+
+@pytest.mark.parametrize("fml", ["Y ~ X2 + C(c)", "Y ~ X2 + C(c) | X4"])
+def test_split_missing_reference_level(data, fml):
+
+    '''
+    test split sample estimation if a split sample lacks the reference level of a categorical variable
+    '''
+
+    rng = np.random.default_rng(1)
+    data["s"] = rng.integers(0, 2, data.shape[0])
+    data["c"] = np.where(data["s"] == 1, rng.choice(["b", "c"], data.shape[0]), rng.choice(["a", "b", "c"], data.shape[0]))
+
+    fixest = pf.Fixest(data)
+    fixest.feols(fml, split = "s")
+
+    for category in [0, 1]:
+        fixest_sub = pf.Fixest(data[data["s"] == category])
+        fixest_sub.feols(fml)
+        for model_fml, sub in fixest_sub.model_res.items():
+            fit = fixest.model_res[model_fml + "| split =" + str(category)]
+            assert list(fit.coefnames) == list(sub.coefnames)
+            assert np.allclose(fit.beta_hat, sub.beta_hat)
+            assert np.allclose(fit.se, sub.se)
+
+
+def test_split_errors(data):
+
+    fixest = pf.Fixest(data)
+    with pytest.raises(ValueError):
+        fixest.feols("Y ~ X1", split = "X3", fsplit = "X3")
+    with pytest.raises(ValueError):
+        fixest.feols("Y ~ X1", split = "not_a_column")
+    with pytest.raises(ValueError):
+        fixest.feols("Y ~ X1 | X3", split = "X3")
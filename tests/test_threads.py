@@ -0,0 +1,255 @@
+import pytest
+import numba
+import numpy as np
+import pandas as pd
+import pyfixest as pf
+from pyfixest.utils import get_data
+from pyfixest.threads import _worker_threads
+
+
+@pytest.fixture
+def data():
+    return get_data()
+
+
+def test_num_threads_context():
+
+    '''
+    test that the context manager sets and restores the thread configuration
+    '''
+
+    before = pf.get_num_threads()
+    with pf.num_threads(numba_threads = 1, blas_threads = 1):
+        assert pf.get_num_threads() == {"numba_threads": 1, "blas_threads": 1}
+        with pf.num_threads(blas_threads = 2):
+            # arguments that are not specified keep their current setting
+            assert pf.get_num_threads() == {"numba_threads": 1, "blas_threads": 2}
+        assert pf.get_num_threads()["blas_threads"] == 1
+    assert pf.get_num_threads() == before
+
+    with pytest.raises(ValueError):
+        pf.set_num_threads(numba_threads = 0)
+
+
+@pytest.mark.parametrize("n_workers", [1, 2, 64])
+def test_worker_threads(n_workers):
+
+    '''
+    test that the numba threads are split across the workers of a thread pool
+    '''
+
+    total = numba.config.NUMBA_NUM_THREADS
+    with _worker_threads(n_workers) as numba_threads:
+        assert numba_threads == max(1, total // n_workers)
+        # the calling thread runs the sequential stages
+        assert numba.get_num_threads() == numba_threads
+
+
+def test_worker_threads_sequential(monkeypatch):
+
+    '''
+    test that sequential estimation leaves the numba threads of the calling thread untouched
+    '''
+
+    def set_num_threads(n):
+        raise AssertionError("the numba threads were changed for n_workers = 1")
+
+    before = numba.get_num_threads()
+    monkeypatch.setattr(numba, "set_num_threads", set_num_threads)
+    with _worker_threads(1) as numba_threads:
+        assert numba_threads == before
+
+
+def test_lazy_threading_layer():
+
+    '''
+    test that importing pyfixest does not launch numba's threading layer
+    '''
+
+    import subprocess
+    import sys
+
+    script = "\n".join([
+        "import pyfixest",
+        "import numba.np.ufunc.parallel as parallel",
+        "assert not parallel._is_initialized",
+        "pyfixest.get_num_threads()",
+        "assert parallel._is_initialized",
+    ])
+    subprocess.run([sys.executable, "-c", script], check = True, timeout = 120, capture_output = True)
+
+
+def test_worker_process_default(monkeypatch):
+
+    '''
+    test that inside the worker process of a process pool, a single thread is used by default
+    '''
+
+    import pyfixest.threads as threads
+
+    monkeypatch.setattr(threads, "_in_worker_process", lambda: True)
+    assert threads._get_thread_budget(1)[0] == 1
+    with pf.num_threads(numba_threads = 2, blas_threads = 2):
+        # an explicit setting takes precedence
+        assert threads._get_thread_budget(1) == (min(2, numba.config.NUMBA_NUM_THREADS), 2)
+
+
+def test_blas_limits_restored(data):
+
+    '''
+    test that concurrent feols() calls restore the BLAS threads once all calls have finished
+    '''
+
+    threadpoolctl = pytest.importorskip("threadpoolctl")
+    from concurrent.futures import ThreadPoolExecutor
+
+    def blas_threads():
+        return [x["num_threads"] for x in threadpoolctl.threadpool_info() if x["user_api"] == "blas"]
+
+    before = blas_threads()
+    fixest = pf.Fixest(data)
+    with ThreadPoolExecutor(max_workers = 4) as executor:
+        list(executor.map(lambda n_jobs: fixest.feols("Y ~ X1 | X2", n_jobs = n_jobs), [1, 2, 3, 4] * 2))
+    assert blas_threads() == before
+
+
+def test_exit_after_thread_pool():
+
+    '''
+    test that a process that fits models from a thread pool exits
+    '''
+
+    import subprocess
+    import sys
+
+    script = "\n".join([
+        "from concurrent.futures import ThreadPoolExecutor",
+        "import pyfixest as pf",
+        "from pyfixest.utils import get_data",
+        "data = get_data()",
+        "with ThreadPoolExecutor(max_workers = 4) as executor:",
+        "    list(executor.map(lambda _: pf.Fixest(data.copy()).feols('Y ~ X1 | X2').tidy(), range(4)))",
+    ])
+    subprocess.run([sys.executable, "-c", script], check = True, timeout = 120, capture_output = True)
+
+
+def test_feols_threads(data):
+
+    '''
+    test that the thread configuration does not change the results of concurrent estimation
+    '''
+
+    fml = "Y + Y2 ~ csw(X1, X2) | X3"
+
+    fixest = pf.Fixest(data)
+    fixest.feols(fml, vcov = {"CRV3": "group_id"})
+
+    with pf.num_threads(numba_threads = 1, blas_threads = 1):
+        fixest_threads = pf.Fixest(data)
+        fixest_threads.feols(fml, vcov = {"CRV3": "group_id"}, n_jobs = 2)
+
+    for model_fml, model in fixest.model_res.items():
+        fit = fixest_threads.model_res[model_fml]
+        assert np.allclose(fit.beta_hat, model.beta_hat)
+        assert np.allclose(fit.se, model.se)
+
+
+def test_sequential_feols_without_thread_pool(data, monkeypatch):
+
+    '''
+    test that no thread pool is started for n_jobs = 1, and that the interacted covariates
+    are collected per model
+    '''
+
+    from pyfixest import fixest as fixest_module
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("a thread pool was started for n_jobs = 1")
+
+    monkeypatch.setattr(fixest_module, "ThreadPoolExecutor", no_pool)
+
+    data["X2"] = pd.Categorical(data["X2"])
+
+    fixest = pf.Fixest(data).feols("Y ~ i(X2, X1) + csw(X3, X4)", n_jobs = 1)
+    for model in fixest.model_res.values():
+        assert model.icovars == [x for x in model.coefnames if x.startswith("X2") and x.endswith("X1")]
+    assert fixest.icovars == list(fixest.model_res.values())[-1].icovars
+
+
+def test_concurrent_feols(data):
+
+    '''
+    test that concurrent feols() calls on the same Fixest object give the same results as separate fits,
+    and that each call returns only its own models
+    '''
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    calls = [
+        dict(fml = "Y ~ X1 | X2^X3", vcov = {"CRV1": "group_id"}),
+        dict(fml = "Y2 ~ csw(X1, X2) | X3", vcov = "hetero"),
+        dict(fml = "Y ~ X2 | X3^X4", vcov = "iid", split = "group_id"),
+        dict(fml = "Y ~ 1 | X2 ~ Z1", vcov = "hetero")
+    ]
+
+    fixest = pf.Fixest(data)
+    with ThreadPoolExecutor(max_workers = 4) as executor:
+        res = list(executor.map(lambda kwargs: fixest.feols(**kwargs), calls * 2))
+
+    for kwargs, fixest_call in zip(calls * 2, res):
+        fixest_single = pf.Fixest(data).feols(**kwargs)
+        # each call only returns its own models
+        assert list(fixest_call.model_res.keys()) == list(fixest_single.model_res.keys())
+        assert fixest_call.fml == fixest_single.fml
+        for model_fml, model in fixest_single.model_res.items():
+            for fit in [fixest_call.model_res[model_fml], fixest.model_res[model_fml]]:
+                assert np.allclose(fit.beta_hat, model.beta_hat)
+                assert np.allclose(fit.se, model.se)
+        assert np.allclose(fixest_call.tidy()["Estimate"], fixest_single.tidy()["Estimate"])
+
+    # the input data is not modified
+    assert "X2^X3" not in data.columns
+
+
+def test_concurrent_lazy_inference(data):
+
+    '''
+    test that inference, which is computed lazily on first access, can be read concurrently from several threads
+    '''
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    fixest = pf.Fixest(data)
+    fixest.feols("Y + Y2 ~ csw(X1, X2) | X3", vcov = {"CRV3": "group_id"})
+    expected = pf.Fixest(data).feols("Y + Y2 ~ csw(X1, X2) | X3", vcov = {"CRV3": "group_id"}).tidy()
+
+    with ThreadPoolExecutor(max_workers = 4) as executor:
+        res = list(executor.map(lambda _: fixest.tidy(), range(8)))
+
+    for tidy in res:
+        assert np.allclose(tidy["Std. Error"], expected["Std. Error"])
+
+
+def test_failed_inference_stays_pending(data):
+
+    '''
+    test that a failed computation of a pending vcov type does not leave the previous standard errors in place
+    '''
+
+    fixest = pf.Fixest(data)
+    fixest.feols("Y ~ X1", vcov = "hetero")
+    fit = fixest.model_res["Y ~ X1"]
+    se = fit.se
+
+    def _get_vcov(vcov, vcov_fix):
+        raise RuntimeError("failed")
+
+    fit.set_vcov({"CRV1": "group_id"})
+    fit._get_vcov = _get_vcov
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            fit.se
+
+    del fit._get_vcov
+    assert fit.vcov_log == {"CRV1": "group_id"}
+    assert not np.allclose(fit.se, se)
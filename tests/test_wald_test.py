@@ -0,0 +1,117 @@
+import pytest
+import numpy as np
+import pandas as pd
+import pyfixest as pf
+from pyfixest.utils import get_data
+
+
+@pytest.fixture
+def data():
+    return get_data()
+
+
+@pytest.mark.parametrize("vcov", ["iid", "hetero", {"CRV1":"group_id"}])
+def test_wald_vs_ttest(data, vcov):
+
+    '''
+    test that the Wald test of a single coefficient equals the squared t-test
+    '''
+
+    fixest = pf.Fixest(data)
+    fixest.feols("Y ~ X1 + X2 | X3", vcov = vcov)
+    fit = list(fixest.model_res.values())[0]
+
+    res = fit.wald_test(np.eye(fit.k)[:, np.newaxis, :])
+
+    assert np.allclose(res["statistic"], fit.tstat ** 2)
+    assert np.allclose(res["pvalue"], fit.pvalue)
+
+
+def test_wald_batched_vs_loop(data):
+
+    '''
+    test that a stack of hypotheses with different numbers of restrictions equals separate Wald tests
+    '''
+
+    fixest = pf.Fixest(data)
+    fixest.feols("Y ~ X1 + X2 + X3", vcov = "hetero")
+    fit = list(fixest.model_res.values())[0]
+
+    rng = np.random.default_rng(1)
+    R_list = [rng.normal(size = (m, fit.k)) for m in [1, 2, 2, 3, 1]]
+    q_list = [rng.normal(size = R.shape[0]) for R in R_list]
+    res = fit.wald_test(R_list, q_list)
+
+    for i, (R, q) in enumerate(zip(R_list, q_list)):
+        Rbetaq = R @ fit.beta_hat - q
+        wald = Rbetaq @ np.linalg.inv(R @ fit.vcov @ R.T) @ Rbetaq
+        assert np.allclose(res["statistic"].iloc[i], wald / R.shape[0])
+        assert res["df1"].iloc[i] == R.shape[0]
+
+
+def test_wald_fixest_table(data):
+
+    fixest = pf.Fixest(data)
+    fixest.feols("Y ~ csw(X1, X2)", vcov = "hetero")
+    R = [pd.DataFrame({"X1": [1]}), pd.DataFrame({"X1": [1, 0], "X2": [0, 1]})]
+    res = fixest.wald_test(R)
+
+    assert res.shape[0] == 4
+    # the joint hypothesis is not applicable to the model without X2
+    assert np.isnan(res.loc["Y ~ X1", "statistic"].iloc[1])
+    assert np.all(res.loc["Y ~ X1+X2", "statistic"] > 0)
+
+
+def test_first_stage_ftest(data):
+
+    '''
+    test the first stage F-test of an IV model against an OLS regression of the endogenous variable
+    '''
+
+    # both regressions need to be estimated on the same sample
+    fixest = pf.Fixest(data.dropna())
+    fixest.feols("Y ~ 1 | X2 | X1 ~ Z1")
+    fit = list(fixest.model_res.values())[0]
+    fit.get_Ftest(vcov = "hetero", is_iv = True)
+
+    fixest = pf.Fixest(data.dropna())
+    fixest.feols("X1 ~ Z1 | X2", vcov = "hetero")
+    first_stage = list(fixest.model_res.values())[0]
+
+    assert np.allclose(fit.F_stat, first_stage.tstat[0] ** 2)
+
+
+@pytest.mark.parametrize("fml", ["Y ~ 1 | X2 | X1 ~ Z1", "Y ~ X3 | X2 | X1 ~ Z1 + Z2"])
+def test_iv_diag_vs_first_stage(data, fml):
+
+    '''
+    test the weak instrument diagnostics from cached cross-products against first stage F-tests
+    '''
+
+    fixest = pf.Fixest(data)
+    fixest.feols(fml, vcov = "iid")
+    fit = list(fixest.model_res.values())[0]
+    diag = fit.get_IV_diag()
+
+    fit.get_Ftest(vcov = "iid", is_iv = True)
+    assert np.allclose(diag["F_first_stage"], fit.F_stat)
+    fit.get_Ftest(vcov = "hetero", is_iv = True)
+    assert np.allclose(diag["F_KP"], fit.F_stat)
+
+    first_stage = fit._get_first_stage()
+    assert np.allclose(fit.first_stage_coef, first_stage.beta_hat)
+
+    # with a single instrument, the effective F equals the robust F
+    if "Z2" not in fml:
+        assert np.allclose(diag["F_eff"], diag["F_KP"])
+
+
+def test_iv_diag_clustered(data):
+
+    fixest = pf.Fixest(data)
+    fixest.feols("Y ~ X3 | X2 | X1 ~ Z1 + Z2", vcov = {"CRV1": "group_id"})
+    fit = list(fixest.model_res.values())[0]
+    diag = fit.get_IV_diag()
+
+    fit.get_Ftest(vcov = {"CRV1": "group_id"}, is_iv = True)
+    assert np.allclose(diag["F_KP"], fit.F_stat)
@@ -28,3 +28,325 @@ def test_crv1_equivalence(data):
 
     #np.allclose(tstat, boot_tstat)
 
+
+
+def test_tstat_equivalence_fixef(data):
+
+    '''
+    test that the bootstrap t-statistic equals the CRV1 t-statistic, also with fixed effects
+    '''
+
+    fixest = pf.Fixest(data)
+    fixest.feols("Y~X1 | csw0(X2, X3)", vcov = {"CRV1":"group_id"})
+    tstat = fixest.tstat()
+    tstat = tstat[tstat.coefnames == "X1"]["t value"]
+    boot_tstat = fixest.wildboottest(param = "X1", B = 999, seed = 123)["t value"]
+
+    if not np.allclose(tstat.astype(float), boot_tstat.astype(float)):
+        raise ValueError("Bootstrap t-statistic does not match the CRV1 t-statistic.")
+
+
+@pytest.mark.parametrize("weights_type", ["rademacher", "mammen", "webb", "normal"])
+@pytest.mark.parametrize("impose_null", [True, False])
+def test_weights_types(data, weights_type, impose_null):
+
+    fixest = pf.Fixest(data)
+    fixest.feols("Y~X1 | X2", vcov = {"CRV1":"group_id"})
+    pvalue = fixest.wildboottest(param = "X1", B = 999, weights_type = weights_type, impose_null = impose_null, seed = 123)["Pr(>|t|)"]
+
+    assert np.all((pvalue >= 0) & (pvalue <= 1))
+
+
+@pytest.mark.parametrize("impose_null", [True, False])
+@pytest.mark.parametrize("bootstrap_type", ["11", "13", "31", "33"])
+def test_full_enumeration_vs_brute_force(impose_null, bootstrap_type):
+
+    '''
+    test the wild cluster bootstrap against a brute force implementation
+    that re-estimates the model for each bootstrap sample
+    '''
+
+    from pyfixest.bootstrap import wildboottest
+
+    rng = np.random.default_rng(9)
+    N, G = 200, 8
+    X = np.column_stack([np.ones(N), rng.normal(size = (N, 2))])
+    Y = X @ np.array([1, 0.1, -0.5]) + rng.normal(size = N)
+    cluster = rng.integers(0, G, N)
+    R = np.array([0, 1, 0])
+
+    boot = wildboottest(X, Y, cluster, R, B = 2 ** G, impose_null = impose_null, bootstrap_type = bootstrap_type)
+    assert boot["full_enumeration"]
+
+    ssc = (N - 1) / (N - 3) * G / (G - 1)
+
+    def fit(X, Y, r = None):
+        # least squares, optionally subject to R'beta = r
+        if r is None:
+            return np.linalg.solve(X.T @ X, X.T @ Y)
+        beta = np.zeros(3)
+        beta[[0, 2]] = np.linalg.lstsq(X[:, [0, 2]], Y - X[:, 1] * r, rcond = None)[0]
+        beta[1] = r
+        return beta
+
+    def tstat(X, Y, r):
+        beta = fit(X, Y)
+        if bootstrap_type[1] == "1":
+            u = Y - X @ beta
+            A = np.linalg.inv(X.T @ X)
+            meat = np.zeros((3, 3))
+            for g in range(G):
+                s = X[cluster == g].T @ u[cluster == g]
+                meat += np.outer(s, s)
+            var = R @ (A @ meat @ A) @ R
+        else:
+            var = np.sum([(R @ (fit(X[cluster != g], Y[cluster != g]) - beta)) ** 2 for g in range(G)])
+        return (R @ beta - r) / np.sqrt(ssc * var)
+
+    t_stat = tstat(X, Y, 0)
+    r_dgp = 0 if impose_null else None
+    beta_dgp = fit(X, Y, r_dgp)
+    if bootstrap_type[0] == "1":
+        u = Y - X @ beta_dgp
+    else:
+        u = np.zeros(N)
+        for g in range(G):
+            u[cluster == g] = Y[cluster == g] - X[cluster == g] @ fit(X[cluster != g], Y[cluster != g], r_dgp)
+    r_boot = 0 if impose_null else R @ beta_dgp
+
+    t_boot = []
+    for b in range(2 ** G):
+        v = ((b >> np.arange(G)) & 1) * 2.0 - 1.0
+        t_boot.append(tstat(X, X @ beta_dgp + u * v[cluster], r_boot))
+
+    assert np.allclose(boot["t_stat"], t_stat)
+    assert np.allclose(np.sort(boot["t_boot"]), np.sort(t_boot))
+
+
+@pytest.mark.parametrize("bootstrap_type", ["13", "31", "33"])
+def test_bootstrap_types(data, bootstrap_type):
+
+    '''
+    test the bootstrap types based on the jackknife via Fixest.wildboottest(), also for the heteroskedastic
+    bootstrap and with confidence intervals. For '13' and '33', the t-statistic is the CRV3 t-statistic of the model
+    '''
+
+    fixest = pf.Fixest(data)
+    fixest.feols("Y~X1 + X2", vcov = {"CRV3":"group_id"})
+    boot = fixest.wildboottest(param = "X1", B = 999, seed = 3, bootstrap_type = bootstrap_type, conf_int = True)
+    assert np.all((boot["Pr(>|t|)"] >= 0) & (boot["Pr(>|t|)"] <= 1))
+    if bootstrap_type[1] == "3":
+        tstat = fixest.tstat()
+        assert np.allclose(boot["t value"].astype(float), tstat[tstat.coefnames == "X1"]["t value"].astype(float))
+
+    # fixed effects that are not nested within the clusters
+    fixest = pf.Fixest(data)
+    fixest.feols("Y~X1 | X2", vcov = {"CRV1":"group_id"})
+    with pytest.warns(UserWarning, match = "not nested"):
+        fixest.wildboottest(param = "X1", B = 999, seed = 3, bootstrap_type = bootstrap_type)
+
+    fixest = pf.Fixest(data)
+    fixest.feols("Y~X1 + X2", vcov = "hetero")
+    boot = fixest.wildboottest(param = "X1", B = 999, seed = 3, bootstrap_type = bootstrap_type)
+    assert np.all((boot["Pr(>|t|)"] >= 0) & (boot["Pr(>|t|)"] <= 1))
+
+
+@pytest.mark.parametrize("bootstrap_type", ["13", "31", "33"])
+def test_hetero_jackknife_chunks(bootstrap_type):
+
+    '''
+    test that the heteroskedastic bootstrap types based on the jackknife do not depend on the chunk size
+    of the leave-one-out cross-products
+    '''
+
+    from pyfixest.bootstrap import _wildboot_components
+
+    rng = np.random.default_rng(4)
+    N, k = 200, 3
+    X = np.column_stack([np.ones(N), rng.normal(size = (N, k - 1))])
+    Y = X @ np.ones(k) + rng.normal(size = N)
+    R = np.array([0, 1, 0])
+
+    components = _wildboot_components(X, Y, None, R, True, True, True, bootstrap_type)
+    # chunks of 7 observations
+    components_chunks = _wildboot_components(X, Y, None, R, True, True, True, bootstrap_type, max_elements = 7 * k * k)
+
+    # every observation is its own cluster
+    components_cluster = _wildboot_components(X, Y, np.arange(N), R, True, True, False, bootstrap_type)
+
+    for x in ["c0", "c1", "e0", "e1", "QA", "S0", "S1", "se"]:
+        assert np.allclose(components[x], components_chunks[x])
+    # up to the small sample adjustments
+    for x in ["c0", "c1", "e0", "e1", "QA", "S0", "S1"]:
+        assert np.allclose(components[x], components_cluster[x])
+    assert np.allclose(components["se"] / np.sqrt(components["ssc"]), components_cluster["se"] / np.sqrt(components_cluster["ssc"]))
+
+
+@pytest.mark.parametrize("cluster", [None, "group_id"])
+def test_conf_int_inversion(data, cluster):
+
+    '''
+    test that the bounds of the bootstrap confidence interval are the points at which
+    the bootstrap p-value, re-computed with the same weights, crosses alpha
+    '''
+
+    from pyfixest.bootstrap import wildboottest
+
+    data = data.dropna()
+    X = np.column_stack([np.ones(data.shape[0]), data[["X1", "X2"]].to_numpy()])
+    Y = data["Y"].to_numpy()
+    cluster = None if cluster is None else data[cluster].to_numpy()
+    R = np.array([0, 1, 0])
+
+    boot = wildboottest(X, Y, cluster, R, B = 999, seed = 3, conf_int = True, alpha = 0.1)
+    lower, upper = boot["conf_int"]
+    beta = np.linalg.lstsq(X, Y, rcond = None)[0][1]
+    assert lower < beta < upper
+
+    eps = 1e-04 * (upper - lower)
+    for bound, direction in [(lower, -1), (upper, 1)]:
+        p_inside = wildboottest(X, Y, cluster, R, r = bound - direction * eps, B = 999, seed = 3)["pvalue"]
+        p_outside = wildboottest(X, Y, cluster, R, r = bound + direction * eps, B = 999, seed = 3)["pvalue"]
+        assert p_inside >= 0.1
+        assert p_outside < 0.1
+
+
+def test_conf_int_wcu_percentile_t(data):
+
+    '''
+    for the unrestricted bootstrap, the bootstrap t-statistics do not depend on the null,
+    and the inverted confidence interval is the symmetric percentile-t interval
+    '''
+
+    fixest = pf.Fixest(data)
+    fixest.feols("Y~X1 | X2", vcov = {"CRV1":"group_id"})
+    fit = fixest.model_res["Y ~ X1|X2"]
+    fit._update_inference()
+    boot = fit.get_wildboottest(999, "group_id", "X1", "rademacher", False, "11", 5, True, True, True, 0.05)
+
+    from pyfixest.bootstrap import wildboottest
+    t_boot = wildboottest(fit.X, fit.Y, fit.data["group_id"].to_numpy(), np.array([1.0]), B = 999, impose_null = False, seed = 5)["t_boot"]
+    t_sorted = np.sort(np.abs(t_boot))
+    beta, se = fit.beta_hat[0], fit.se[0]
+
+    # the upper bound lies between the two order statistics around the 1 - alpha quantile
+    k = int(np.ceil(0.95 * 999)) - 1
+    assert beta + t_sorted[k - 1] * se <= boot["conf_int"][1] + 1e-06
+    assert boot["conf_int"][1] <= beta + t_sorted[k + 1] * se + 1e-06
+    assert np.allclose(beta - boot["conf_int"][0], boot["conf_int"][1] - beta)
+
+    res = fixest.wildboottest(param = "X1", B = 999, seed = 5, conf_int = True)
+    assert list(res.columns[-2:]) == ["2.5 %", "97.5 %"]
+
+
+@pytest.mark.parametrize("vcov", ["hetero", {"CRV1":"group_id"}])
+def test_rwolf_single_model(data, vcov):
+
+    '''
+    with a single hypothesis, the Romano-Wolf p-value is the unadjusted bootstrap p-value,
+    computed with the same weights as wildboottest()
+    '''
+
+    # drop missing values, so that the full data set and the estimation sample share their bootstrap units
+    fixest = pf.Fixest(data.dropna())
+    fixest.feols("Y~X1 | X2", vcov = vcov)
+    rwolf = fixest.rwolf(param = "X1", B = 999, seed = 12)
+    boot = fixest.wildboottest(param = "X1", B = 999, seed = 12)
+
+    assert np.allclose(rwolf["t value"].astype(float), boot["t value"].astype(float))
+    assert np.allclose(rwolf["RW Pr(>|t|)"].astype(float), boot["Pr(>|t|)"].astype(float))
+
+
+@pytest.mark.parametrize("method", ["rwolf", "wyoung"])
+def test_multiple_testing_adjustment(data, method):
+
+    fixest = pf.Fixest(data)
+    fixest.feols("Y + Y2 ~ X1 | csw0(X2, X3)", vcov = {"CRV1":"group_id"})
+    res = getattr(fixest, method)(param = "X1", B = 999, seed = 12)
+
+    pvalue = res["Pr(>|t|)"].to_numpy()
+    adj_pvalue = res.iloc[:, -1].to_numpy()
+    assert res.shape[0] == 6
+    assert np.all(adj_pvalue >= pvalue - 1e-12)
+    assert np.all(adj_pvalue <= 1)
+
+
+@pytest.mark.parametrize("vcov", ["hetero", {"CRV1":"group_id"}])
+def test_multiple_testing_duplicate_index(data, vcov):
+
+    '''
+    test that multiple testing adjustments do not depend on the index of the data, which may contain duplicates
+    '''
+
+    fixest = pf.Fixest(data)
+    fixest.feols("Y + Y2 ~ X1 | X2", vcov = vcov)
+    res = fixest.rwolf(param = "X1", B = 999, seed = 12)
+
+    data_duplicates = data.copy()
+    data_duplicates.index = np.arange(data.shape[0]) // 2
+    fixest_duplicates = pf.Fixest(data_duplicates)
+    fixest_duplicates.feols("Y + Y2 ~ X1 | X2", vcov = vcov)
+    res_duplicates = fixest_duplicates.rwolf(param = "X1", B = 999, seed = 12)
+
+    assert np.allclose(res.iloc[:, 1:].astype(float), res_duplicates.iloc[:, 1:].astype(float))
+
+
+def test_rwolf_vs_brute_force():
+
+    '''
+    test the step-down Romano-Wolf p-values against a direct implementation
+    '''
+
+    from pyfixest.bootstrap import _get_rwolf_pvalues
+
+    rng = np.random.default_rng(4)
+    M, B = 6, 500
+    t_boot = rng.normal(size = (M, B))
+    t_stat = rng.normal(size = M) * 2
+
+    order = np.argsort(-np.abs(t_stat))
+    expected = np.zeros(M)
+    for j, m in enumerate(order):
+        max_t = np.max(np.abs(t_boot[order[j:]]), axis = 0)
+        expected[m] = np.mean(np.abs(t_stat[m]) < max_t)
+        if j > 0:
+            expected[m] = max(expected[m], expected[order[j - 1]])
+
+    assert np.allclose(_get_rwolf_pvalues(t_stat, t_boot), expected)
+
+
+@pytest.mark.parametrize("fml", ["Y ~ X1 + X2", "Y ~ X1 | X2", "Y ~ X1 | X2 + X3"])
+@pytest.mark.parametrize("cluster", [None, "group_id"])
+def test_bayesian_bootstrap_vs_wls(data, fml, cluster):
+
+    '''
+    test the batched weighted demeaning against weighted least squares with fixed effects dummies
+    '''
+
+    import pandas as pd
+
+    fixest = pf.Fixest(data)
+    fixest.feols(fml)
+    res = fixest.bayesian_bootstrap(B = 10, cluster = cluster, seed = 6)
+    fit = list(fixest.model_res.values())[0]
+    assert fit.beta_boot.shape == (10, len(fit.coefnames))
+    assert np.all(res["Std. Error"] > 0)
+
+    # replicate the weights
+    N = fit.data.shape[0]
+    codes = np.arange(N) if cluster is None else pd.factorize(fit.data[cluster])[0]
+    W = np.random.default_rng(6).exponential(size = (10, np.max(codes) + 1))[:, codes]
+
+    Y, X = fit._get_model_matrix()
+    fixef = fml.split("|")[1].strip().split(" + ") if "|" in fml else []
+    Z = [X]
+    for fe in fixef:
+        Z.append(pd.get_dummies(fit.data[fe].astype(int)).to_numpy().astype(float)[:, 1:])
+    Z = np.column_stack(Z)
+    if fixef:
+        Z = np.column_stack([Z, np.ones(N)])
+
+    for b in range(10):
+        sw = np.sqrt(W[b])
+        beta = np.linalg.lstsq(Z * sw[:, np.newaxis], Y * sw, rcond = None)[0][:X.shape[1]]
+        assert np.allclose(fit.beta_boot[b], beta, atol = 1e-06)